@@ -1,14 +1,116 @@
-import pygame
-from typing import Dict
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+if TYPE_CHECKING:
+    import pygame
+
+from constants import TILE_SIZE
+
+COLORS: Tuple[str, str] = ('White', 'Black')
+
 
 class AssetManager:
-    def __init__(self, image_paths: Dict[str, str]) -> None:
-        self.images: Dict[str, Dict[str, pygame.Surface]] = {}
-        for piece, path_template in image_paths.items():
-            self.images[piece] = {}
-            for color in ['Black', 'White']:
-                full_path: str = path_template.replace('{color}', color.lower())
-                self.images[piece][color] = pygame.image.load(full_path)
-
-    def get_image(self, piece: str, color: str) -> pygame.Surface:
-        return self.images[piece][color]
\ No newline at end of file
+    """
+    Piece images, loaded the first time one is drawn so the game model never imports pygame.
+    The images are packed into one atlas surface per tile size, a row per colour, converted to
+    the display's pixel format once; pieces are handed out as subsurfaces of the atlas.
+    Atlases of the `max_sizes` most recently used tile sizes are kept.
+    """
+
+    def __init__(self, image_paths: Dict[str, str], max_sizes: int = 2) -> None:
+        self.image_paths: Dict[str, str] = image_paths
+        self.max_sizes: int = max_sizes
+        self.source: Optional['pygame.Surface'] = None  # atlas at the size the images were drawn
+        self.source_size: int = 0
+        self.atlases: 'OrderedDict[int, pygame.Surface]' = OrderedDict()  # least recent first
+        self.tiles: Dict[int, Dict[Tuple[str, str], 'pygame.Surface']] = {}
+        # Tiles of the size asked for last, so drawing at one size skips the cache bookkeeping
+        self.size: Optional[int] = None
+        self.images: Dict[Tuple[str, str], 'pygame.Surface'] = {}
+
+    def has_image(self, piece: str) -> bool:
+        return piece in self.image_paths
+
+    def load(self) -> None:
+        """
+        Loads every piece image into the source atlas; called by get_image on first use
+        """
+        import pygame
+
+        images = {
+            (piece, color): pygame.image.load(path_template.replace('{color}', color.lower()))
+            for piece, path_template in self.image_paths.items()
+            for color in COLORS
+        }
+        size = max(max(image.get_size()) for image in images.values())
+        atlas = pygame.Surface((size * len(self.image_paths), size * len(COLORS)), pygame.SRCALPHA)
+        for (piece, color), image in images.items():
+            atlas.blit(image, self.tile_rect(piece, color, size)[:2])
+        self.source = self.convert(atlas)
+        self.source_size = size
+
+    @staticmethod
+    def convert(surface: 'pygame.Surface') -> 'pygame.Surface':
+        """
+        Converts a surface to the display's pixel format, so blits need no per-pixel conversion.
+        Left as it is while no display mode is set, as convert_alpha requires one.
+        """
+        import pygame
+
+        return surface.convert_alpha() if pygame.display.get_surface() is not None else surface
+
+    def tile_rect(self, piece: str, color: str, size: int) -> Tuple[int, int, int, int]:
+        column = list(self.image_paths).index(piece)
+        return column * size, COLORS.index(color) * size, size, size
+
+    def get_atlas(self, size: int) -> 'pygame.Surface':
+        """
+        Atlas of every piece at a tile size, scaled from the source atlas on first use
+        :param size: Tile width and height in pixels
+        """
+        atlas = self.atlases.get(size)
+        if atlas is not None:
+            self.atlases.move_to_end(size)
+            return atlas
+        import pygame
+
+        if self.source is None:
+            self.load()
+        source, source_size = self.source, self.source_size
+        if size == source_size:
+            atlas = source
+        else:
+            # Scaled a tile at a time so smoothscale does not blend neighbouring pieces
+            atlas = pygame.Surface(
+                (size * len(self.image_paths), size * len(COLORS)), pygame.SRCALPHA
+            )
+            for piece in self.image_paths:
+                for color in COLORS:
+                    tile = source.subsurface(self.tile_rect(piece, color, source_size))
+                    atlas.blit(
+                        pygame.transform.smoothscale(tile, (size, size)),
+                        self.tile_rect(piece, color, size)[:2],
+                    )
+            atlas = self.convert(atlas)
+        self.atlases[size] = atlas
+        self.tiles[size] = {
+            (piece, color): atlas.subsurface(self.tile_rect(piece, color, size))
+            for piece in self.image_paths
+            for color in COLORS
+        }
+        while len(self.atlases) > self.max_sizes:
+            evicted, _ = self.atlases.popitem(last=False)
+            del self.tiles[evicted]
+            if evicted == self.size:
+                self.size = None
+        return atlas
+
+    def get_image(self, piece: str, color: str, size: int = TILE_SIZE) -> 'pygame.Surface':
+        """
+        :param size: Tile width and height in pixels
+        :return: Subsurface of the atlas for that size
+        """
+        if size != self.size:
+            self.get_atlas(size)
+            self.size = size
+            self.images = self.tiles[size]
+        return self.images[piece, color]
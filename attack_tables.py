@@ -0,0 +1,188 @@
+from typing import Dict, List, Tuple
+
+from constants import BLACK_KINGSIDE, BLACK_QUEENSIDE, WHITE_KINGSIDE, WHITE_QUEENSIDE
+
+# Squares are indexed 0..63 from a1 to h8
+# Bitboard tables hold one bit per square; the *_SQUARES tables hold the same targets
+# as tuples of square indices so that the Square-based model can walk them without allocating.
+
+FULL: int = (1 << 64) - 1
+
+
+def square_index(row: int, column: int) -> int:
+    return (row - 1) * 8 + column - 1
+
+
+def _leaper_table(offsets) -> List[int]:
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        mask = 0
+        for dr, dc in offsets:
+            r, c = row + dr, col + dc
+            if 0 <= r < 8 and 0 <= c < 8:
+                mask |= 1 << (r * 8 + c)
+        table.append(mask)
+    return table
+
+
+def _ray_table(dr: int, dc: int) -> List[int]:
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        mask = 0
+        r, c = row + dr, col + dc
+        while 0 <= r < 8 and 0 <= c < 8:
+            mask |= 1 << (r * 8 + c)
+            r, c = r + dr, c + dc
+        table.append(mask)
+    return table
+
+
+KNIGHT_ATTACKS: List[int] = _leaper_table(
+    ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+)
+KING_ATTACKS: List[int] = _leaper_table(
+    ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+)
+# Squares attacked by a pawn of the given colour standing on the square
+PAWN_ATTACKS: List[List[int]] = [
+    _leaper_table(((1, -1), (1, 1))),
+    _leaper_table(((-1, -1), (-1, 1))),
+]
+
+# Rays that grow towards higher indices are cut at their lowest blocker,
+# the others at their highest one.
+NORTH, EAST, NORTH_EAST, NORTH_WEST = (
+    _ray_table(1, 0),
+    _ray_table(0, 1),
+    _ray_table(1, 1),
+    _ray_table(1, -1),
+)
+SOUTH, WEST, SOUTH_WEST, SOUTH_EAST = (
+    _ray_table(-1, 0),
+    _ray_table(0, -1),
+    _ray_table(-1, -1),
+    _ray_table(-1, 1),
+)
+
+ROOK_RAYS: List[int] = [NORTH[sq] | EAST[sq] | SOUTH[sq] | WEST[sq] for sq in range(64)]
+BISHOP_RAYS: List[int] = [
+    NORTH_EAST[sq] | NORTH_WEST[sq] | SOUTH_EAST[sq] | SOUTH_WEST[sq] for sq in range(64)
+]
+
+
+def _between_table() -> List[List[int]]:
+    table = [[0] * 64 for _ in range(64)]
+    for ray, reverse in (
+        (NORTH, SOUTH),
+        (EAST, WEST),
+        (NORTH_EAST, SOUTH_WEST),
+        (NORTH_WEST, SOUTH_EAST),
+    ):
+        for a in range(64):
+            targets = ray[a]
+            while targets:
+                bit = targets & -targets
+                b = bit.bit_length() - 1
+                targets ^= bit
+                table[a][b] = table[b][a] = ray[a] & reverse[b]
+    return table
+
+
+# Squares strictly between two squares sharing a line, 0 otherwise
+BETWEEN: List[List[int]] = _between_table()
+
+
+def _squares(mask: int) -> Tuple[int, ...]:
+    return tuple(sq for sq in range(64) if mask >> sq & 1)
+
+
+def _ray_squares(sq: int, dr: int, dc: int) -> Tuple[int, ...]:
+    row, col = divmod(sq, 8)
+    squares = []
+    r, c = row + dr, col + dc
+    while 0 <= r < 8 and 0 <= c < 8:
+        squares.append(r * 8 + c)
+        r, c = r + dr, c + dc
+    return tuple(squares)
+
+
+KNIGHT_SQUARES: List[Tuple[int, ...]] = [_squares(mask) for mask in KNIGHT_ATTACKS]
+KING_SQUARES: List[Tuple[int, ...]] = [_squares(mask) for mask in KING_ATTACKS]
+PAWN_SQUARES: List[List[Tuple[int, ...]]] = [
+    [_squares(mask) for mask in table] for table in PAWN_ATTACKS
+]
+# Rays walked outwards from the square, nearest square first
+ORTHOGONAL_RAYS: List[Tuple[Tuple[int, ...], ...]] = [
+    tuple(_ray_squares(sq, dr, dc) for dr, dc in ((1, 0), (0, 1), (-1, 0), (0, -1)))
+    for sq in range(64)
+]
+DIAGONAL_RAYS: List[Tuple[Tuple[int, ...], ...]] = [
+    tuple(_ray_squares(sq, dr, dc) for dr, dc in ((1, 1), (1, -1), (-1, 1), (-1, -1)))
+    for sq in range(64)
+]
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    ray = NORTH[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= NORTH[(blockers & -blockers).bit_length() - 1]
+    attacks = ray
+    ray = EAST[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= EAST[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = SOUTH[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= SOUTH[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = WEST[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= WEST[blockers.bit_length() - 1]
+    return attacks | ray
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    ray = NORTH_EAST[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= NORTH_EAST[(blockers & -blockers).bit_length() - 1]
+    attacks = ray
+    ray = NORTH_WEST[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= NORTH_WEST[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = SOUTH_EAST[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= SOUTH_EAST[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = SOUTH_WEST[sq]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= SOUTH_WEST[blockers.bit_length() - 1]
+    return attacks | ray
+
+
+# Castling rights that survive a move touching the square
+CASTLING_MASK: List[int] = [15] * 64
+CASTLING_MASK[square_index(1, 5)] = 15 ^ (WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[square_index(1, 8)] = 15 ^ WHITE_KINGSIDE
+CASTLING_MASK[square_index(1, 1)] = 15 ^ WHITE_QUEENSIDE
+CASTLING_MASK[square_index(8, 5)] = 15 ^ (BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASK[square_index(8, 8)] = 15 ^ BLACK_KINGSIDE
+CASTLING_MASK[square_index(8, 1)] = 15 ^ BLACK_QUEENSIDE
+
+# King destination -> (rook from, rook to)
+CASTLING_ROOKS: Dict[int, Tuple[int, int]] = {
+    square_index(1, 7): (square_index(1, 8), square_index(1, 6)),
+    square_index(1, 3): (square_index(1, 1), square_index(1, 4)),
+    square_index(8, 7): (square_index(8, 8), square_index(8, 6)),
+    square_index(8, 3): (square_index(8, 1), square_index(8, 4)),
+}
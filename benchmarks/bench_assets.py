@@ -0,0 +1,70 @@
+"""
+Compares piece images loaded one file at a time and left in their file's pixel format,
+as AssetManager kept them before, with the converted atlas AssetManager builds: the time to
+load them and the cost of a blit, with the SDL dummy video driver.
+
+Run from the repository root: python benchmarks/bench_assets.py [blits]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+
+from assets import COLORS, AssetManager  # noqa: E402
+from constants import IMAGE_PATHS, SCREEN_HEIGHT, SCREEN_WIDTH, TILE_SIZE  # noqa: E402
+
+
+def load_separately() -> dict:
+    return {
+        (piece, color): pygame.image.load(path.replace('{color}', color.lower()))
+        for piece, path in IMAGE_PATHS.items()
+        for color in COLORS
+    }
+
+
+def load_atlas() -> dict:
+    manager = AssetManager(IMAGE_PATHS)
+    manager.get_image('Pawn', 'White')
+    return manager.tiles[TILE_SIZE]
+
+
+def blit_time(screen: pygame.Surface, images: dict, blits: int) -> float:
+    """
+    :return: Seconds per blit, cycling through the pieces over the board
+    """
+    surfaces = list(images.values())
+    positions = [(x * TILE_SIZE, y * TILE_SIZE) for y in range(8) for x in range(8)]
+    start = time.perf_counter()
+    for i in range(blits):
+        screen.blit(surfaces[i % len(surfaces)], positions[i % 64])
+    return (time.perf_counter() - start) / blits
+
+
+def main() -> None:
+    blits = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    for label, load in (('separate files', load_separately), ('converted atlas', load_atlas)):
+        start = time.perf_counter()
+        images = load()
+        loaded = time.perf_counter() - start
+        per_blit = blit_time(screen, images, blits)
+        print(f'{label:>15}: load {loaded * 1e3:6.2f} ms, blit {per_blit * 1e6:6.2f} us')
+
+    manager = AssetManager(IMAGE_PATHS)
+    manager.get_image('Pawn', 'White')
+    start = time.perf_counter()
+    manager.get_image('Pawn', 'White', 2 * TILE_SIZE)
+    rescaled = time.perf_counter() - start
+    print(f'{"rescale":>15}: {rescaled * 1e3:6.2f} ms for tile size {2 * TILE_SIZE}')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
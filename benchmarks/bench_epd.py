@@ -0,0 +1,56 @@
+"""
+Measures how fast epd.read_epd streams positions from a file, alone and when each position is
+also loaded into the Square/Piece object model. The file is written from seeded random games.
+
+Run from the repository root: python benchmarks/bench_epd.py [positions]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import STARTING_FEN, BitboardPosition  # noqa: E402
+from board import Board  # noqa: E402
+from epd import read_epd  # noqa: E402
+from rules_engine import MoveValidator  # noqa: E402
+
+
+def write_positions(path: str, count: int) -> None:
+    rng = random.Random(7)
+    with open(path, 'w') as file:
+        written = 0
+        while written < count:
+            position = BitboardPosition.from_fen(STARTING_FEN)
+            for _ in range(rng.randrange(10, 80)):
+                moves = position.legal_moves()
+                if not moves:
+                    break
+                position.make_move(rng.choice(moves))
+            fields = position.fen().split()
+            file.write(f"{' '.join(fields[:4])} id \"{written}\";\n")
+            written += 1
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'positions.epd')
+        write_positions(path, count)
+        board = Board(MoveValidator())
+        for label, objects in (('bitboard positions', False), ('plus object model', True)):
+            loaded = 0
+            start = time.perf_counter()
+            for record in read_epd(path):
+                if objects:
+                    board.load_position(record.position)
+                loaded += 1
+            elapsed = time.perf_counter() - start
+            print(f'{label:>18}: {loaded} in {elapsed:.3f}s ({loaded / elapsed:,.0f} positions/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Measures offscreen image export in one process: PNG thumbnails of the perft suite positions,
+and GIF frames of seeded random games, with the renderer's cached surfaces reused throughout.
+
+Run from the repository root: python benchmarks/bench_export.py [images] [size]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from export import BoardImager  # noqa: E402
+from game_state import GameState  # noqa: E402
+from perft import PERFT_SUITE  # noqa: E402
+
+
+def main() -> None:
+    images = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 240
+    imager = BoardImager(size)
+
+    fens = [case.fen for case in PERFT_SUITE]
+    start = time.perf_counter()
+    for i in range(images):
+        imager.png(fens[i % len(fens)])
+    elapsed = time.perf_counter() - start
+    print(f'png: {images / elapsed * 60:10,.0f} images/min ({elapsed / images * 1e3:.2f} ms each)')
+
+    rng = random.Random(0)
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(max(1, images // 50)):
+        game_state = GameState()
+
+        def moves():
+            for _ in range(60):
+                if game_state.result != 'Continue':
+                    return
+                yield rng.choice(sorted(game_state.legal_moves()))
+
+        imager.replay(game_state, moves())
+        frames += 1 + len(game_state.move_stack)
+    elapsed = time.perf_counter() - start
+    print(f'gif: {frames / elapsed:10,.0f} frames/s ({elapsed / frames * 1e3:.2f} ms each)')
+
+
+if __name__ == '__main__':
+    main()
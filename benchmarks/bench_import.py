@@ -0,0 +1,53 @@
+"""
+Measures how long a fresh interpreter takes to import the game model and set up a game,
+and checks that neither step pulls in pygame.
+
+Run from the repository root: python benchmarks/bench_import.py [runs]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each snippet prints the seconds spent inside the interpreter and whether pygame got imported
+SNIPPETS = {
+    'import game_state': 'import game_state',
+    'GameState()': 'import game_state; game_state.GameState()',
+    'import pygame': 'import pygame',
+}
+TEMPLATE = (
+    'import sys, time; start = time.perf_counter(); {code}; '
+    "print(time.perf_counter() - start, 'pygame' in sys.modules)"
+)
+
+
+def run(code: str) -> tuple:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', TEMPLATE.format(code=code)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, 'PYGAME_HIDE_SUPPORT_PROMPT': '1'},
+    ).stdout.split()
+    return float(output[-2]), time.perf_counter() - start, output[-1] == 'True'
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, code in SNIPPETS.items():
+        results = [run(code) for _ in range(runs)]
+        inside = min(result[0] for result in results)
+        process = min(result[1] for result in results)
+        print(
+            f'{name:<18} {inside * 1000:7.1f} ms in the interpreter  '
+            f'{process * 1000:7.1f} ms with process start  pygame loaded: {results[0][2]}'
+        )
+
+
+if __name__ == '__main__':
+    main()
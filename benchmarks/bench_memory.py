@@ -0,0 +1,47 @@
+"""
+Measures the memory held by each game: the bytes allocated per GameState while many games are
+alive at once, and the size of one board's squares and pieces.
+
+Run from the repository root: python benchmarks/bench_memory.py [games]
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import GameState  # noqa: E402
+
+
+def model_bytes(game_state: GameState) -> int:
+    """
+    Shallow size of the board's squares and pieces, including their instance dictionaries
+    """
+    objects = [square for square in game_state.board.grid]
+    objects += [square.piece for square in game_state.board.grid if square.piece is not None]
+    total = 0
+    for obj in objects:
+        total += sys.getsizeof(obj)
+        if hasattr(obj, '__dict__'):
+            total += sys.getsizeof(obj.__dict__)
+    return total
+
+
+def main() -> None:
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    GameState()  # import-time tables are not part of a game
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    alive = [GameState() for _ in range(games)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'{games} games: {(after - before) / games / 1024:8.1f} KiB per GameState')
+    print(f'squares and pieces: {model_bytes(alive[0]) / 1024:8.1f} KiB per board')
+
+
+if __name__ == '__main__':
+    main()
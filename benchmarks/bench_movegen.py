@@ -0,0 +1,109 @@
+"""
+Compares the object model with the bitboard backend through the same GameState calls, on
+positions from seeded random games:
+
+- listing: GameState.legal_moves() on a position neither backend has seen, with Player's
+  move cache and the bitboard generator's last list cleared before every call
+- per ply: GameState.legal_moves() and GameState.apply(move) while replaying the games,
+  each backend keeping what it may between plies
+
+Also counts the pieces constructed while listing, which should stay at zero.
+
+Run from the repository root: python benchmarks/bench_movegen.py [games] [plies]
+"""
+
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import GameState  # noqa: E402
+from pieces import Piece  # noqa: E402
+
+BACKENDS: Tuple[str, ...] = ('objects', 'bitboard')
+
+
+def play_game(seed: int, plies: int) -> List[int]:
+    """
+    :return: Packed moves of a seeded random game
+    """
+    rng = random.Random(seed)
+    game_state = GameState()
+    moves = []
+    while game_state.result == 'Continue' and len(moves) < plies:
+        # Sorted so a seed plays the same game whatever order the moves are listed in
+        move = rng.choice(sorted(game_state.legal_moves()))
+        game_state.apply(move)
+        moves.append(move)
+    return moves
+
+
+def listing_rate(backend: str, games: List[List[int]]) -> Tuple[float, int]:
+    """
+    :return: Legal moves listed per second from scratch, and the pieces constructed doing so
+    """
+    count = created = 0
+    elapsed = 0.0
+    for moves in games:
+        game_state = GameState(backend=backend)
+        for move in moves:
+            player = game_state.current_player()
+            player.clear_move_cache()
+            if game_state.move_generator is not None:
+                game_state.move_generator.clear()
+            before = Piece.created
+            start = time.perf_counter()
+            count += len(game_state.legal_moves())
+            elapsed += time.perf_counter() - start
+            created += Piece.created - before
+            # Promotions played here construct pieces, so they are not counted
+            game_state.apply(move)
+    return count / elapsed, created
+
+
+def ply_time(backend: str, games: List[List[int]]) -> float:
+    """
+    :return: Mean seconds per ply to list the legal moves and play one
+    """
+    plies = 0
+    elapsed = 0.0
+    for moves in games:
+        game_state = GameState(backend=backend)
+        start = time.perf_counter()
+        for move in moves:
+            game_state.legal_moves()
+            game_state.apply(move)
+        elapsed += time.perf_counter() - start
+        plies += len(moves)
+    return elapsed / plies
+
+
+def main() -> None:
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    plies = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    played = [play_game(seed, plies) for seed in range(games)]
+    print(f'{games} games, {sum(map(len, played))} plies')
+
+    listing = {}
+    created = 0
+    for backend in BACKENDS:
+        listing[backend], constructed = listing_rate(backend, played)
+        created += constructed
+    per_ply = {backend: ply_time(backend, played) for backend in BACKENDS}
+    for backend in BACKENDS:
+        print(
+            f'{backend:>8}: listing {listing[backend]:12,.0f} moves/s  '
+            f'per ply {per_ply[backend] * 1e6:7.1f} us'
+        )
+    print(
+        f'bitboard speedup: listing {listing["bitboard"] / listing["objects"]:.1f}x, '
+        f'per ply {per_ply["objects"] / per_ply["bitboard"]:.1f}x'
+    )
+    print(f'pieces constructed while listing: {created}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures how the root-splitting parallel search scales with the number of worker processes:
+time to a fixed depth, nodes/s, nodes/s per worker, speedup and efficiency against one worker.
+
+Run from the repository root: python benchmarks/bench_parallel.py [depth] [max workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import STARTING_FEN, BitboardPosition  # noqa: E402
+from parallel_search import ParallelSearcher  # noqa: E402
+
+POSITIONS = (
+    STARTING_FEN,
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+)
+
+
+def run(workers: int, depth: int) -> tuple:
+    nodes = 0
+    elapsed = 0.0
+    with ParallelSearcher(workers, hash_mb=16) as searcher:
+        # Start the pool outside the timing
+        searcher.search(BitboardPosition.from_fen(STARTING_FEN), max_depth=1)
+        for fen in POSITIONS:
+            start = time.perf_counter()
+            searcher.search(BitboardPosition.from_fen(fen), max_depth=depth)
+            elapsed += time.perf_counter() - start
+            nodes += searcher.report.nodes
+    return nodes, elapsed
+
+
+def main() -> None:
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    counts = sorted({1, *(n for n in (2, 4, 8, 16, 32) if n <= max_workers), max_workers})
+    baseline = None
+    for workers in counts:
+        nodes, elapsed = run(workers, depth)
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(
+            f'{workers:2d} workers: {elapsed:7.2f}s {nodes:>9} nodes '
+            f'{nodes / elapsed:10,.0f} nodes/s {nodes / elapsed / workers:10,.0f} nodes/s/worker  '
+            f'speedup {speedup:4.2f}x  '
+            f'efficiency {speedup / workers:4.0%}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Measures the cost of a frame of ChessRenderer with the SDL dummy video driver: a full repaint,
+an idle frame where nothing changed, a frame after a move of a seeded random game,
+and drawing the end screen.
+
+Run from the repository root: python benchmarks/bench_render.py [frames]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH  # noqa: E402
+from game_state import GameState  # noqa: E402
+from renderer import ChessRenderer  # noqa: E402
+
+
+def main() -> None:
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pygame.init()
+    renderer = ChessRenderer(pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT)))
+    game_state = GameState()
+    renderer.draw_board(game_state)
+    rng = random.Random(0)
+
+    def play() -> None:
+        if game_state.result != 'Continue':
+            game_state.reset()
+        game_state.push(rng.choice(sorted(game_state.legal_moves())))
+
+    # Each case prepares the frame untimed, then the redraw and display update are timed
+    for label, prepare in (
+        ('full repaint', renderer.invalidate),
+        ('idle', lambda: None),
+        ('after a move', play),
+    ):
+        squares = 0
+        elapsed = 0.0
+        for _ in range(frames):
+            prepare()
+            start = time.perf_counter()
+            squares += renderer.draw_board(game_state)
+            renderer.update()
+            elapsed += time.perf_counter() - start
+        print(
+            f'{label:>13}: {elapsed / frames * 1e6:8.1f} us/frame, '
+            f'{squares / frames:5.1f} squares/frame'
+        )
+    start = time.perf_counter()
+    for _ in range(frames):
+        renderer.end_screen = None
+        renderer.draw_game_end('Checkmate', 1)
+    print(f'{"end screen":>13}: {(time.perf_counter() - start) / frames * 1e6:8.1f} us/frame')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Measures per-turn latency of the object model: the time GameState.end_turn spends finding the
+legal moves and status of the side to move, over seeded random games, with Player's move cache
+kept between turns and with it cleared before every move. The status only needs one legal move;
+the eager runs also compute every piece's moves, as listing them all did before.
+
+Run from the repository root: python benchmarks/bench_turn.py [games] [plies]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_state import GameState  # noqa: E402
+
+
+def turn_times(seed: int, plies: int, cached: bool, eager: bool) -> list:
+    """
+    :return: Seconds spent in each end_turn of one game
+    """
+    rng = random.Random(seed)
+    game_state = GameState()
+    times = []
+    while game_state.result == 'Continue' and len(times) < plies:
+        # Sorted so both runs play the same games whatever order the moves are listed in
+        move = rng.choice(sorted(game_state.legal_moves()))
+        if not cached:
+            game_state.white_player.clear_move_cache()
+            game_state.black_player.clear_move_cache()
+        game_state.board.make_move(move)
+        start = time.perf_counter()
+        game_state.end_turn()
+        if eager:
+            game_state.current_player().legal_moves.compute_all()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main() -> None:
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    plies = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for label, cached, eager in (
+        ('eager, no cache', False, True),
+        ('eager, move cache', True, True),
+        ('lazy, no cache', False, False),
+        ('lazy, move cache', True, False),
+    ):
+        times = sorted(t for seed in range(games) for t in turn_times(seed, plies, cached, eager))
+        mean = sum(times) / len(times)
+        p95 = times[int(len(times) * 0.95)]
+        print(
+            f'{label:>18}: {len(times)} turns, mean {mean * 1e6:7.1f} us, '
+            f'p95 {p95 * 1e6:7.1f} us'
+        )
+
+
+if __name__ == '__main__':
+    main()
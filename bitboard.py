@@ -0,0 +1,677 @@
+import struct
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from board import Board
+
+from attack_tables import (
+    BETWEEN,
+    BISHOP_RAYS,
+    CASTLING_MASK,
+    CASTLING_ROOKS,
+    FULL,
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    PAWN_ATTACKS,
+    ROOK_RAYS,
+    bishop_attacks,
+    rook_attacks,
+)
+from constants import BISHOP, BLACK, COLOR_NAMES, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE
+from moves import (
+    CAPTURE,
+    DOUBLE_PUSH,
+    EN_PASSANT,
+    FEN_PIECES,
+    KING_CASTLE,
+    PROMOTION,
+    PROMOTION_PIECES,
+    QUEEN_CASTLE,
+    MoveBuffer,
+    parse_square,
+    square_name,
+)
+from zobrist import CASTLING_KEYS, EP_KEYS, PIECE_KEYS, SIDE_KEY, KeyHistory
+
+FILE_A: int = 0x0101010101010101
+FILE_H: int = FILE_A << 7
+RANK_1: int = 0xFF
+RANK_3: int = RANK_1 << 16
+RANK_6: int = RANK_1 << 40
+RANK_8: int = RANK_1 << 56
+
+# Move flags already shifted into place (see moves.py)
+CAPTURE_FLAG: int = CAPTURE << 12
+DOUBLE_PUSH_FLAG: int = DOUBLE_PUSH << 12
+EN_PASSANT_FLAG: int = EN_PASSANT << 12
+KING_CASTLE_FLAG: int = KING_CASTLE << 12
+QUEEN_CASTLE_FLAG: int = QUEEN_CASTLE << 12
+PROMOTION_FLAGS: Tuple[int, ...] = tuple(
+    (PROMOTION | index) << 12 for index in (3, 2, 1, 0)
+)  # queen first
+
+STARTING_FEN: str = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+# Snapshot layout: mailbox codes + 1, side, castling, en passant square, halfmove clock,
+# fullmove number, followed by the keys of the positions since the last irreversible move
+SNAPSHOT_HEADER: struct.Struct = struct.Struct('<64sBBbHH')
+
+CASTLING_LETTERS: Tuple[Tuple[str, int], ...] = (('K', 1), ('Q', 2), ('k', 4), ('q', 8))
+# FEN piece letter -> colour * 6 + piece type
+FEN_CODES: Dict[str, int] = {
+    letter: color * 6 + piece_type
+    for piece_type, lower in enumerate(FEN_PIECES)
+    for color, letter in ((WHITE, lower.upper()), (BLACK, lower))
+}
+
+
+class BitboardPosition:
+    """
+    Position kept as one 64-bit mask per colour and piece type.
+    Generates fully legal moves without touching Square or Piece objects.
+    """
+
+    __slots__ = (
+        'boards',
+        'occupancy',
+        'mailbox',
+        'side',
+        'castling',
+        'ep_square',
+        'halfmove_clock',
+        'fullmove_number',
+        'key',
+        'history',
+    )
+
+    def __init__(self) -> None:
+        self.boards: List[int] = [0] * 12  # indexed by color * 6 + piece type
+        self.occupancy: List[int] = [0, 0]
+        self.mailbox: List[int] = [-1] * 64  # color * 6 + piece type, -1 when empty
+        self.side: int = WHITE
+        self.castling: int = 0
+        self.ep_square: int = -1
+        self.halfmove_clock: int = 0
+        self.fullmove_number: int = 1
+        self.key: int = 0  # Zobrist key, see zobrist.py
+        self.history: KeyHistory = KeyHistory()
+
+    @classmethod
+    def from_fen(cls, fen: str) -> 'BitboardPosition':
+        """
+        Builds a position from a FEN string
+        :param fen: Forsyth-Edwards Notation; the move counters may be omitted (EPD)
+        :return: A BitboardPosition
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f'Invalid FEN: {fen}')
+        position = cls()
+        ranks = fields[0].split('/')
+        if len(ranks) != 8:
+            raise ValueError(f'Invalid FEN: {fen}')
+        mailbox, boards, occupancy = position.mailbox, position.boards, position.occupancy
+        key = 0
+        for first, placement in zip(range(56, -8, -8), ranks):
+            sq, end = first, first + 8
+            for char in placement:
+                code = FEN_CODES.get(char)
+                if code is None:
+                    if char not in '12345678':
+                        raise ValueError(f'Invalid FEN: {fen}')
+                    sq += ord(char) - 48
+                    continue
+                if sq >= end:
+                    raise ValueError(f'Invalid FEN: {fen}')
+                # Inlined put_piece, as bulk loading spends most of its time here
+                bit = 1 << sq
+                boards[code] |= bit
+                occupancy[BLACK if code >= 6 else WHITE] |= bit
+                mailbox[sq] = code
+                key ^= PIECE_KEYS[code][sq]
+                sq += 1
+            if sq != end:
+                raise ValueError(f'Invalid FEN: {fen}')
+        if fields[1] not in ('w', 'b'):
+            raise ValueError(f'Invalid FEN: {fen}')
+        position.side = WHITE if fields[1] == 'w' else BLACK
+        for letter, right in CASTLING_LETTERS:
+            if letter in fields[2]:
+                position.castling |= right
+        position.ep_square = -1 if fields[3] == '-' else parse_square(fields[3])
+        if len(fields) >= 6:
+            position.halfmove_clock = int(fields[4])
+            position.fullmove_number = int(fields[5])
+        # The pieces' part of compute_key was gathered while placing them
+        key ^= CASTLING_KEYS[position.castling] ^ position.ep_key()
+        position.key = key ^ SIDE_KEY if position.side == BLACK else key
+        return position
+
+    def fen(self) -> str:
+        """
+        Serialises the position to a FEN string
+        """
+        ranks = []
+        for rank in range(7, -1, -1):
+            placement = ''
+            empty = 0
+            for file in range(8):
+                code = self.mailbox[rank * 8 + file]
+                if code < 0:
+                    empty += 1
+                    continue
+                if empty:
+                    placement += str(empty)
+                    empty = 0
+                letter = FEN_PIECES[code % 6]
+                placement += letter.upper() if code < 6 else letter
+            if empty:
+                placement += str(empty)
+            ranks.append(placement)
+        castling = (
+            ''.join(letter for letter, right in CASTLING_LETTERS if self.castling & right) or '-'
+        )
+        ep_square = square_name(self.ep_square) if self.ep_square >= 0 else '-'
+        return (
+            f"{'/'.join(ranks)} {'w' if self.side == WHITE else 'b'} {castling} {ep_square} "
+            f'{self.halfmove_clock} {self.fullmove_number}'
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact snapshot of the position for sending to other processes
+        """
+        recent = self.history.keys[max(len(self.history) - self.halfmove_clock, 0) :]
+        return (
+            SNAPSHOT_HEADER.pack(
+                bytes(code + 1 for code in self.mailbox),
+                self.side,
+                self.castling,
+                self.ep_square,
+                self.halfmove_clock,
+                self.fullmove_number,
+            )
+            + recent.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BitboardPosition':
+        """
+        Rebuilds a position from to_bytes output
+        """
+        position = cls()
+        (
+            mailbox,
+            position.side,
+            position.castling,
+            position.ep_square,
+            position.halfmove_clock,
+            position.fullmove_number,
+        ) = SNAPSHOT_HEADER.unpack_from(data)
+        for sq, code in enumerate(mailbox):
+            if code:
+                position.put_piece(sq, (code - 1) // 6, (code - 1) % 6)
+        position.history.keys.frombytes(data[SNAPSHOT_HEADER.size :])
+        position.key = position.compute_key()
+        return position
+
+    @classmethod
+    def from_board(cls, board: 'Board', color: str) -> 'BitboardPosition':
+        """
+        Builds a position from the object model
+        :param board: Board to read pieces, castling and en passant state from
+        :param color: Colour to move
+        :return: A BitboardPosition
+        """
+        position = cls()
+        position.side = COLOR_NAMES.index(color)
+        for square in board.grid:
+            piece = square.piece
+            if piece is not None:
+                position.put_piece(square.index, COLOR_NAMES.index(piece.color), piece.kind)
+        position.castling = board.castling
+        # The board's en passant square belongs to whoever moves next
+        ep_square = board.ep_square
+        if ep_square is not None and ep_square.row == (6 if color == 'White' else 3):
+            position.ep_square = ep_square.index
+        position.halfmove_clock = board.halfmove_clock
+        position.key = position.compute_key()
+        # Keys match the board's, so earlier positions still count towards repetitions
+        position.history.keys.extend(board.history.keys)
+        return position
+
+    def put_piece(self, sq: int, color: int, piece_type: int) -> None:
+        bit = 1 << sq
+        self.boards[color * 6 + piece_type] |= bit
+        self.occupancy[color] |= bit
+        self.mailbox[sq] = color * 6 + piece_type
+
+    def remove_piece(self, sq: int) -> None:
+        code = self.mailbox[sq]
+        bit = 1 << sq
+        self.boards[code] ^= bit
+        self.occupancy[code // 6] ^= bit
+        self.mailbox[sq] = -1
+
+    def ep_key(self) -> int:
+        """
+        Key of the en passant file, or 0 when no pawn of the side to move can capture there
+        """
+        ep_square = self.ep_square
+        if (
+            ep_square >= 0
+            and PAWN_ATTACKS[self.side ^ 1][ep_square] & self.boards[self.side * 6 + PAWN]
+        ):
+            return EP_KEYS[ep_square & 7]
+        return 0
+
+    def compute_key(self) -> int:
+        """
+        Zobrist key of the position computed from scratch.
+        make_move keeps `key` up to date incrementally
+        """
+        key = CASTLING_KEYS[self.castling] ^ self.ep_key()
+        if self.side == BLACK:
+            key ^= SIDE_KEY
+        for sq, code in enumerate(self.mailbox):
+            if code >= 0:
+                key ^= PIECE_KEYS[code][sq]
+        return key
+
+    def repetitions(self) -> int:
+        """
+        Number of earlier occurrences of the current position since the last irreversible move
+        """
+        return self.history.repetitions(self.key, self.halfmove_clock)
+
+    def is_fifty_move_draw(self) -> bool:
+        return self.halfmove_clock >= 100
+
+    def king_square(self, color: int) -> int:
+        return self.boards[color * 6 + KING].bit_length() - 1
+
+    def attackers_to(self, sq: int, color: int, occupied: int) -> int:
+        """
+        Mask of the pieces of the given colour attacking a square
+        """
+        boards = self.boards
+        base = color * 6
+        queens = boards[base + QUEEN]
+        attackers = (
+            (KNIGHT_ATTACKS[sq] & boards[base + KNIGHT])
+            | (KING_ATTACKS[sq] & boards[base + KING])
+            | (PAWN_ATTACKS[color ^ 1][sq] & boards[base + PAWN])
+        )
+        bishops = (boards[base + BISHOP] | queens) & BISHOP_RAYS[sq]
+        if bishops:
+            attackers |= bishop_attacks(sq, occupied) & bishops
+        rooks = (boards[base + ROOK] | queens) & ROOK_RAYS[sq]
+        if rooks:
+            attackers |= rook_attacks(sq, occupied) & rooks
+        return attackers
+
+    def is_attacked(self, sq: int, color: int, occupied: int) -> bool:
+        boards = self.boards
+        base = color * 6
+        if KNIGHT_ATTACKS[sq] & boards[base + KNIGHT]:
+            return True
+        if PAWN_ATTACKS[color ^ 1][sq] & boards[base + PAWN]:
+            return True
+        if KING_ATTACKS[sq] & boards[base + KING]:
+            return True
+        queens = boards[base + QUEEN]
+        bishops = (boards[base + BISHOP] | queens) & BISHOP_RAYS[sq]
+        if bishops and bishop_attacks(sq, occupied) & bishops:
+            return True
+        rooks = (boards[base + ROOK] | queens) & ROOK_RAYS[sq]
+        return bool(rooks and rook_attacks(sq, occupied) & rooks)
+
+    def in_check(self) -> bool:
+        occupied = self.occupancy[0] | self.occupancy[1]
+        return self.is_attacked(self.king_square(self.side), self.side ^ 1, occupied)
+
+    def legal_moves(self) -> List[int]:
+        """
+        Lists every legal move for the side to move
+        :return: list of packed moves (see moves.py)
+        """
+        buffer = MoveBuffer()
+        self.generate_moves(buffer)
+        return buffer.tolist()
+
+    def generate_moves(self, buffer: MoveBuffer) -> int:
+        """
+        Writes every legal move for the side to move into a reusable buffer
+        :return: Number of moves written
+        """
+        us = self.side
+        them = us ^ 1
+        boards = self.boards
+        base = us * 6
+        own = self.occupancy[us]
+        enemy = self.occupancy[them]
+        occupied = own | enemy
+        king_sq = boards[base + KING].bit_length() - 1
+        moves = buffer.moves
+        n = 0
+
+        # King steps, tested with the king lifted off the board so it cannot hide behind itself
+        without_king = occupied ^ (1 << king_sq)
+        targets = KING_ATTACKS[king_sq] & ~own
+        while targets:
+            bit = targets & -targets
+            targets ^= bit
+            to = bit.bit_length() - 1
+            if not self.is_attacked(to, them, without_king):
+                moves[n] = king_sq | to << 6 | (CAPTURE_FLAG if bit & enemy else 0)
+                n += 1
+
+        checkers = self.attackers_to(king_sq, them, occupied)
+        if checkers & (checkers - 1):
+            buffer.count = n
+            return n
+        if checkers:
+            mask = checkers | BETWEEN[king_sq][checkers.bit_length() - 1]
+        else:
+            mask = FULL
+
+        # Pins: enemy sliders lined up with the king with exactly one of our pieces in between
+        tbase = them * 6
+        queens = boards[tbase + QUEEN]
+        snipers = (ROOK_RAYS[king_sq] & (boards[tbase + ROOK] | queens)) | (
+            BISHOP_RAYS[king_sq] & (boards[tbase + BISHOP] | queens)
+        )
+        pinned = 0
+        pin_rays: Dict[int, int] = {}
+        between_king = BETWEEN[king_sq]
+        while snipers:
+            bit = snipers & -snipers
+            snipers ^= bit
+            blockers = between_king[bit.bit_length() - 1] & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+                pin_rays[blockers.bit_length() - 1] = between_king[bit.bit_length() - 1] | bit
+
+        not_own = ~own & mask
+
+        pieces = boards[base + KNIGHT] & ~pinned
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            frm = bit.bit_length() - 1
+            targets = KNIGHT_ATTACKS[frm] & not_own
+            while targets:
+                tbit = targets & -targets
+                targets ^= tbit
+                moves[n] = (
+                    frm | (tbit.bit_length() - 1) << 6 | (CAPTURE_FLAG if tbit & enemy else 0)
+                )
+                n += 1
+
+        for piece_type, attacks in ((BISHOP, bishop_attacks), (ROOK, rook_attacks), (QUEEN, None)):
+            pieces = boards[base + piece_type]
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                frm = bit.bit_length() - 1
+                if attacks is None:
+                    targets = (
+                        bishop_attacks(frm, occupied) | rook_attacks(frm, occupied)
+                    ) & not_own
+                else:
+                    targets = attacks(frm, occupied) & not_own
+                if bit & pinned:
+                    targets &= pin_rays[frm]
+                while targets:
+                    tbit = targets & -targets
+                    targets ^= tbit
+                    moves[n] = (
+                        frm | (tbit.bit_length() - 1) << 6 | (CAPTURE_FLAG if tbit & enemy else 0)
+                    )
+                    n += 1
+
+        empty = ~occupied & FULL
+        pawns = boards[base + PAWN]
+        free = pawns & ~pinned
+        if us == WHITE:
+            push = 8
+            single = (free << 8) & empty
+            double = ((single & RANK_3) << 8) & empty
+            west = ((free & ~FILE_A) << 7) & enemy
+            east = ((free & ~FILE_H) << 9) & enemy
+            last_rank = RANK_8
+        else:
+            push = -8
+            single = (free >> 8) & empty
+            double = ((single & RANK_6) >> 8) & empty
+            west = ((free & ~FILE_A) >> 9) & enemy
+            east = ((free & ~FILE_H) >> 7) & enemy
+            last_rank = RANK_1
+        for targets, offset, flags in (
+            (single & mask, push, 0),
+            (double & mask, 2 * push, DOUBLE_PUSH_FLAG),
+            (west & mask, push - 1, CAPTURE_FLAG),
+            (east & mask, push + 1, CAPTURE_FLAG),
+        ):
+            promotions = targets & last_rank
+            targets ^= promotions
+            while targets:
+                tbit = targets & -targets
+                targets ^= tbit
+                to = tbit.bit_length() - 1
+                moves[n] = (to - offset) | to << 6 | flags
+                n += 1
+            while promotions:
+                tbit = promotions & -promotions
+                promotions ^= tbit
+                to = tbit.bit_length() - 1
+                for promotion in PROMOTION_FLAGS:
+                    moves[n] = (to - offset) | to << 6 | flags | promotion
+                    n += 1
+
+        # Pinned pawns can still move along the pin, so they are walked one at a time
+        pieces = pawns & pinned
+        start_rank = 1 if us == WHITE else 6
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            frm = bit.bit_length() - 1
+            targets = 0
+            one = frm + push
+            if (1 << one) & empty:
+                targets |= 1 << one
+                if frm >> 3 == start_rank and (1 << (one + push)) & empty:
+                    targets |= 1 << (one + push)
+            targets |= PAWN_ATTACKS[us][frm] & enemy
+            targets &= mask & pin_rays[frm]
+            while targets:
+                tbit = targets & -targets
+                targets ^= tbit
+                to = tbit.bit_length() - 1
+                if tbit & enemy:
+                    flags = CAPTURE_FLAG
+                elif to - frm == 2 * push:
+                    flags = DOUBLE_PUSH_FLAG
+                else:
+                    flags = 0
+                if tbit & last_rank:
+                    for promotion in PROMOTION_FLAGS:
+                        moves[n] = frm | to << 6 | flags | promotion
+                        n += 1
+                else:
+                    moves[n] = frm | to << 6 | flags
+                    n += 1
+
+        # En passant can expose the king along the rank of both pawns,
+        # so it is tested on the resulting occupancy
+        ep_square = self.ep_square
+        if ep_square >= 0:
+            captured = ep_square - push
+            pieces = PAWN_ATTACKS[them][ep_square] & pawns
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                after = (occupied ^ bit ^ (1 << captured)) | (1 << ep_square)
+                if not self.attackers_to(king_sq, them, after) & ~(1 << captured):
+                    moves[n] = (bit.bit_length() - 1) | ep_square << 6 | EN_PASSANT_FLAG
+                    n += 1
+
+        if not checkers and self.castling:
+            rights = self.castling >> (2 * us)
+            if rights & 1:
+                f, g = king_sq + 1, king_sq + 2
+                if (
+                    not occupied & ((1 << f) | (1 << g))
+                    and not self.is_attacked(f, them, occupied)
+                    and not self.is_attacked(g, them, occupied)
+                ):
+                    moves[n] = king_sq | g << 6 | KING_CASTLE_FLAG
+                    n += 1
+            if rights & 2:
+                d, c, b = king_sq - 1, king_sq - 2, king_sq - 3
+                if (
+                    not occupied & ((1 << d) | (1 << c) | (1 << b))
+                    and not self.is_attacked(d, them, occupied)
+                    and not self.is_attacked(c, them, occupied)
+                ):
+                    moves[n] = king_sq | c << 6 | QUEEN_CASTLE_FLAG
+                    n += 1
+
+        buffer.count = n
+        return n
+
+    def make_move(self, move: int) -> int:
+        """
+        Plays a legal move in place
+        :param move: Packed move (see moves.py)
+        :return: Undo record for unmake_move, packed into an int: move | captured code + 1 << 16
+                 | castling << 20 | en passant + 1 << 24 | halfmove clock << 31
+        """
+        frm = move & 63
+        to = move >> 6 & 63
+        flags = move >> 12
+        mailbox = self.mailbox
+        piece_type = mailbox[frm] % 6
+        us = self.side
+        captured = mailbox[to]
+        undo = (
+            move
+            | (captured + 1) << 16
+            | self.castling << 20
+            | (self.ep_square + 1) << 24
+            | self.halfmove_clock << 31
+        )
+        self.history.push(self.key)
+        key = self.key ^ SIDE_KEY ^ CASTLING_KEYS[self.castling]
+        if self.ep_square >= 0:
+            key ^= self.ep_key()
+
+        if captured >= 0:
+            self.remove_piece(to)
+            key ^= PIECE_KEYS[captured][to]
+        self.remove_piece(frm)
+        placed = PROMOTION_PIECES[flags & 3] if flags & PROMOTION else piece_type
+        self.put_piece(to, us, placed)
+        key ^= PIECE_KEYS[us * 6 + piece_type][frm] ^ PIECE_KEYS[us * 6 + placed][to]
+
+        if piece_type == PAWN or captured >= 0:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if flags == EN_PASSANT:
+            captured_sq = to - 8 if us == WHITE else to + 8
+            self.remove_piece(captured_sq)
+            key ^= PIECE_KEYS[(us ^ 1) * 6 + PAWN][captured_sq]
+        elif flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to]
+            self.remove_piece(rook_from)
+            self.put_piece(rook_to, us, ROOK)
+            key ^= PIECE_KEYS[us * 6 + ROOK][rook_from] ^ PIECE_KEYS[us * 6 + ROOK][rook_to]
+
+        self.ep_square = (frm + to) >> 1 if flags == DOUBLE_PUSH else -1
+        self.castling &= CASTLING_MASK[frm] & CASTLING_MASK[to]
+        if us == BLACK:
+            self.fullmove_number += 1
+        self.side = us ^ 1
+        key ^= CASTLING_KEYS[self.castling]
+        if self.ep_square >= 0:
+            key ^= self.ep_key()
+        self.key = key
+        return undo
+
+    def unmake_move(self, undo: int) -> None:
+        """
+        Reverts the move that produced the undo record
+        """
+        frm = undo & 63
+        to = undo >> 6 & 63
+        flags = undo >> 12 & 15
+        captured = (undo >> 16 & 15) - 1
+        them = self.side
+        us = them ^ 1
+        self.side = us
+        if us == BLACK:
+            self.fullmove_number -= 1
+        self.castling = undo >> 20 & 15
+        self.ep_square = (undo >> 24 & 127) - 1
+        self.halfmove_clock = undo >> 31
+        self.key = self.history.pop()
+
+        piece_type = PAWN if flags & PROMOTION else self.mailbox[to] % 6
+        self.remove_piece(to)
+        self.put_piece(frm, us, piece_type)
+        if captured >= 0:
+            self.put_piece(to, them, captured % 6)
+        elif flags == EN_PASSANT:
+            self.put_piece(to - 8 if us == WHITE else to + 8, them, PAWN)
+        elif flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to]
+            self.remove_piece(rook_to)
+            self.put_piece(rook_from, us, ROOK)
+
+
+class BitboardMoveGenerator:
+    """
+    Legal move source for Player backed by the BitboardPosition the board keeps in step.
+    Moves are handed out packed, and the last list is reused until the board changes.
+    """
+
+    def __init__(self) -> None:
+        # The list last generated and the board, Board.version and side it was generated for
+        self.board: Optional['Board'] = None
+        self.version: int = -1
+        self.side: int = -1
+        self.moves: List[int] = []
+
+    def legal_moves(self, board: 'Board', color: str) -> List[int]:
+        """
+        Finds the legal moves of the given colour
+        :param board: Board to generate moves on
+        :param color: Colour to move
+        :return: Packed moves (see moves.py), one per promotion piece; not to be modified
+        """
+        side = COLOR_NAMES.index(color)
+        if board is self.board and board.version == self.version and side == self.side:
+            return self.moves
+        position = board.position
+        if position is None:
+            moves = BitboardPosition.from_board(board, color).legal_moves()
+        elif position.side == side:
+            moves = position.legal_moves()
+        else:
+            # The side not to move, e.g. Black's player when a game starts: its moves are
+            # generated with the move handed over, and without the opponent's en passant square
+            ep_square = position.ep_square
+            position.side, position.ep_square = side, -1
+            try:
+                moves = position.legal_moves()
+            finally:
+                position.side, position.ep_square = side ^ 1, ep_square
+        self.board, self.version, self.side, self.moves = board, board.version, side, moves
+        return moves
+
+    def clear(self) -> None:
+        """
+        Forgets the last list, so the next legal_moves generates the moves again
+        """
+        self.board = None
+        self.moves = []
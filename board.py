@@ -1,40 +1,50 @@
 from pieces import Piece, Pawn, Rook, Knight, Bishop, Queen, King
+from attack_tables import CASTLING_MASK, CASTLING_ROOKS, FULL, PAWN_SQUARES, square_index
+from zobrist import CASTLING_KEYS, EP_KEYS, PIECE_KEYS, SIDE_KEY, KeyHistory
+from evaluation import PIECE_VALUES
 from constants import (
-    COLOR_BOARD_LIGHT,
-    COLOR_BOARD_DARK,
-    COLOR_HIGHLIGHT,
-    COLOR_CHECK_HIGHLIGHT,
-    SCREEN_WIDTH,
-    TILE_SIZE
+    BLACK,
+    BISHOP,
+    COLOR_NAMES,
+    KING,
+    KNIGHT,
+    PAWN,
+    QUEEN,
+    ROOK,
+    WHITE
 )
-from typing import TYPE_CHECKING, Optional, List
+from moves import (
+    CAPTURE,
+    DOUBLE_PUSH,
+    EN_PASSANT,
+    KING_CASTLE,
+    PROMOTION,
+    PROMOTION_FLAGS,
+    PROMOTION_PIECES,
+    QUEEN_CASTLE,
+    QUIET,
+    encode_move
+)
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, NamedTuple, Optional, List, Tuple
 if TYPE_CHECKING:
-    from assets import AssetManager
-import pygame
-
-pygame.init()
+    from bitboard import BitboardMoveGenerator
+from bitboard import BitboardPosition
+from rules_engine import MoveValidator
 
 
 class Square:
-    white = COLOR_BOARD_LIGHT
-    black = COLOR_BOARD_DARK
-    highlight = COLOR_HIGHLIGHT
-    check_highlight = COLOR_CHECK_HIGHLIGHT
-    home_piece = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-    # home_piece = [None, Knight, Bishop, None, King, None, None, None]
+    """
+    A square of the game model; where and how it is drawn is kept by view.BoardView
+    """
+    __slots__ = ('column', 'row', 'index', 'bit', 'piece')
 
-    def __init__(self, board, row: int, column: int, color, x: int, y: int, length: int) -> None:
-        self.board = board
+    def __init__(self, row: int, column: int) -> None:
         self.column: int = column
         self.row: int = row
-        self.color = color
-        self.x: int = x
-        self.y: int = y
-        self.length: int = length
-        self.piece: Optional[Piece] = self.get_home_piece()
-        self.highlighted: bool = False
-        self.selected_highlighted: bool = False
-        self.check_highlighted: bool = False
+        self.index: int = square_index(row, column)
+        self.bit: int = 1 << self.index
+        self.piece: Optional[Piece] = None
 
     def __repr__(self) -> str:
         return f'{self.get_name()} -> {self.piece}'
@@ -45,37 +55,85 @@ class Square:
     def get_name(self) -> str:
         return f"{chr(ord('a') + self.column - 1)}{self.row}"
 
-    def get_home_piece(self) -> Optional[Piece]:
-        asset_manager = self.board.asset_manager
-        if self.row == 1:
-            return self.home_piece[self.column - 1](self.board, 'White', self, asset_manager)
-        elif self.row == 8:
-            return self.home_piece[self.column - 1](self.board, 'Black', self, asset_manager)
-        elif self.row == 2:
-            return Pawn(self.board, 'White', self, asset_manager)
-        elif self.row == 7:
-            return Pawn(self.board, 'Black', self, asset_manager)
-        return None
+
+# Packed 16-bit move (see moves.py), squares indexed like Board.grid
+Move = int
+
+PROMOTION_CLASSES = {QUEEN: Queen, ROOK: Rook, BISHOP: Bishop, KNIGHT: Knight}
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)  # indexed by piece type
+
+
+def light_square(index: int) -> int:
+    """
+    1 for a light square, 0 for a dark one (a1 is dark)
+    """
+    return ((index >> 3) ^ index) & 1
 
 
+def piece_code(piece: Piece) -> int:
+    """
+    Index of the piece in the bitboard and Zobrist tables (colour * 6 + kind)
+    """
+    return (6 if piece.color == 'Black' else 0) + piece.kind
+
+
+class UndoRecord(NamedTuple):
+    move: Move
+    captured: Optional[Piece]
+    captured_index: int
+    castling: int
+    ep_square: Optional[Square]
+    pawn: Optional[Piece]  # the pawn replaced by a promotion
+    rook_hop: Optional[Tuple[int, int]]
+    halfmove_clock: int
+    position_undo: int = 0  # BitboardPosition undo record when the board keeps one in step
+    changed: int = 0  # bitmask of the squares the move touches, see Board.changes_since
 
 
 class Board:
-    def __init__(self, asset_manager: 'AssetManager', move_validator: 'MoveValidator') -> None:
-        self.asset_manager: 'AssetManager' = asset_manager
+    home_piece = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
+    # home_piece = [None, Knight, Bishop, None, King, None, None, None]
+    # Moves made or unmade that changes_since can look back over
+    change_log_length: int = 64
+
+    def __init__(self, move_validator: 'MoveValidator',
+                 move_generator: Optional['BitboardMoveGenerator'] = None) -> None:
         self.move_validator: 'MoveValidator' = move_validator
-        self.length: int = SCREEN_WIDTH
-        self.x: int = 0
-        self.y: int = 0
-        self.square_length: int = TILE_SIZE
+        self.move_generator: Optional['BitboardMoveGenerator'] = move_generator
         self.squares: List[List[Square]] = self.make_squares()
+        # Same squares indexed a1 = 0 .. h8 = 63 for the attack tables
+        self.grid: List[Square] = sorted((square for row in self.squares for square in row),
+                                         key=lambda square: square.index)
         white_king_square = self.get_square(1, 5)
         black_king_square = self.get_square(8, 5)
         assert white_king_square is not None and white_king_square.piece is not None
         assert black_king_square is not None and black_king_square.piece is not None
         self.kings: dict = {'White': white_king_square.piece,
                       'Black': black_king_square.piece}
+        self.castling: int = 15
+        self.ep_square: Optional[Square] = None
         self.promoting_pawn: Optional[Piece] = None
+        self.promotion_square: Optional[Square] = None
+        self.turn: int = WHITE
+        self.halfmove_clock: int = 0  # plies since the last capture or pawn move
+        self.fullmove_number: int = 1  # incremented after each Black move, as in FEN
+        # (pawn, kind) -> promoted piece, see promoted_piece
+        self.promotions: Dict[Tuple[Piece, int], Piece] = {}
+        self.key: int = self.compute_key()  # Zobrist key, updated by make_move
+        # Pieces of each kind, indexed [colour][kind], and bishops on dark and light squares,
+        # indexed [colour][light_square]; updated on capture and promotion
+        self.piece_counts: List[List[int]] = [[0] * 6, [0] * 6]
+        self.bishop_squares: List[List[int]] = [[0, 0], [0, 0]]
+        self.count_material()
+        self.history: KeyHistory = KeyHistory()
+        # Squares touched by each recent change to the board, newest last, see changes_since
+        self.changes: Deque[int] = deque(maxlen=self.change_log_length)
+        self.version: int = 0  # number of changes made to the board
+        # Kept in step by make_move/unmake_move,
+        # so the bitboard generator never rebuilds it from the squares
+        self.position: Optional[BitboardPosition] = None
+        if move_generator is not None:
+            self.position = BitboardPosition.from_board(self, 'White')
 
     def get_square(self, row: int, column: int) -> Optional[Square]:
         """
@@ -91,37 +149,348 @@ class Board:
     def make_squares(self) -> List[List[Square]]:
         """
         This method creates the board representation matrix
-        :return:  8*8 matrix of "Square" objects
+        :return:  8*8 matrix of "Square" objects, rank 8 first, holding the initial position
         """
         squares = []
-        x, y = self.x, self.y
 
         for j in range(8, 0, -1):
-            color = Square.white if j % 2 == 0 else Square.black
             row = []
             for i in range(8):
-                if i != 0:
-                    color = Square.white if color == Square.black else Square.black
-                square = Square(self, j, i + 1, color, x, y, self.square_length)
+                square = Square(j, i + 1)
+                square.piece = self.get_home_piece(square)
                 row.append(square)
-                x += self.square_length
             squares.append(row)
-            x = self.x
-            y += self.square_length
 
         return squares
 
+    def get_home_piece(self, square: Square) -> Optional[Piece]:
+        if square.row == 1:
+            return self.home_piece[square.column - 1](self, 'White', square)
+        elif square.row == 8:
+            return self.home_piece[square.column - 1](self, 'Black', square)
+        elif square.row == 2:
+            return Pawn(self, 'White', square)
+        elif square.row == 7:
+            return Pawn(self, 'Black', square)
+        return None
 
+    def load_fen(self, fen: str) -> None:
+        """
+        Replaces the pieces and game state with the position described by a FEN string
+        :param fen: Forsyth-Edwards Notation; the move counters may be omitted (EPD)
+        """
+        self.load_position(BitboardPosition.from_fen(fen))
 
-    def get_clicked_square(self, x, y):
+    def load_position(self, position: BitboardPosition) -> None:
         """
-        This method will take the coordinates and return what square the coordinate is on
-        :param x: x-coordinate
-        :param y: y-coordinate
-        :return: "Square" object
+        Replaces the pieces and game state with those of a bitboard position,
+        e.g. one read by epd.py
         """
-        if x < self.x or y < self.y or x >= self.x + self.length or y >= self.y + self.length:
-            return None
-        i = (x - self.x) // self.square_length
-        j = (y - self.y) // self.square_length
-        return self.squares[j][i]
+        kings = {}
+        for square in self.grid:
+            if square.piece is not None:
+                square.piece.square = None
+            code = position.mailbox[square.index]
+            if code < 0:
+                square.piece = None
+                continue
+            color = COLOR_NAMES[code // 6]
+            square.piece = PIECE_CLASSES[code % 6](self, color, square)
+            if code % 6 == KING:
+                if color in kings:
+                    raise ValueError(f'Invalid FEN: {position.fen()}')
+                kings[color] = square.piece
+        if len(kings) != 2:
+            raise ValueError(f'Invalid FEN: {position.fen()}')
+        self.kings = kings
+        self.castling = position.castling
+        self.ep_square = self.grid[position.ep_square] if position.ep_square >= 0 else None
+        self.promoting_pawn = None
+        self.promotion_square = None
+        self.promotions = {}
+        self.turn = position.side
+        self.halfmove_clock = position.halfmove_clock
+        self.fullmove_number = position.fullmove_number
+        self.key = self.compute_key()
+        self.count_material()
+        self.history = KeyHistory()
+        self.mark_changed(FULL)
+        if self.position is not None:
+            self.position = BitboardPosition.from_board(self, COLOR_NAMES[self.turn])
+
+    @classmethod
+    def from_fen(cls, fen: str, move_validator: Optional['MoveValidator'] = None,
+                 move_generator: Optional['BitboardMoveGenerator'] = None) -> 'Board':
+        """
+        Builds a board holding the position described by a FEN string
+        :param fen: Forsyth-Edwards Notation; the move counters may be omitted (EPD)
+        :param move_validator: Rules validator, a new MoveValidator when omitted
+        :param move_generator: Optional bitboard move generator, see Board.__init__
+        :return: A Board
+        """
+        board = cls(move_validator or MoveValidator(), move_generator)
+        board.load_fen(fen)
+        return board
+
+    def to_fen(self) -> str:
+        """
+        Serialises the position to a FEN string
+        """
+        position = BitboardPosition.from_board(self, COLOR_NAMES[self.turn])
+        position.fullmove_number = self.fullmove_number
+        return position.fen()
+
+    def mark_changed(self, changed: int) -> None:
+        """
+        Records that the pieces on some squares, or the en passant square, changed
+        :param changed: Bitmask of the squares, indexed like grid
+        """
+        self.changes.append(changed)
+        self.version += 1
+
+    def changes_since(self, version: int) -> int:
+        """
+        Finds every square changed after the board was at the given version
+        :param version: An earlier value of `version`
+        :return: Bitmask of the squares, all of them when the change log no longer reaches back
+        """
+        missed = self.version - version
+        changes = self.changes
+        if missed > len(changes):
+            return FULL
+        changed = 0
+        for i in range(1, missed + 1):
+            changed |= changes[-i]
+        return changed
+
+    def ep_key(self) -> int:
+        """
+        Key of the en passant file, or 0 when no pawn of the side to move can capture there
+        """
+        if self.ep_square is None:
+            return 0
+        color = 'White' if self.turn == WHITE else 'Black'
+        for index in PAWN_SQUARES[self.turn ^ 1][self.ep_square.index]:
+            piece = self.grid[index].piece
+            if piece is not None and piece.kind == PAWN and piece.color == color:
+                return EP_KEYS[self.ep_square.column - 1]
+        return 0
+
+    def compute_key(self) -> int:
+        """
+        Zobrist key of the position computed from scratch
+        :return: The same key as BitboardPosition.compute_key gives for this position
+        """
+        key = CASTLING_KEYS[self.castling] ^ self.ep_key()
+        if self.turn == BLACK:
+            key ^= SIDE_KEY
+        for square in self.grid:
+            piece = square.piece
+            if piece is not None:
+                key ^= PIECE_KEYS[piece_code(piece)][square.index]
+        return key
+
+    def count_material(self) -> None:
+        """
+        Sets the material counters from scratch
+        """
+        self.piece_counts = [[0] * 6, [0] * 6]
+        self.bishop_squares = [[0, 0], [0, 0]]
+        for square in self.grid:
+            if square.piece is not None:
+                self.count_piece(square.piece, square.index, 1)
+
+    def count_piece(self, piece: Piece, index: int, count: int) -> None:
+        """
+        Adds a piece to, or with count -1 takes it off, the material counters
+        :param index: Grid index of the piece's square
+        """
+        color = 0 if piece.color == 'White' else 1
+        self.piece_counts[color][piece.kind] += count
+        if piece.kind == BISHOP:
+            self.bishop_squares[color][light_square(index)] += count
+
+    def material(self) -> int:
+        """
+        Material balance from the counters, for evaluation
+        :return: White's material minus Black's in centipawns
+        """
+        white, black = self.piece_counts
+        return sum((white[kind] - black[kind]) * PIECE_VALUES[kind] for kind in range(KING))
+
+    def insufficient_material(self) -> bool:
+        """
+        Whether neither side can mate: kings alone, a single knight or bishop,
+        or one bishop each on squares of the same colour
+        """
+        white, black = self.piece_counts
+        if white[PAWN] or black[PAWN] or white[ROOK] or black[ROOK] or \
+                white[QUEEN] or black[QUEEN]:
+            return False
+        minors = white[KNIGHT] + white[BISHOP] + black[KNIGHT] + black[BISHOP]
+        if minors <= 1:
+            return True
+        if minors == 2 and white[BISHOP] == 1 and black[BISHOP] == 1:
+            return self.bishop_squares[WHITE] == self.bishop_squares[BLACK]
+        return False
+
+    def repetitions(self) -> int:
+        """
+        Number of earlier occurrences of the current position since the last capture or pawn move
+        """
+        return self.history.repetitions(self.key, self.halfmove_clock)
+
+    def is_threefold_repetition(self) -> bool:
+        return self.repetitions() >= 2
+
+    def is_fifty_move_draw(self) -> bool:
+        return self.halfmove_clock >= 100
+
+    def encode_move(self, frm: int, to: int, promotion: int = 0) -> Move:
+        """
+        Packs a move between two grid indices, deriving its flags from the current position
+        :param frm: Index of the square moved from
+        :param to: Index of the square moved to
+        :param promotion: Kind of the piece promoted to, or 0
+        :return: Packed move for make_move
+        """
+        piece = self.grid[frm].piece
+        flags = CAPTURE if self.grid[to].piece is not None else QUIET
+        if piece.kind == PAWN:
+            if promotion:
+                flags |= PROMOTION_FLAGS[promotion]
+            elif self.grid[to] is self.ep_square:
+                flags = EN_PASSANT
+            elif abs(to - frm) == 16:
+                flags = DOUBLE_PUSH
+        elif piece.kind == KING and abs(to - frm) == 2:
+            flags = KING_CASTLE if to > frm else QUEEN_CASTLE
+        return encode_move(frm, to, flags)
+
+    def promoted_piece(self, pawn: Piece, kind: int) -> Piece:
+        """
+        Finds the piece a pawn turns into.
+        Built once per pawn and kind, so replayed promotions reuse it
+        :param pawn: The promoting pawn
+        :param kind: Piece type promoted to
+        :return: A piece that is not on the board
+        """
+        promoted = self.promotions.get((pawn, kind))
+        if promoted is None:
+            promoted = PROMOTION_CLASSES[kind](self, pawn.color, None)
+            self.promotions[(pawn, kind)] = promoted
+        return promoted
+
+    def make_move(self, move: Move) -> UndoRecord:
+        """
+        Plays a legal move, including the rook hop of castling, en passant captures and promotion
+        :param move: Packed move, see encode_move
+        :return: Undo record for unmake_move
+        """
+        frm, to, flags = move & 63, move >> 6 & 63, move >> 12
+        grid = self.grid
+        origin = grid[frm]
+        target = grid[to]
+        piece = origin.piece
+        captured_index = to
+        if flags == EN_PASSANT:
+            captured_index = to - 8 if piece.color == 'White' else to + 8
+        captured = grid[captured_index].piece
+        rook_hop = CASTLING_ROOKS[to] if flags in (KING_CASTLE, QUEEN_CASTLE) else None
+        promotion = flags & PROMOTION
+        position_undo = self.position.make_move(move) if self.position is not None else 0
+        ep_square = grid[(frm + to) // 2] if flags == DOUBLE_PUSH else None
+        changed = origin.bit | target.bit | grid[captured_index].bit
+        if rook_hop is not None:
+            changed |= grid[rook_hop[0]].bit | grid[rook_hop[1]].bit
+        if self.ep_square is not None:
+            changed |= self.ep_square.bit
+        if ep_square is not None:
+            changed |= ep_square.bit
+        record = UndoRecord(move, captured, captured_index, self.castling, self.ep_square,
+                            piece if promotion else None, rook_hop, self.halfmove_clock,
+                            position_undo, changed)
+        self.mark_changed(changed)
+        self.history.push(self.key)
+        key = self.key ^ SIDE_KEY ^ CASTLING_KEYS[self.castling] ^ self.ep_key()
+        code = piece_code(piece)
+
+        if captured is not None:
+            grid[captured_index].piece = None
+            captured.square = None
+            key ^= PIECE_KEYS[piece_code(captured)][captured_index]
+            self.count_piece(captured, captured_index, -1)
+        origin.piece = None
+        target.piece = piece
+        piece.square = target
+        key ^= PIECE_KEYS[code][frm]
+
+        if promotion:
+            piece.square = None
+            promoted = self.promoted_piece(piece, PROMOTION_PIECES[flags & 3])
+            promoted.square = target
+            target.piece = promoted
+            key ^= PIECE_KEYS[code - PAWN + promoted.kind][to]
+            self.count_piece(piece, frm, -1)
+            self.count_piece(promoted, to, 1)
+        else:
+            key ^= PIECE_KEYS[code][to]
+            if rook_hop is not None:
+                rook_from, rook_to = rook_hop
+                rook = grid[rook_from].piece
+                grid[rook_from].piece = None
+                grid[rook_to].piece = rook
+                rook.square = grid[rook_to]
+                rook_code = piece_code(rook)
+                key ^= PIECE_KEYS[rook_code][rook_from] ^ PIECE_KEYS[rook_code][rook_to]
+
+        if piece.kind == PAWN or captured is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        self.ep_square = ep_square
+        self.castling &= CASTLING_MASK[frm] & CASTLING_MASK[to]
+        if self.turn == BLACK:
+            self.fullmove_number += 1
+        self.turn ^= 1
+        self.key = key ^ CASTLING_KEYS[self.castling] ^ self.ep_key()
+        return record
+
+    def unmake_move(self, record: UndoRecord) -> None:
+        """
+        Restores the position from before the move that produced the record
+        """
+        frm, to = record.move & 63, record.move >> 6 & 63
+        grid = self.grid
+        target = grid[to]
+        piece = target.piece
+        if record.pawn is not None:
+            piece.square = None
+            self.count_piece(piece, to, -1)
+            piece = record.pawn
+            self.count_piece(piece, frm, 1)
+        target.piece = None
+        grid[frm].piece = piece
+        piece.square = grid[frm]
+
+        if record.captured is not None:
+            grid[record.captured_index].piece = record.captured
+            record.captured.square = grid[record.captured_index]
+            self.count_piece(record.captured, record.captured_index, 1)
+        if record.rook_hop is not None:
+            rook_from, rook_to = record.rook_hop
+            rook = grid[rook_to].piece
+            grid[rook_to].piece = None
+            grid[rook_from].piece = rook
+            rook.square = grid[rook_from]
+
+        self.castling = record.castling
+        self.ep_square = record.ep_square
+        self.halfmove_clock = record.halfmove_clock
+        self.turn ^= 1
+        if self.turn == BLACK:
+            self.fullmove_number -= 1
+        self.key = self.history.pop()
+        self.mark_changed(record.changed)
+        if self.position is not None:
+            self.position.unmake_move(record.position_undo)
@@ -30,4 +30,17 @@ IMAGE_PATHS: Dict[str, str] = {
 }
 
 # Piece constants
-PIECE_COLORS: Dict[str, int] = {'Black': 0, 'White': 1}
\ No newline at end of file
+PIECE_COLORS: Dict[str, int] = {'Black': 0, 'White': 1}
+
+# Side and piece type codes shared by the rules engine and the bitboard core
+WHITE: int = 0
+BLACK: int = 1
+COLOR_NAMES: Tuple[str, str] = ('White', 'Black')
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_NAMES: Tuple[str, ...] = ('Pawn', 'Knight', 'Bishop', 'Rook', 'Queen', 'King')
+
+# Castling rights bits
+WHITE_KINGSIDE: int = 1
+WHITE_QUEENSIDE: int = 2
+BLACK_KINGSIDE: int = 4
+BLACK_QUEENSIDE: int = 8
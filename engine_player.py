@@ -0,0 +1,70 @@
+from typing import Optional
+
+from bitboard import BitboardPosition
+from moves import NULL_MOVE
+from parallel_search import ParallelSearcher
+from player import Player
+from search import MAX_PLY, Searcher, SearchInfo
+
+
+class EnginePlayer(Player):
+    """
+    Computer opponent that picks its moves with the alpha-beta search in search.py.
+    Clicks are ignored; the game loop calls make_engine_move when it is this player's turn.
+    """
+
+    is_engine = True
+
+    def __init__(
+        self,
+        board,
+        color,
+        think_time: float = 1.0,
+        max_depth: int = MAX_PLY,
+        hash_mb: float = 16,
+        workers: int = 1,
+    ) -> None:
+        """
+        :param workers: Processes to split the search across; 1 searches in this process
+        """
+        if workers > 1:
+            self.searcher = ParallelSearcher(workers, hash_mb)
+            # Workers boot while the opponent thinks instead of inside the first move's time budget
+            self.searcher.start()
+        else:
+            self.searcher = Searcher(hash_mb=hash_mb)
+        self.think_time: float = think_time
+        self.max_depth: int = max_depth
+        self.last_search: Optional[SearchInfo] = None
+        super().__init__(board, color)
+
+    def choose_move(self) -> int:
+        """
+        Searches the current position within the time budget
+        :return: Packed move for Board.make_move, NULL_MOVE when there is no legal move
+        """
+        position = BitboardPosition.from_board(self.board, self.color)
+        self.last_search = self.searcher.search(position, self.max_depth, self.think_time)
+        return self.last_search.best_move
+
+    def make_engine_move(self) -> bool:
+        """
+        Plays the engine's choice on the board
+        :return: Whether a move was played; the caller hands the turn over only then
+        """
+        move = self.choose_move()
+        if move == NULL_MOVE:
+            return False
+        self.board.make_move(move)
+        self.end_turn()
+        return True
+
+    def play(self, sq):
+        return 'Continue'
+
+    def close(self) -> None:
+        """
+        Stops any worker processes
+        """
+        if isinstance(self.searcher, ParallelSearcher):
+            self.searcher.close()
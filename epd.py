@@ -0,0 +1,130 @@
+import argparse
+import re
+import time
+from typing import IO, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from bitboard import BitboardPosition
+
+# An EPD operation: an opcode followed by operands up to the next semicolon outside quotes
+OPERATION = re.compile(r'\s*([A-Za-z]\w*)((?:\s*(?:"[^"]*"|[^\s;"]+))*)\s*;')
+
+
+class EpdRecord(NamedTuple):
+    line: int  # line number in the source, from 1
+    position: BitboardPosition
+    operations: Dict[str, str]  # opcode -> operands, e.g. {'bm': 'Nf3', 'id': '"WAC.001"'}
+
+
+def parse_operations(text: str) -> Dict[str, str]:
+    """
+    Reads the operations after the position fields of an EPD line
+    :param text: e.g. 'bm Nf3; id "WAC.001";'
+    :return: Mapping of opcode to its operands, unquoted text kept as written
+    """
+    operations = {}
+    end = 0
+    for match in OPERATION.finditer(text):
+        if match.start() != end:
+            break
+        operations[match.group(1)] = match.group(2).strip()
+        end = match.end()
+    if text[end:].strip():
+        raise ValueError(f'Invalid EPD operations: {text}')
+    return operations
+
+
+def parse_epd(line: str) -> Tuple[BitboardPosition, Dict[str, str]]:
+    """
+    Parses one EPD line, or a FEN line with its move counters
+    :return: The position and its EPD operations
+    """
+    fields = line.split(None, 4)
+    if len(fields) < 4:
+        raise ValueError(f'Invalid EPD: {line}')
+    rest = fields[4] if len(fields) == 5 else ''
+    # A FEN line carries the halfmove clock and fullmove number where EPD has its operations
+    counters = rest.split(None, 2)
+    if len(counters) >= 2 and counters[0].isdigit() and counters[1].isdigit():
+        fields[4:] = counters[:2]
+        rest = counters[2] if len(counters) == 3 else ''
+    else:
+        del fields[4:]
+    position = BitboardPosition.from_fen(' '.join(fields))
+    operations = parse_operations(rest) if rest else {}
+    if 'hmvc' in operations:
+        position.halfmove_clock = int(operations['hmvc'])
+    if 'fmvn' in operations:
+        position.fullmove_number = int(operations['fmvn'])
+    return position, operations
+
+
+def read_lines(source: Union[str, IO[str]]) -> Iterator[Tuple[int, str]]:
+    """
+    Streams the position lines of an EPD or FEN file without parsing them,
+    skipping blank lines and lines starting with '#'
+    :param source: Path of the file, or an open text file
+    :return: Iterator of (line number from 1, stripped line)
+    """
+    if isinstance(source, str):
+        with open(source) as file:
+            yield from read_lines(file)
+        return
+    for number, line in enumerate(source, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield number, line
+
+
+def read_epd(source: Union[str, IO[str]], skip_invalid: bool = False) -> Iterator[EpdRecord]:
+    """
+    Streams the positions of an EPD or FEN file one line at a time,
+    so files of any size are read in constant memory.
+    Blank lines and lines starting with '#' are skipped.
+    :param source: Path of the file, or an open text file
+    :param skip_invalid: Skip lines that do not parse instead of raising
+    :return: Iterator of EpdRecord
+    """
+    for number, line in read_lines(source):
+        try:
+            position, operations = parse_epd(line)
+        except ValueError as error:
+            if skip_invalid:
+                continue
+            raise ValueError(f'line {number}: {error}') from None
+        yield EpdRecord(number, position, operations)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load EPD/FEN positions and report the rate.')
+    parser.add_argument('path', help='EPD or FEN file, one position per line')
+    parser.add_argument('--limit', type=int, default=None, help='stop after this many positions')
+    parser.add_argument('--skip-invalid', action='store_true', help='skip lines that do not parse')
+    parser.add_argument(
+        '--objects',
+        action='store_true',
+        help='also load every position into the Square/Piece object model',
+    )
+    args = parser.parse_args(argv)
+
+    board = None
+    if args.objects:
+        from board import Board
+        from rules_engine import MoveValidator
+
+        board = Board(MoveValidator())
+    count = 0
+    start = time.perf_counter()
+    for record in read_epd(args.path, args.skip_invalid):
+        if board is not None:
+            board.load_position(record.position)
+        count += 1
+        if args.limit is not None and count >= args.limit:
+            break
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    print(f'{count} positions in {elapsed:.3f}s ({rate:,.0f} positions/s)')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    from bitboard import BitboardPosition
+
+from constants import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE
+
+# Centipawns, indexed by piece type
+PIECE_VALUES: Tuple[int, ...] = (100, 320, 330, 500, 900, 0)
+
+# Piece-square bonuses from White's point of view, written rank 8 first so they read like the board.
+# Black uses the same tables mirrored vertically.
+# fmt: off
+_PAWN = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+_KNIGHT = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+_BISHOP = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+_ROOK = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+)
+_QUEEN = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+)
+_KING = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+)
+# fmt: on
+
+
+def _square_values(piece_type: int, table: Tuple[int, ...]) -> Tuple[List[int], List[int]]:
+    value = PIECE_VALUES[piece_type]
+    # table[0] is a8, so White's square sq reads table[sq ^ 56] and Black's reads table[sq]
+    return [value + table[sq ^ 56] for sq in range(64)], [value + table[sq] for sq in range(64)]
+
+
+# Material plus placement, indexed [color * 6 + piece type][square]
+PIECE_SQUARE_VALUES: List[List[int]] = [[] for _ in range(12)]
+for _piece_type, _table in (
+    (PAWN, _PAWN),
+    (KNIGHT, _KNIGHT),
+    (BISHOP, _BISHOP),
+    (ROOK, _ROOK),
+    (QUEEN, _QUEEN),
+    (KING, _KING),
+):
+    PIECE_SQUARE_VALUES[_piece_type], PIECE_SQUARE_VALUES[6 + _piece_type] = _square_values(
+        _piece_type, _table
+    )
+
+
+def evaluate(position: 'BitboardPosition') -> int:
+    """
+    Static evaluation from the point of view of the side to move
+    :return: Score in centipawns
+    """
+    score = 0
+    values = PIECE_SQUARE_VALUES
+    for sq, code in enumerate(position.mailbox):
+        if code >= 0:
+            if code < 6:
+                score += values[code][sq]
+            else:
+                score -= values[code][sq]
+    return score if position.side == WHITE else -score
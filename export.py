@@ -0,0 +1,363 @@
+import argparse
+import io
+import multiprocessing
+import os
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pygame
+
+from assets import AssetManager
+from board import Board
+from constants import (
+    COLOR_BOARD_DARK,
+    COLOR_BOARD_LIGHT,
+    COLOR_CHECK_HIGHLIGHT,
+    COLOR_HIGHLIGHT,
+    IMAGE_PATHS,
+)
+from epd import parse_epd, read_lines
+from game_state import GameState
+from pgn import PgnGame, imap_bounded, read_games, resolve_san
+from renderer import ChessRenderer
+from rules_engine import MoveValidator
+from view import BoardView, Rect
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# GIF colours: the flat colours the board is drawn with, a 6x6x6 colour cube and a grey ramp
+# for the antialiased edges of the pieces
+PALETTE: List[Tuple[int, int, int]] = [
+    COLOR_BOARD_LIGHT,
+    COLOR_BOARD_DARK,
+    COLOR_HIGHLIGHT,
+    COLOR_CHECK_HIGHLIGHT,
+]
+PALETTE += [(r * 51, g * 51, b * 51) for r in range(6) for g in range(6) for b in range(6)]
+PALETTE += [(i * 255 // 35,) * 3 for i in range(256 - len(PALETTE))]
+
+# Each worker process keeps one imager, and with it the renderer's cached surfaces
+_imager: Optional['BoardImager'] = None
+_directory: str = '.'
+
+
+def lzw_encode(indices: bytes, min_code_size: int = 8) -> bytes:
+    """
+    Compresses palette indices as GIF image data: the minimum code size, then the LZW codes
+    packed least significant bit first in sub-blocks of up to 255 bytes
+    """
+    clear = 1 << min_code_size
+    end = clear + 1
+    size = min_code_size + 1
+    next_code = end + 1
+    table: Dict[int, int] = {}
+    out = bytearray()
+    buffer = bits = 0
+
+    def emit(code: int) -> None:
+        nonlocal buffer, bits, size
+        buffer |= code << bits
+        bits += size
+        while bits >= 8:
+            out.append(buffer & 255)
+            buffer >>= 8
+            bits -= 8
+        # The decoder widens its codes once the next free code no longer fits
+        if next_code >= 1 << size and size < 12:
+            size += 1
+
+    emit(clear)
+    prefix = indices[0]
+    for index in indices[1:]:
+        key = prefix << 8 | index
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        emit(prefix)
+        if next_code < 4095:
+            table[key] = next_code
+            next_code += 1
+        else:
+            emit(clear)
+            table.clear()
+            next_code = end + 1
+            size = min_code_size + 1
+        prefix = index
+    emit(prefix)
+    emit(end)
+    if bits:
+        out.append(buffer & 255)
+
+    blocks = bytearray([min_code_size])
+    for start in range(0, len(out), 255):
+        block = out[start : start + 255]
+        blocks.append(len(block))
+        blocks += block
+    blocks.append(0)
+    return bytes(blocks)
+
+
+def gif_header(width: int, height: int) -> bytes:
+    """
+    GIF signature, screen size, the global PALETTE and a loop-forever extension
+    """
+    palette = bytes(channel for color in PALETTE for channel in color)
+    return (
+        b'GIF89a'
+        + struct.pack('<HHBBB', width, height, 0xF7, 0, 0)
+        + palette
+        + b'!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00'
+    )
+
+
+def gif_frame(indices: bytes, rect: Rect, delay: int) -> bytes:
+    """
+    One GIF frame drawn over the previous one
+    :param indices: Palette indices of the area, row by row
+    :param rect: Area of the image the frame covers
+    :param delay: Hundredths of a second to show the frame
+    """
+    x, y, width, height = rect
+    return (
+        b'!\xf9\x04\x04'
+        + struct.pack('<HBB', delay, 0, 0)
+        + b','
+        + struct.pack('<HHHHB', x, y, width, height, 0)
+        + lzw_encode(indices)
+    )
+
+
+class BoardImager:
+    """
+    Draws boards with ChessRenderer onto an offscreen surface and encodes them as PNG images or
+    animated GIF replays. The SDL dummy video driver is used unless another one is set, so no
+    window or display server is needed. The checkerboard, sprite atlas and colour lookups built
+    for one image are reused for the next, and replay frames repaint only the squares a move
+    changed.
+    """
+
+    def __init__(self, size: int = 240) -> None:
+        """
+        :param size: Width and height of the images in pixels, rounded down to a multiple of 8
+        """
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        # SDL would otherwise turn SIGTERM into a quit event, and Pool.terminate could not stop
+        # the worker processes
+        os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+        pygame.display.init()
+        if pygame.display.get_surface() is None:
+            # Surfaces can only be converted to the display's pixel format once a mode is set
+            pygame.display.set_mode((1, 1))
+        length = size // 8
+        paths = {piece: os.path.join(ROOT, path) for piece, path in IMAGE_PATHS.items()}
+        self.surface: pygame.Surface = pygame.Surface((8 * length, 8 * length)).convert()
+        self.renderer: ChessRenderer = ChessRenderer(
+            self.surface, AssetManager(paths), BoardView(square_length=length)
+        )
+        self.board: Board = Board(MoveValidator())
+        self.colors: Dict[int, int] = {}  # RGBX pixel -> nearest PALETTE index
+
+    def draw(self, board: Board) -> pygame.Surface:
+        """
+        Draws a board without highlights
+        :return: The offscreen surface, overwritten by the next call
+        """
+        view = self.renderer.view
+        view.selected, view.highlighted, view.check = None, set(), None
+        self.renderer.draw_position(board)
+        self.renderer.dirty = []
+        return self.surface
+
+    def png(self, fen: str) -> bytes:
+        """
+        :return: PNG image of the position described by a FEN string
+        """
+        self.board.load_fen(fen)
+        data = io.BytesIO()
+        pygame.image.save(self.draw(self.board), data, 'png')
+        return data.getvalue()
+
+    def replay(self, game_state: GameState, moves: Iterable[int], delay: int = 50) -> bytes:
+        """
+        Animated GIF of moves played from a game state, showing check as the game does
+        :param moves: Packed moves, applied to game_state one at a time as they are read
+        :param delay: Hundredths of a second each position shows
+        """
+        renderer = self.renderer
+        renderer.invalidate()
+        renderer.dirty = []
+        chunks = [gif_header(*self.surface.get_size())]
+        renderer.draw_board(game_state)
+        chunks.append(self.frame(delay))
+        for move in moves:
+            game_state.apply(move)
+            renderer.draw_board(game_state)
+            chunks.append(self.frame(delay))
+        chunks.append(b';')
+        return b''.join(chunks)
+
+    def frame(self, delay: int) -> bytes:
+        """
+        GIF frame of the area the renderer drew since the last frame
+        """
+        dirty = self.renderer.dirty or [(0, 0, 1, 1)]
+        self.renderer.dirty = []
+        rect = tuple(pygame.Rect(dirty[0]).unionall(dirty[1:]))
+        return gif_frame(self.indices(rect), rect, delay)
+
+    def indices(self, rect: Rect) -> bytes:
+        """
+        :return: PALETTE indices of an area of the surface, row by row
+        """
+        pixels = array('I', pygame.image.tobytes(self.surface.subsurface(rect), 'RGBX'))
+        colors = self.colors
+        for pixel in set(pixels).difference(colors):
+            r, g, b = pixel & 255, pixel >> 8 & 255, pixel >> 16 & 255
+            colors[pixel] = min(
+                range(len(PALETTE)),
+                key=lambda i: (PALETTE[i][0] - r) ** 2
+                + (PALETTE[i][1] - g) ** 2
+                + (PALETTE[i][2] - b) ** 2,
+            )
+        return bytes(map(colors.__getitem__, pixels))
+
+
+def _init_worker(size: int, directory: str) -> None:
+    global _imager, _directory
+    _imager = BoardImager(size)
+    _directory = directory
+
+
+def export_positions(positions: List[Tuple[int, str]]) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    Writes a PNG image per position
+    :param positions: (number, EPD or FEN line) pairs; images are named after the number
+    :return: (number, path, error) per position, the error of a line that does not parse
+    """
+    results = []
+    for number, line in positions:
+        path = os.path.join(_directory, f'{number:06d}.png')
+        try:
+            position, _ = parse_epd(line)
+            data = _imager.png(position.fen())
+        except ValueError as error:
+            results.append((number, path, str(error)))
+            continue
+        with open(path, 'wb') as file:
+            file.write(data)
+        results.append((number, path, None))
+    return results
+
+
+def export_replays(games: List[Tuple[PgnGame, int]]) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    Writes an animated GIF per game, up to the first move that cannot be played
+    :param games: (game, delay) pairs; images are named after the game's number
+    :return: (number, path, error) per game
+    """
+    results = []
+    for game, delay in games:
+        path = os.path.join(_directory, f'{game.number:06d}.gif')
+        errors = []
+
+        def moves(game_state: GameState) -> Iterator[int]:
+            for ply, san in enumerate(game.moves, 1):
+                try:
+                    yield resolve_san(game_state, san)
+                except ValueError as error:
+                    errors.append(f'ply {ply} ({san}): {error}')
+                    return
+
+        try:
+            game_state = GameState(fen=game.tags.get('FEN'))
+        except ValueError as error:
+            results.append((game.number, path, str(error)))
+            continue
+        data = _imager.replay(game_state, moves(game_state), delay)
+        with open(path, 'wb') as file:
+            file.write(data)
+        results.append((game.number, path, errors[0] if errors else None))
+    return results
+
+
+def export_archive(
+    path: str,
+    directory: str,
+    size: int = 240,
+    delay: int = 50,
+    workers: int = 1,
+    chunksize: int = 32,
+    limit: Optional[int] = None,
+) -> Iterator[Tuple[int, str, Optional[str]]]:
+    """
+    Writes a PNG per position of an EPD/FEN file, or a GIF replay per game of a PGN file
+    :param directory: Where the images go, created if missing
+    :param size: Image width and height in pixels
+    :param delay: Hundredths of a second per replay position
+    :param workers: Processes to draw with; 1 draws in this process
+    :param chunksize: Positions or games sent to a worker per task
+    :param limit: Most images to write
+    :return: (number, path, error) per image, in file order
+    """
+    os.makedirs(directory, exist_ok=True)
+    if path.endswith('.pgn'):
+        function = export_replays
+        items = ((game, delay) for game in read_games(path))
+    else:
+        function = export_positions
+        items = read_lines(path)
+    if limit is not None:
+        items = (item for _, item in zip(range(limit), items))
+    if workers <= 1:
+        _init_worker(size, directory)
+        for item in items:
+            yield from function([item])
+        return
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, _init_worker, (size, directory)) as pool:
+        yield from imap_bounded(pool, function, items, chunksize, 2 * workers)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Draw PNG images of EPD/FEN positions or GIF replays of PGN games.'
+    )
+    parser.add_argument('path', help='EPD or FEN file for PNG images, PGN file for GIF replays')
+    parser.add_argument('--output', '-o', default='images', help='directory to write to')
+    parser.add_argument('--size', type=int, default=240, help='image width and height in pixels')
+    parser.add_argument(
+        '--delay', type=int, default=50, help='hundredths of a second per replay position'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1, help='processes to draw with'
+    )
+    parser.add_argument('--chunksize', type=int, default=32, help='images per worker task')
+    parser.add_argument('--limit', type=int, default=None, help='stop after this many images')
+    args = parser.parse_args(argv)
+
+    images = errors = 0
+    start = time.perf_counter()
+    for number, path, error in export_archive(
+        args.path,
+        args.output,
+        args.size,
+        args.delay,
+        args.workers,
+        args.chunksize,
+        args.limit,
+    ):
+        images += 1
+        if error is not None:
+            errors += 1
+            print(f'{path}: {error}')
+    elapsed = time.perf_counter() - start
+    rate = images / elapsed * 60 if elapsed else 0.0
+    print(f'{images} images, {errors} with errors in {elapsed:.3f}s ({rate:,.0f} images/min)')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,26 +1,22 @@
 from game_state import GameState
 from renderer import ChessRenderer
-from input_handler import InputHandler, ClickCommand, RestartCommand, QuitCommand
+from input_handler import (
+    InputHandler, ClickCommand, RestartCommand, QuitCommand, RedrawCommand, Command
+)
 from constants import BG_COLOR, SCREEN_WIDTH, SCREEN_HEIGHT
+from typing import List, Optional
+import argparse
+import time
 import pygame
 
-pygame.init()
-
 bg_color: tuple = BG_COLOR
 screen_width: int = SCREEN_WIDTH
 screen_height: int = SCREEN_HEIGHT
 size: tuple = (screen_width, screen_height)
 
-screen: pygame.Surface = pygame.display.set_mode(size)
-pygame.display.set_caption('Chess')
-# pygame.display.set_icon('icon.png')
-game_state: GameState = GameState()
-renderer: ChessRenderer = ChessRenderer(screen)
-input_handler: InputHandler = InputHandler()
-
 
-def redraw(game_state: GameState) -> None:
-    renderer.draw_board(game_state.board)
+def redraw(renderer: ChessRenderer, game_state: GameState) -> None:
+    renderer.draw_board(game_state)
     if game_state.result != 'Continue':
         game_state.ended = True
         renderer.draw_game_end(game_state.result, game_state.current_turn)
@@ -28,30 +24,139 @@ def redraw(game_state: GameState) -> None:
     renderer.update()
 
 
-run = True
-while run:
-    commands = input_handler.process_events()
-    for command in commands:
-        if isinstance(command, QuitCommand):
-            run = False
-            break
-        elif isinstance(command, RestartCommand):
-            if game_state.ended:
-                game_state.reset()
-        elif isinstance(command, ClickCommand):
-            if not game_state.ended:
-                result = game_state.current_player().play(command.x, command.y)
-                player = game_state.current_player()
-                if player.selected is None and game_state.board.promoting_pawn is None:
-                    game_state.current_turn ^= 1
-                    opponent = game_state.current_player()
-                    check = opponent.king.in_check(opponent.king.square)
-                    if check is not None:
-                        opponent.king.square.check_highlighted = True
-                    game_state.result = opponent.get_status(check, game_state.current_turn)
-                else:
-                    game_state.result = 'Continue'
-
-    redraw(game_state)
-
-pygame.quit()
+class LoopStats:
+    """
+    Frame pacing of the main loop: the CPU the process used while it waited for input,
+    and how long after an input arrived its frame reached the display
+    """
+
+    def __init__(self) -> None:
+        self.frames: int = 0
+        self.wait_time: float = 0.0  # wall-clock seconds spent waiting for events
+        self.wait_cpu: float = 0.0  # process CPU seconds used during those waits
+        self.latencies: List[float] = []  # seconds from input received to frame displayed
+
+    def wait(self, input_handler: InputHandler) -> List[Command]:
+        """
+        Waits for the next commands, timing the wait
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        commands = input_handler.wait_events()
+        self.wait_time += time.perf_counter() - wall
+        self.wait_cpu += time.process_time() - cpu
+        return commands
+
+    def frame(self, received: Optional[float]) -> None:
+        """
+        Records a frame displayed in answer to input received at the given time.perf_counter()
+        """
+        self.frames += 1
+        if received is not None:
+            self.latencies.append(time.perf_counter() - received)
+
+    @property
+    def idle_cpu(self) -> float:
+        """
+        Share of a core used while waiting for input
+        """
+        return self.wait_cpu / self.wait_time if self.wait_time else 0.0
+
+    def __str__(self) -> str:
+        latencies = sorted(self.latencies)
+        mean = sum(latencies) / len(latencies) if latencies else 0.0
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+        return (
+            f'frames {self.frames} waited {self.wait_time:.1f}s idle CPU {self.idle_cpu:.1%} '
+            f'input-to-frame mean {mean * 1e3:.2f} ms p95 {p95 * 1e3:.2f} ms'
+        )
+
+
+def run(game_state: GameState, renderer: ChessRenderer, input_handler: InputHandler,
+        fps: Optional[int] = None, stats: Optional[LoopStats] = None) -> None:
+    """
+    Runs the game until the window is closed. The loop sleeps in InputHandler.wait_events
+    instead of polling, and draws a frame only after input or an engine move changed something.
+    :param fps: Most frames to draw per second, None for no cap
+    :param stats: Collects idle CPU and input-to-frame latency
+    """
+    stats = stats or LoopStats()
+    clock = pygame.time.Clock()
+    dirty = True
+    received: Optional[float] = None  # when the input the next frame answers arrived
+    while True:
+        if dirty:
+            redraw(renderer, game_state)
+            stats.frame(received)
+            dirty = False
+            received = None
+            if fps:
+                clock.tick(fps)
+
+        if not game_state.ended and game_state.current_player().is_engine:
+            # The human's move is already on screen while the engine thinks
+            if game_state.current_player().make_engine_move():
+                game_state.end_turn()
+                dirty = True
+                continue
+
+        commands = stats.wait(input_handler)
+        received = time.perf_counter()
+        for command in commands:
+            if isinstance(command, QuitCommand):
+                return
+            elif isinstance(command, RedrawCommand):
+                renderer.invalidate()
+            elif isinstance(command, RestartCommand):
+                if game_state.ended:
+                    game_state.reset()
+                    renderer.invalidate()
+            elif isinstance(command, ClickCommand):
+                if not game_state.ended:
+                    square = renderer.view.square_at(game_state.board, command.x, command.y)
+                    game_state.current_player().play(square)
+                    player = game_state.current_player()
+                    if player.selected is None and game_state.board.promoting_pawn is None:
+                        game_state.end_turn()
+                    else:
+                        game_state.result = 'Continue'
+        dirty = dirty or bool(commands)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Play chess.')
+    parser.add_argument('--engine', choices=('White', 'Black'), default=None,
+                        help='colour played by the computer')
+    parser.add_argument('--think-time', type=float, default=1.0,
+                        help='seconds the computer searches per move')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes the computer searches with')
+    parser.add_argument('--fps', type=int, default=None,
+                        help='most frames drawn per second')
+    parser.add_argument('--stats', action='store_true',
+                        help='print idle CPU and input-to-frame latency on exit')
+    args = parser.parse_args()
+
+    pygame.init()
+
+    screen: pygame.Surface = pygame.display.set_mode(size)
+    pygame.display.set_caption('Chess')
+    # pygame.display.set_icon('icon.png')
+    game_state: GameState = GameState(engine=args.engine, think_time=args.think_time,
+                                      workers=args.workers)
+    renderer: ChessRenderer = ChessRenderer(screen)
+    input_handler: InputHandler = InputHandler()
+
+    # Pointer motion would wake the loop without changing anything
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+    stats = LoopStats()
+    run(game_state, renderer, input_handler, args.fps, stats)
+    if args.stats:
+        print(stats)
+
+    game_state.close()
+    pygame.quit()
+
+
+# Guarded because the engine's worker processes are spawned and re-import this module
+if __name__ == '__main__':
+    main()
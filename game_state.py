@@ -1,31 +1,145 @@
-from board import Board
+from board import Board, UndoRecord
 from player import Player
-from assets import AssetManager
+from engine_player import EnginePlayer
 from rules_engine import MoveValidator
-from constants import IMAGE_PATHS
+from bitboard import BitboardMoveGenerator
+from constants import COLOR_NAMES
+from moves import FEN_PIECES, MoveBuffer, move_to_uci
+from typing import List, Optional, Tuple
+
+# Legal move sources selectable per game; None keeps the object model in pieces.py
+MOVE_GENERATORS = {
+    'objects': None,
+    'bitboard': BitboardMoveGenerator,
+}
+
 
 class GameState:
-    def __init__(self) -> None:
-        self.asset_manager: AssetManager = AssetManager(IMAGE_PATHS)
+    def __init__(self, backend: str = 'objects', engine: Optional[str] = None,
+                 think_time: float = 1.0, workers: int = 1, fen: Optional[str] = None) -> None:
+        """
+        :param backend: Legal move source, a key of MOVE_GENERATORS
+        :param engine: Colour played by the computer ('White' or 'Black'), None for human vs human
+        :param think_time: Seconds the computer searches per move
+        :param workers: Processes the computer searches with
+        :param fen: Position to start from and return to on reset, the initial position if omitted
+        """
+        if backend not in MOVE_GENERATORS:
+            raise ValueError(f'Unknown move generator backend: {backend}')
+        if engine is not None and engine not in COLOR_NAMES:
+            raise ValueError(f'Unknown engine colour: {engine}')
+        generator_cls = MOVE_GENERATORS[backend]
+        self.move_generator: Optional[BitboardMoveGenerator] = (
+            generator_cls() if generator_cls else None
+        )
+        self.engine: Optional[str] = engine
+        self.think_time: float = think_time
+        self.workers: int = workers
+        self.fen: Optional[str] = fen
+        self.white_player: Optional[Player] = None
+        self.black_player: Optional[Player] = None
         self.move_validator: MoveValidator = MoveValidator()
-        self.board: Board = Board(self.asset_manager, self.move_validator)
-        self.white_player: Player = Player(self.board, 'White')
-        self.black_player: Player = Player(self.board, 'Black')
-        self.white_player.set_opponent(self.black_player)
-        self.black_player.set_opponent(self.white_player)
-        self.current_turn: int = 0  # 0 for white, 1 for black
-        self.result: str = 'Continue'
-        self.ended: bool = False
+        self.reset()
 
     def current_player(self) -> Player:
         return self.white_player if self.current_turn == 0 else self.black_player
 
+    def make_player(self, color: str) -> Player:
+        if color == self.engine:
+            return EnginePlayer(self.board, color, self.think_time, workers=self.workers)
+        return Player(self.board, color)
+
+    def end_turn(self) -> None:
+        """
+        Hands the move to the other player and updates the result and `in_check`
+        """
+        self.current_turn ^= 1
+        opponent = self.current_player()
+        check = opponent.king.in_check(opponent.king.square)
+        self.in_check = check is not None
+        self.result = opponent.get_status(check, self.current_turn)
+
+    def legal_moves(self) -> List[int]:
+        """
+        Legal moves of the side to move as packed moves (see moves.py)
+        """
+        return self.current_player().generate_moves(self.move_buffer).tolist()
+
+    def push(self, move: int) -> str:
+        """
+        Plays a move without any clicks, selection or highlighting
+        :param move: Packed move, as listed by legal_moves
+        :return: The game result after the move
+        """
+        self.check_not_over()
+        if move not in self.legal_moves():
+            raise ValueError(f'Illegal move: {move_to_uci(move)}')
+        return self.apply(move)
+
+    def push_uci(self, uci: str) -> str:
+        """
+        Plays a move given in UCI notation, e.g. 'e2e4' or 'e7e8q'
+        :return: The game result after the move
+        """
+        uci = uci.strip().lower()
+        if len(uci) not in (4, 5) or (len(uci) == 5 and uci[4] not in FEN_PIECES[1:5]):
+            raise ValueError(f'Invalid UCI move: {uci}')
+        self.check_not_over()
+        for move in self.legal_moves():
+            if move_to_uci(move) == uci:
+                return self.apply(move)
+        raise ValueError(f'Illegal move: {uci}')
+
+    def check_not_over(self) -> None:
+        if self.result != 'Continue':
+            raise ValueError(f'Game is over: {self.result}')
+
+    def apply(self, move: int) -> str:
+        """
+        Plays a move already known to be legal and hands the turn over
+        """
+        self.move_stack.append((move, self.board.make_move(move)))
+        self.end_turn()
+        return self.result
+
+    def pop(self) -> int:
+        """
+        Takes back the last move played with push
+        :return: The move taken back
+        """
+        move, record = self.move_stack.pop()
+        self.board.unmake_move(record)
+        self.current_turn ^= 1
+        self.in_check = self.current_player().king.in_check() is not None
+        self.result = 'Continue'
+        self.ended = False
+        return move
+
+    def close(self) -> None:
+        """
+        Releases the computer player's worker processes
+        """
+        for player in (self.white_player, self.black_player):
+            if isinstance(player, EnginePlayer):
+                player.close()
+
     def reset(self) -> None:
-        self.board = Board(self.asset_manager, self.move_validator)
-        self.white_player = Player(self.board, 'White')
-        self.black_player = Player(self.board, 'Black')
+        self.close()
+        self.board: Board = Board(self.move_validator, self.move_generator)
+        if self.fen is not None:
+            self.board.load_fen(self.fen)
+        self.white_player = self.make_player('White')
+        self.black_player = self.make_player('Black')
         self.white_player.set_opponent(self.black_player)
         self.black_player.set_opponent(self.white_player)
-        self.current_turn = 0
-        self.result = 'Continue'
-        self.ended = False
\ No newline at end of file
+        self.current_turn: int = self.board.turn  # 0 for white, 1 for black
+        self.result: str = 'Continue'
+        self.in_check: bool = False  # whether the side to move is in check
+        self.ended: bool = False
+        self.move_stack: List[Tuple[int, UndoRecord]] = []
+        self.move_buffer: MoveBuffer = MoveBuffer()
+        if self.fen is not None:
+            player = self.current_player()
+            check = player.king.in_check()
+            self.in_check = check is not None
+            self.result = player.get_status(check, self.current_turn)
\ No newline at end of file
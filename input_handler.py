@@ -15,13 +15,35 @@ class RestartCommand:
 class QuitCommand:
     pass
 
+@dataclass
+class RedrawCommand:
+    pass
+
+Command = Union[ClickCommand, RestartCommand, QuitCommand, RedrawCommand]
+
 class InputHandler:
-    def process_events(self) -> List[Union[ClickCommand, RestartCommand, QuitCommand]]:
+    def process_events(self) -> List[Command]:
+        """
+        Convert pending pygame events to game commands
+        """
+        return self.convert(pygame.event.get())
+
+    def wait_events(self, timeout: int = 0) -> List[Command]:
+        """
+        Sleeps until an event arrives, then converts it and any others already queued
+        :param timeout: Milliseconds to wait at most, 0 to wait for ever
+        """
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return self.convert([event] + pygame.event.get())
+
+    def convert(self, events: List[pygame.event.Event]) -> List[Command]:
         """
-        Convert pygame events to game commands
+        Convert pygame events to game commands, dropping events the game does not use
         """
-        commands: List[Union[ClickCommand, RestartCommand, QuitCommand]] = []
-        for event in pygame.event.get():
+        commands: List[Command] = []
+        for event in events:
             if event.type == pygame.QUIT:
                 commands.append(QuitCommand())
             elif event.type == pygame.KEYDOWN:
@@ -32,4 +54,6 @@ class InputHandler:
                 y: int
                 x, y = event.pos
                 commands.append(ClickCommand(x, y))
-        return commands
\ No newline at end of file
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                commands.append(RedrawCommand())
+        return commands
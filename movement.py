@@ -0,0 +1,296 @@
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    from board import Square
+    from pieces import King, Pawn, Piece
+
+from attack_tables import (
+    BISHOP_RAYS,
+    DIAGONAL_RAYS,
+    FULL,
+    KING_ATTACKS,
+    KING_SQUARES,
+    KNIGHT_ATTACKS,
+    KNIGHT_SQUARES,
+    ORTHOGONAL_RAYS,
+    PAWN_ATTACKS,
+    PAWN_SQUARES,
+    ROOK_RAYS,
+)
+from constants import WHITE_KINGSIDE, WHITE_QUEENSIDE
+
+Targets = List[Tuple[int, ...]]
+Rays = List[Tuple[Tuple[int, ...], ...]]
+
+
+class Movement:
+    """
+    Movement rules of one piece type. One stateless instance per type is shared by every piece of
+    that type (a flyweight), so move generation reads the position without constructing pieces.
+    """
+
+    __slots__ = ()
+
+    def destinations(self, piece: 'Piece', allowed: int) -> List['Square']:
+        """
+        Finds the squares a piece can move to
+        :param piece: Piece to move; its board, color and square are read, never changed
+        :param allowed: Bitmask of destinations left open by checks and pins
+                        (see MoveValidator.restrictions)
+        :return: a list of legal destinations
+        """
+        return []
+
+    def reach(self, piece: 'Piece') -> int:
+        """
+        Squares whose contents the destinations depend on; while none of them changes,
+        and neither do the piece's square nor its allowed mask, its destinations stay the same
+        :return: Bitmask indexed like Board.grid
+        """
+        return FULL
+
+
+def _masks(squares: Targets) -> List[int]:
+    return [sum(1 << index for index in indices) for indices in squares]
+
+
+def _union(masks) -> int:
+    union = 0
+    for mask in masks:
+        union |= mask
+    return union
+
+
+class LeaperMovement(Movement):
+    """
+    Jumps to a fixed set of squares, e.g. the knight
+    """
+
+    __slots__ = ('targets', 'masks')
+
+    def __init__(self, targets: Targets) -> None:
+        """
+        :param targets: Square indices reached from each square, see attack_tables
+        """
+        self.targets: Targets = targets
+        self.masks: List[int] = _masks(targets)
+
+    def reach(self, piece: 'Piece') -> int:
+        return self.masks[piece.square.index]
+
+    def destinations(self, piece: 'Piece', allowed: int) -> List['Square']:
+        moves = []
+        color = piece.color
+        grid = piece.board.grid
+        for index in self.targets[piece.square.index]:
+            square = grid[index]
+            target = square.piece
+            if (target is None or target.color != color) and square.bit & allowed:
+                moves.append(square)
+        return moves
+
+
+class SliderMovement(Movement):
+    """
+    Slides along rays until the first piece, which it may capture
+    """
+
+    __slots__ = ('rays', 'masks')
+
+    def __init__(self, rays: Rays) -> None:
+        """
+        :param rays: Rays walked out from each square, nearest square first
+        """
+        self.rays: Rays = rays
+        # Whole rays, past any blocker, so a piece moving anywhere on them is noticed
+        self.masks: List[int] = _masks([sum(ray, ()) for ray in rays])
+
+    def reach(self, piece: 'Piece') -> int:
+        return self.masks[piece.square.index]
+
+    def destinations(self, piece: 'Piece', allowed: int) -> List['Square']:
+        moves = []
+        color = piece.color
+        grid = piece.board.grid
+        for ray in self.rays[piece.square.index]:
+            for index in ray:
+                square = grid[index]
+                target = square.piece
+                if target is None:
+                    if square.bit & allowed:
+                        moves.append(square)
+                    continue
+                if target.color != color and square.bit & allowed:
+                    moves.append(square)
+                break
+        return moves
+
+
+class PawnMovement(Movement):
+    """
+    Single and double pushes, diagonal captures and en passant
+    """
+
+    __slots__ = ()
+
+    def destinations(self, piece: 'Pawn', allowed: int) -> List['Square']:
+        moves = []
+        board = piece.board
+        grid = board.grid
+        square = piece.square
+        color = piece.color
+        white = color == 'White'
+        step = 8 if white else -8
+
+        front = square.index + step
+        if 0 <= front < 64 and grid[front].piece is None:
+            if grid[front].bit & allowed:
+                moves.append(grid[front])
+            if square.row == (2 if white else 7):
+                extra = grid[front + step]
+                if extra.piece is None and extra.bit & allowed:
+                    moves.append(extra)
+
+        for index in PAWN_SQUARES[0 if white else 1][square.index]:
+            diagonal = grid[index]
+            target = diagonal.piece
+            if target is not None:
+                if target.color != color and diagonal.bit & allowed:
+                    moves.append(diagonal)
+            elif diagonal is board.ep_square:
+                # Capturing en passant also answers a check given by the pawn being taken
+                captured = grid[index - step]
+                if (diagonal.bit | captured.bit) & allowed and self.en_passant_safe(
+                    piece, diagonal, captured
+                ):
+                    moves.append(diagonal)
+
+        return moves
+
+    def reach(self, piece: 'Pawn') -> int:
+        # En passant also depends on the king's lines, but the en passant square itself
+        # changes every ply, and make_move marks it as changed (see Board.changes_since)
+        square = piece.square
+        white = piece.color == 'White'
+        step = 8 if white else -8
+        reach = PAWN_ATTACKS[0 if white else 1][square.index]
+        front = square.index + step
+        if 0 <= front < 64:
+            reach |= 1 << front
+            if square.row == (2 if white else 7):
+                reach |= 1 << front + step
+        return reach
+
+    def en_passant_safe(self, piece: 'Pawn', target: 'Square', captured: 'Square') -> bool:
+        """
+        Whether the king is safe after capturing en passant. Both pawns leave the rank at once,
+        which can open a line to the king that no pin covers,
+        so the capture is played out on the squares.
+        :param target: Square the pawn moves to
+        :param captured: Square of the pawn taken
+        """
+        origin = piece.square
+        taken = captured.piece
+        origin.piece = captured.piece = None
+        target.piece = piece
+        king = piece.board.kings[piece.color]
+        safe = not king.attacked(king.square)
+        target.piece = None
+        origin.piece = piece
+        captured.piece = taken
+        return safe
+
+
+class KingMovement(LeaperMovement):
+    """
+    One step in any direction onto an unattacked square, plus castling
+    """
+
+    __slots__ = ('zones', 'castling_zones')
+
+    def __init__(self, targets: Targets) -> None:
+        super().__init__(targets)
+        # Anything that can attack a square sits on one of its lines,
+        # or a knight's or king's step away
+        lines = [
+            ROOK_RAYS[sq] | BISHOP_RAYS[sq] | KNIGHT_ATTACKS[sq] | KING_ATTACKS[sq] | 1 << sq
+            for sq in range(64)
+        ]
+        self.zones: List[int] = [
+            lines[sq] | _union(lines[index] for index in targets[sq]) for sq in range(64)
+        ]
+        # Castling also looks at the king's row from b to g
+        self.castling_zones: Tuple[int, int] = (
+            _union(lines[index] for index in range(1, 7)),
+            _union(lines[index] for index in range(57, 63)),
+        )
+
+    def reach(self, piece: 'King') -> int:
+        # Safe squares depend on the enemy pieces that could attack them
+        reach = self.zones[piece.square.index]
+        white = piece.color == 'White'
+        if piece.board.castling >> (0 if white else 2) & (WHITE_KINGSIDE | WHITE_QUEENSIDE):
+            reach |= self.castling_zones[0 if white else 1]
+        return reach
+
+    def destinations(self, piece: 'King', allowed: int) -> List['Square']:
+        # Checks and pins do not restrict the king; each destination is tested for attacks instead
+        moves = []
+        color = piece.color
+        grid = piece.board.grid
+        for index in self.targets[piece.square.index]:
+            square = grid[index]
+            target = square.piece
+            if (target is None or target.color != color) and not piece.attacked(square):
+                moves.append(square)
+
+        self.castle_available(piece, moves)
+
+        return moves
+
+    def castle_available(self, king: 'King', moves: List['Square']) -> None:
+        board = king.board
+        # Shifted so that this side's rights line up with the White bits
+        rights = board.castling >> (0 if king.color == 'White' else 2)
+        if not rights & (WHITE_KINGSIDE | WHITE_QUEENSIDE) or king.attacked(king.square):
+            return
+
+        row = king.square.row
+        if rights & WHITE_KINGSIDE:
+            middle_square1 = board.get_square(row, 6)
+            middle_square2 = board.get_square(row, 7)
+            if middle_square1.piece is None and middle_square2.piece is None:
+                if not king.attacked(middle_square1) and not king.attacked(middle_square2):
+                    moves.append(middle_square2)
+
+        if rights & WHITE_QUEENSIDE:
+            middle_square1 = board.get_square(row, 2)
+            middle_square2 = board.get_square(row, 3)
+            middle_square3 = board.get_square(row, 4)
+            if (
+                middle_square1.piece is None
+                and middle_square2.piece is None
+                and middle_square3.piece is None
+            ):
+                if not king.attacked(middle_square2) and not king.attacked(middle_square3):
+                    moves.append(middle_square2)
+
+
+PAWN_MOVEMENT: PawnMovement = PawnMovement()
+KNIGHT_MOVEMENT: LeaperMovement = LeaperMovement(KNIGHT_SQUARES)
+BISHOP_MOVEMENT: SliderMovement = SliderMovement(DIAGONAL_RAYS)
+ROOK_MOVEMENT: SliderMovement = SliderMovement(ORTHOGONAL_RAYS)
+QUEEN_MOVEMENT: SliderMovement = SliderMovement(
+    [DIAGONAL_RAYS[sq] + ORTHOGONAL_RAYS[sq] for sq in range(64)]
+)
+KING_MOVEMENT: KingMovement = KingMovement(KING_SQUARES)
+
+# Indexed by piece type
+MOVEMENTS: Tuple[Movement, ...] = (
+    PAWN_MOVEMENT,
+    KNIGHT_MOVEMENT,
+    BISHOP_MOVEMENT,
+    ROOK_MOVEMENT,
+    QUEEN_MOVEMENT,
+    KING_MOVEMENT,
+)
@@ -0,0 +1,118 @@
+from array import array
+from typing import Iterator, List
+
+from constants import BISHOP, KNIGHT, QUEEN, ROOK
+
+# A move packs into 16 bits: from square (bits 0-5), to square (bits 6-11) and flags (bits 12-15).
+# Squares are indexed 0..63 from a1 to h8.
+QUIET: int = 0
+DOUBLE_PUSH: int = 1
+KING_CASTLE: int = 2
+QUEEN_CASTLE: int = 3
+CAPTURE: int = 4
+EN_PASSANT: int = 5
+PROMOTION: int = 8  # the low two flag bits then select the piece from PROMOTION_PIECES
+
+PROMOTION_PIECES = (KNIGHT, BISHOP, ROOK, QUEEN)
+PROMOTION_FLAGS = {piece: PROMOTION | index for index, piece in enumerate(PROMOTION_PIECES)}
+
+NULL_MOVE: int = 0
+# No legal position has more than 218 moves
+MAX_MOVES: int = 256
+
+FEN_PIECES: str = 'pnbrqk'
+
+
+def encode_move(frm: int, to: int, flags: int = QUIET) -> int:
+    return frm | to << 6 | flags << 12
+
+
+def move_from(move: int) -> int:
+    return move & 63
+
+
+def move_to(move: int) -> int:
+    return move >> 6 & 63
+
+
+def move_flags(move: int) -> int:
+    return move >> 12
+
+
+def is_capture(move: int) -> bool:
+    return bool(move >> 12 & CAPTURE)
+
+
+def promotion_piece(move: int) -> int:
+    """
+    Kind of the piece promoted to, or 0 when the move is not a promotion
+    """
+    return PROMOTION_PIECES[move >> 12 & 3] if move >> 12 & PROMOTION else 0
+
+
+def square_name(sq: int) -> str:
+    return f"{chr(ord('a') + sq % 8)}{sq // 8 + 1}"
+
+
+def parse_square(name: str) -> int:
+    return (int(name[1]) - 1) * 8 + ord(name[0]) - ord('a')
+
+
+def move_to_uci(move: int) -> str:
+    promotion = promotion_piece(move)
+    suffix = FEN_PIECES[promotion] if promotion else ''
+    return f'{square_name(move & 63)}{square_name(move >> 6 & 63)}{suffix}'
+
+
+class MoveBuffer:
+    """
+    Preallocated array of packed moves reused across generation calls.
+    Generators write into `moves` directly and set `count`.
+    """
+
+    __slots__ = ('moves', 'count')
+
+    def __init__(self, capacity: int = MAX_MOVES) -> None:
+        self.moves: array = array('H', bytes(2 * capacity))
+        self.count: int = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        if not -self.count <= index < self.count:
+            raise IndexError('move buffer index out of range')
+        return self.moves[index % self.count]
+
+    def __iter__(self) -> Iterator[int]:
+        moves = self.moves
+        for index in range(self.count):
+            yield moves[index]
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def append(self, move: int) -> None:
+        self.moves[self.count] = move
+        self.count += 1
+
+    def extend(self, moves: List[int]) -> None:
+        count = self.count + len(moves)
+        self.moves[self.count : count] = array('H', moves)
+        self.count = count
+
+    def tolist(self) -> List[int]:
+        return self.moves[: self.count].tolist()
+
+    def tobytes(self) -> bytes:
+        """
+        Compact wire form, two bytes per move
+        """
+        return self.moves[: self.count].tobytes()
+
+    @classmethod
+    def frombytes(cls, data: bytes) -> 'MoveBuffer':
+        buffer = cls(max(MAX_MOVES, len(data) // 2))
+        buffer.moves[: len(data) // 2] = array('H', data)
+        buffer.count = len(data) // 2
+        return buffer
@@ -0,0 +1,240 @@
+import multiprocessing
+import os
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from bitboard import BitboardPosition
+from moves import CAPTURE, PROMOTION
+from search import INFINITE, MATE_BOUND, MAX_PLY, Searcher, SearchInfo
+
+# Each worker process keeps one Searcher,
+# so its transposition table and history persist between tasks
+_searcher: Optional[Searcher] = None
+
+
+class RootResult(NamedTuple):
+    move: int
+    score: int
+    pv: List[int]
+    nodes: int
+    time: float
+    worker: int  # process id
+    stopped: bool
+
+
+class ScalingReport(NamedTuple):
+    workers: int
+    nodes: int
+    time: float
+    worker_nodes: Dict[int, int]
+    worker_time: Dict[int, float]  # seconds each process spent searching
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.time if self.time else 0.0
+
+    @property
+    def nps_per_worker(self) -> float:
+        return self.nps / self.workers
+
+    @property
+    def utilisation(self) -> float:
+        """
+        Share of the wall-clock time the workers spent searching
+        rather than idle or waiting on the parent
+        """
+        return sum(self.worker_time.values()) / (self.workers * self.time) if self.time else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'workers {self.workers} nodes {self.nodes} time {self.time:.3f}s nps {self.nps:,.0f} '
+            f'nps/worker {self.nps_per_worker:,.0f} utilisation {self.utilisation:.0%}'
+        )
+
+
+def _init_worker(hash_mb: float) -> None:
+    global _searcher
+    _searcher = Searcher(hash_mb=hash_mb)
+
+
+def _search_root_move(task: Tuple[bytes, int, int, int, int, Optional[float]]) -> RootResult:
+    snapshot, move, depth, alpha, beta, deadline = task
+    if deadline is not None and time.monotonic() >= deadline:
+        # Still queued when the search ran out of time
+        return RootResult(move, alpha, [move], 0, 0.0, os.getpid(), True)
+    position = BitboardPosition.from_bytes(snapshot)
+    start = time.perf_counter()
+    score, pv = _searcher.search_move(position, move, depth, alpha, beta, deadline)
+    return RootResult(
+        move,
+        score,
+        pv,
+        _searcher.nodes,
+        time.perf_counter() - start,
+        os.getpid(),
+        _searcher.stopped,
+    )
+
+
+class ParallelSearcher:
+    """
+    Splits the root moves of every iteration across a pool of worker processes.
+    The best move from the previous iteration is searched first to set the bound; the remaining
+    moves are searched in parallel with a null window and only re-searched when they beat it.
+    Positions travel to the workers as BitboardPosition.to_bytes snapshots, together with the
+    absolute time.monotonic() deadline of the search, so tasks still queued when time runs out
+    stop at once.
+    Workers are spawned rather than forked, so they start clean of the parent's pygame state.
+    """
+
+    def __init__(self, workers: Optional[int] = None, hash_mb: float = 16) -> None:
+        """
+        :param workers: Worker processes, defaults to the number of CPUs
+        :param hash_mb: Transposition table size of each worker
+        """
+        self.workers: int = workers or os.cpu_count() or 1
+        self.hash_mb: float = hash_mb
+        self.pool = None
+        self.report: Optional[ScalingReport] = None
+        self.worker_nodes: Dict[int, int] = {}
+        self.worker_time: Dict[int, float] = {}
+
+    def __enter__(self) -> 'ParallelSearcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Launches the worker processes ahead of the first search
+        """
+        if self.pool is None:
+            context = multiprocessing.get_context('spawn')
+            self.pool = context.Pool(self.workers, _init_worker, (self.hash_mb,))
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def search(
+        self,
+        position: BitboardPosition,
+        max_depth: int = MAX_PLY,
+        time_limit: Optional[float] = None,
+        on_iteration: Optional[Callable[[SearchInfo], None]] = None,
+    ) -> SearchInfo:
+        """
+        Searches the position with iterative deepening until a limit is reached
+        :param position: Position to search, left unchanged
+        :param max_depth: Deepest iteration to run
+        :param time_limit: Seconds to search; the first iteration always completes
+        :param on_iteration: Called with the result of every completed iteration
+        :return: Result of the last completed iteration; nodes/s per worker are in `report`
+        """
+        self.start()
+        start = time.perf_counter()
+        deadline = time.monotonic() + time_limit if time_limit is not None else None
+        snapshot = position.to_bytes()
+        self.worker_nodes = {}
+        self.worker_time = {}
+
+        # Captures first for the opening iteration, later iterations sort by the previous scores
+        mailbox = position.mailbox
+        order = sorted(
+            position.legal_moves(),
+            key=lambda move: (
+                -Searcher.capture_score(mailbox, move) if move >> 12 & (CAPTURE | PROMOTION) else 0
+            ),
+        )
+        result = SearchInfo(0, 0, 0, 0.0, [])
+        for depth in range(1, min(max_depth, MAX_PLY) + 1):
+            if not order:
+                break
+            if depth > 1 and deadline is not None and time.monotonic() >= deadline:
+                break
+            iteration = self.search_iteration(
+                snapshot, order, depth, None if depth == 1 else deadline
+            )
+            if iteration is None:
+                break
+            best, scores = iteration
+            result = SearchInfo(
+                depth,
+                best.score,
+                sum(self.worker_nodes.values()),
+                time.perf_counter() - start,
+                best.pv,
+            )
+            if on_iteration is not None:
+                on_iteration(result)
+            if abs(best.score) >= MATE_BOUND:
+                break
+            order.sort(key=lambda move: (move != best.move, -scores.get(move, -INFINITE)))
+
+        elapsed = time.perf_counter() - start
+        self.report = ScalingReport(
+            self.workers,
+            sum(self.worker_nodes.values()),
+            elapsed,
+            self.worker_nodes,
+            self.worker_time,
+        )
+        return result._replace(nodes=self.report.nodes, time=elapsed)
+
+    def search_iteration(
+        self, snapshot: bytes, order: List[int], depth: int, deadline: Optional[float]
+    ) -> Optional[Tuple[RootResult, Dict[int, int]]]:
+        """
+        Runs one root iteration
+        :param deadline: time.monotonic() value at which every task gives up,
+                         None to finish the iteration
+        :return: The best root result and the bound found for every move, or None when time ran out
+        """
+        pool = self.pool
+        best = self.collect(
+            pool.apply(
+                _search_root_move, ((snapshot, order[0], depth, -INFINITE, INFINITE, deadline),)
+            )
+        )
+        if best.stopped:
+            return None
+        alpha = best.score
+        scores = {best.move: best.score}
+        tasks = [(snapshot, move, depth, alpha, alpha + 1, deadline) for move in order[1:]]
+        fail_high = []
+        stopped = False
+        # Drained to the end even after a stop, so no task of this search is left queued
+        # for the next one; tasks picked up after the deadline return without searching
+        for root in pool.imap_unordered(_search_root_move, tasks):
+            self.collect(root)
+            stopped = stopped or root.stopped
+            if stopped:
+                continue
+            scores[root.move] = root.score
+            if root.score > alpha:
+                fail_high.append(root)
+        if stopped:
+            return None
+
+        # Moves that beat the first one are searched again with an open window
+        for root in sorted(fail_high, key=lambda r: -r.score):
+            root = self.collect(
+                pool.apply(
+                    _search_root_move, ((snapshot, root.move, depth, alpha, INFINITE, deadline),)
+                )
+            )
+            if root.stopped:
+                return None
+            scores[root.move] = root.score
+            if root.score > alpha:
+                alpha = root.score
+                best = root
+        return best, scores
+
+    def collect(self, root: RootResult) -> RootResult:
+        self.worker_nodes[root.worker] = self.worker_nodes.get(root.worker, 0) + root.nodes
+        self.worker_time[root.worker] = self.worker_time.get(root.worker, 0.0) + root.time
+        return root
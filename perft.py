@@ -0,0 +1,218 @@
+import argparse
+import time
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from game_state import GameState
+
+from bitboard import STARTING_FEN, BitboardPosition
+from moves import MoveBuffer, move_to_uci
+
+
+class PerftCase(NamedTuple):
+    name: str
+    fen: str
+    nodes: Dict[int, int]  # depth -> expected leaf count
+
+
+# Published reference counts (chessprogramming.org perft results and Martin Sedlak's edge-case set)
+PERFT_SUITE: List[PerftCase] = [
+    PerftCase('start', STARTING_FEN, {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    PerftCase(
+        'kiwipete',
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+        {1: 48, 2: 2039, 3: 97862, 4: 4085603},
+    ),
+    PerftCase(
+        'position 3',
+        '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+        {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624},
+    ),
+    PerftCase(
+        'position 4',
+        'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+        {1: 6, 2: 264, 3: 9467, 4: 422333},
+    ),
+    PerftCase(
+        'position 5',
+        'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+        {1: 44, 2: 1486, 3: 62379},
+    ),
+    PerftCase(
+        'position 6',
+        'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+        {1: 46, 2: 2079, 3: 89890},
+    ),
+    PerftCase('illegal en passant', '3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1', {6: 1134888}),
+    PerftCase('en passant gives check', '8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1', {6: 1440467}),
+    PerftCase('castling gives check', '5k2/8/8/8/8/8/8/4K2R w K - 0 1', {6: 661072}),
+    PerftCase('promote out of check', '2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1', {6: 3821001}),
+    PerftCase('promote to give check', '4k3/1P6/8/8/8/8/K7/8 w - - 0 1', {6: 217342}),
+    PerftCase('underpromote to check', '8/P1k5/K7/8/8/8/8/8 w - - 0 1', {6: 92683}),
+    PerftCase('self stalemate', 'K1k5/8/P7/8/8/8/8/8 w - - 0 1', {6: 2217}),
+    PerftCase('double check', '8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1', {4: 23527}),
+]
+
+
+def perft(
+    position: BitboardPosition, depth: int, buffers: Optional[List[MoveBuffer]] = None
+) -> int:
+    """
+    Counts the leaf nodes of the legal move tree
+    :param position: Position to search, restored before returning
+    :param depth: Plies to expand
+    :param buffers: One reusable move buffer per remaining ply, allocated when omitted
+    :return: Number of leaf nodes
+    """
+    if depth <= 0:
+        return 1
+    if buffers is None:
+        buffers = [MoveBuffer() for _ in range(depth)]
+    buffer = buffers[depth - 1]
+    count = position.generate_moves(buffer)
+    if depth == 1:
+        return count
+    moves = buffer.moves
+    nodes = 0
+    for index in range(count):
+        undo = position.make_move(moves[index])
+        nodes += perft(position, depth - 1, buffers)
+        position.unmake_move(undo)
+    return nodes
+
+
+def perft_board(
+    game_state: 'GameState', depth: int, buffers: Optional[List[MoveBuffer]] = None
+) -> int:
+    """
+    Counts leaf nodes on the object model (pieces.py and rules_engine.py)
+    through Board.make_move/unmake_move
+    """
+    if depth <= 0:
+        return 1
+    if buffers is None:
+        buffers = [MoveBuffer() for _ in range(depth)]
+    buffer = game_state.current_player().generate_moves(buffers[depth - 1])
+    if depth == 1:
+        return buffer.count
+    board = game_state.board
+    nodes = 0
+    for move in buffer:
+        record = board.make_move(move)
+        game_state.current_turn ^= 1
+        nodes += perft_board(game_state, depth - 1, buffers)
+        game_state.current_turn ^= 1
+        board.unmake_move(record)
+    return nodes
+
+
+def divide(position: BitboardPosition, depth: int) -> Dict[str, int]:
+    """
+    Splits the perft count by root move
+    :return: Mapping of UCI move to its leaf count
+    """
+    counts: Dict[str, int] = {}
+    buffers = [MoveBuffer() for _ in range(max(depth - 1, 1))]
+    for move in position.legal_moves():
+        undo = position.make_move(move)
+        counts[move_to_uci(move)] = perft(position, depth - 1, buffers)
+        position.unmake_move(undo)
+    return counts
+
+
+def run_divide(fen: str, depth: int) -> int:
+    position = BitboardPosition.from_fen(fen)
+    start = time.perf_counter()
+    counts = divide(position, depth)
+    elapsed = time.perf_counter() - start
+    for move, nodes in sorted(counts.items()):
+        print(f'{move}: {nodes}')
+    total = sum(counts.values())
+    print()
+    print(f'Moves: {len(counts)}')
+    print(f'Nodes: {total}')
+    print(f'Time: {elapsed:.3f}s ({total / elapsed if elapsed else 0:,.0f} nodes/s)')
+    return total
+
+
+def run_board(fen: str, depth: int) -> int:
+    from game_state import GameState
+
+    game_state = GameState(fen=fen)
+    start = time.perf_counter()
+    nodes = perft_board(game_state, depth)
+    elapsed = time.perf_counter() - start
+    print(f'Nodes: {nodes}')
+    print(f'Time: {elapsed:.3f}s ({nodes / elapsed if elapsed else 0:,.0f} nodes/s)')
+    return nodes
+
+
+def run_suite(max_depth: int, max_nodes: Optional[int], objects: bool = False) -> bool:
+    """
+    Runs every suite position up to the given depth and reports mismatches
+    :param objects: Count on the object model instead of the bitboard core
+    :return: True when every count matches
+    """
+    passed = True
+    total_nodes = 0
+    total_time = 0.0
+    for case in PERFT_SUITE:
+        for depth, expected in sorted(case.nodes.items()):
+            if depth > max_depth or (max_nodes is not None and expected > max_nodes):
+                continue
+            if objects:
+                from game_state import GameState
+
+                game_state = GameState(fen=case.fen)
+                start = time.perf_counter()
+                nodes = perft_board(game_state, depth)
+            else:
+                position = BitboardPosition.from_fen(case.fen)
+                start = time.perf_counter()
+                nodes = perft(position, depth)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+            status = 'ok' if nodes == expected else f'FAIL (expected {expected})'
+            passed = passed and nodes == expected
+            print(
+                f'{case.name:<24} depth {depth}: {nodes:>10} {elapsed:8.3f}s '
+                f'{nodes / elapsed if elapsed else 0:>12,.0f} nodes/s  {status}'
+            )
+    if total_time:
+        print(
+            f'Total: {total_nodes} nodes in {total_time:.3f}s '
+            f'({total_nodes / total_time:,.0f} nodes/s)'
+        )
+    return passed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Count move-generation leaf nodes (perft).')
+    parser.add_argument('depth', type=int, nargs='?', default=3, help='plies to expand')
+    parser.add_argument('--fen', default=STARTING_FEN, help='position to start from')
+    parser.add_argument('--suite', action='store_true', help='run the bundled reference positions')
+    parser.add_argument(
+        '--max-nodes',
+        type=int,
+        default=None,
+        help='skip suite entries expecting more leaf nodes than this',
+    )
+    parser.add_argument(
+        '--objects',
+        action='store_true',
+        help='count on the Square/Piece object model instead of the bitboard core',
+    )
+    args = parser.parse_args(argv)
+
+    if args.suite:
+        return 0 if run_suite(args.depth, args.max_nodes, args.objects) else 1
+    if args.objects:
+        run_board(args.fen, args.depth)
+        return 0
+    run_divide(args.fen, args.depth)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from constants import PAWN
+from game_state import GameState
+from moves import FEN_PIECES, KING_CASTLE, QUEEN_CASTLE, parse_square, promotion_piece
+
+TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Movetext tokens: comments, variation brackets, NAGs, move numbers, then anything else
+TOKEN = re.compile(r'\{[^}]*\}?|;[^\n]*|[()]|\$\d+|\d+\.+|[^\s{}();]+')
+SAN = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?')
+CASTLING = {'O-O': KING_CASTLE, 'O-O-O': QUEEN_CASTLE, '0-0': KING_CASTLE, '0-0-0': QUEEN_CASTLE}
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+
+class PgnGame(NamedTuple):
+    number: int  # position in the archive, from 1
+    tags: Dict[str, str]
+    moves: List[str]  # SAN of the main line
+    result: str  # game termination marker, '*' when missing
+
+
+def parse_movetext(text: str) -> PgnGame:
+    """
+    Reads the main line of a game's movetext, dropping comments, variations, NAGs and move numbers
+    :return: A PgnGame holding only the moves and result
+    """
+    moves = []
+    result = '*'
+    depth = 0
+    for token in TOKEN.findall(text):
+        first = token[0]
+        if first == '(':
+            depth += 1
+        elif first == ')':
+            depth -= 1
+        elif depth or first in '{;$' or token[-1] == '.':  # move numbers and 'e.p.'
+            continue
+        elif token in RESULTS:
+            result = token
+        else:
+            moves.append(token)
+    return PgnGame(0, {}, moves, result)
+
+
+def read_games(source: Union[str, IO[str]]) -> Iterator[PgnGame]:
+    """
+    Streams the games of a PGN file one at a time,
+    so archives of any size are read holding a single game.
+    :param source: Path of the file, or an open text file
+    :return: Iterator of PgnGame
+    """
+    if isinstance(source, str):
+        with open(source, encoding='utf-8', errors='replace') as file:
+            yield from read_games(file)
+        return
+    tags: Dict[str, str] = {}
+    movetext: List[str] = []
+    number = 0
+    in_comment = False
+    for line in source:
+        line = line.strip()
+        if not in_comment:
+            if line.startswith('%'):
+                continue
+            if line.startswith('['):
+                if movetext:
+                    number += 1
+                    yield parse_movetext(' '.join(movetext))._replace(number=number, tags=tags)
+                    tags, movetext = {}, []
+                match = TAG.match(line)
+                if match:
+                    tags[match.group(1)] = match.group(2).replace('\\"', '"').replace('\\\\', '\\')
+                continue
+        if line:
+            movetext.append(line)
+            # Brace comments may run over several lines and contain '['
+            opened, closed = line.rfind('{'), line.rfind('}')
+            if opened != closed:
+                in_comment = opened > closed
+    if tags or movetext:
+        number += 1
+        yield parse_movetext(' '.join(movetext))._replace(number=number, tags=tags)
+
+
+def resolve_san(game_state: GameState, san: str) -> int:
+    """
+    Finds the legal move of the side to move written in Standard Algebraic Notation
+    :param san: e.g. 'Nbd7', 'exd6', 'e8=Q+' or 'O-O'
+    :return: Packed move for GameState.apply
+    """
+    token = san.rstrip('+#!?')
+    moves = game_state.legal_moves()
+    if token in CASTLING:
+        flags = CASTLING[token]
+        for move in moves:
+            if move >> 12 == flags:
+                return move
+        raise ValueError(f'Illegal move: {san}')
+    match = SAN.fullmatch(token)
+    if match is None:
+        raise ValueError(f'Invalid SAN: {san}')
+    letter, file, rank, target, promotion = match.groups()
+    kind = FEN_PIECES.index(letter.lower()) if letter else PAWN
+    promoted = FEN_PIECES.index(promotion.lower()) if promotion else 0
+    to = parse_square(target)
+    grid = game_state.board.grid
+    found = [
+        move
+        for move in moves
+        if move >> 6 & 63 == to
+        and grid[move & 63].piece.kind == kind
+        and (file is None or (move & 7) == ord(file) - ord('a'))
+        and (rank is None or (move & 63) >> 3 == int(rank) - 1)
+        and promotion_piece(move) == promoted
+    ]
+    if len(found) != 1:
+        raise ValueError(f'{"Ambiguous" if found else "Illegal"} move: {san}')
+    return found[0]
+
+
+def replay_game(game: PgnGame) -> Dict[str, object]:
+    """
+    Plays a game's moves on the object model
+    :return: JSON-ready summary: final FEN, recorded and reached result, plies played and
+             the first move that could not be played, if any
+    """
+    summary = {
+        'game': game.number,
+        'white': game.tags.get('White'),
+        'black': game.tags.get('Black'),
+        'result': game.tags.get('Result', game.result),
+        'plies': 0,
+        'status': None,
+        'fen': None,
+        'error': None,
+    }
+    try:
+        game_state = GameState(fen=game.tags.get('FEN'))
+    except ValueError as error:
+        summary['error'] = str(error)
+        return summary
+    for ply, san in enumerate(game.moves, 1):
+        try:
+            game_state.check_not_over()
+            # resolve_san only returns legal moves, so push's second legality check is skipped
+            game_state.apply(resolve_san(game_state, san))
+        except ValueError as error:
+            summary['error'] = f'ply {ply} ({san}): {error}'
+            break
+    summary['plies'] = len(game_state.move_stack)
+    summary['status'] = game_state.result
+    summary['fen'] = game_state.board.to_fen()
+    return summary
+
+
+def replay_games(games: List[PgnGame]) -> List[Dict[str, object]]:
+    return [replay_game(game) for game in games]
+
+
+def imap_bounded(
+    pool, function: Callable[[list], list], items: Iterable, chunksize: int, window: int
+) -> Iterator:
+    """
+    Like pool.imap, but reads the input only as fast as the workers use it;
+    Pool.imap would read the whole input ahead of the workers.
+    :param function: Takes a list of up to `chunksize` items and returns a list of results
+    :param window: Most lists in flight; two per worker keeps every worker busy
+    :return: Results in input order
+    """
+    items = iter(items)
+    pending = deque()
+    while True:
+        while len(pending) < window:
+            chunk = list(islice(items, chunksize))
+            if not chunk:
+                break
+            pending.append(pool.apply_async(function, (chunk,)))
+        if not pending:
+            return
+        yield from pending.popleft().get()
+
+
+def replay_archive(
+    games: Iterable[PgnGame], workers: int = 1, chunksize: int = 16
+) -> Iterator[Dict[str, object]]:
+    """
+    Replays games across a pool of worker processes, yielding summaries in archive order.
+    At most two chunks per worker are in flight, so memory stays bounded however long
+    the input is.
+    :param workers: Processes to replay with; 1 replays in this process
+    :param chunksize: Games sent to a worker per task
+    """
+    if workers <= 1:
+        yield from map(replay_game, games)
+        return
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers) as pool:
+        yield from imap_bounded(pool, replay_games, games, chunksize, 2 * workers)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Replay PGN games and write a summary per game.')
+    parser.add_argument('path', help='PGN file')
+    parser.add_argument('--output', '-o', default='-', help='JSONL file to write, - for stdout')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1, help='processes to replay with'
+    )
+    parser.add_argument('--chunksize', type=int, default=16, help='games per worker task')
+    parser.add_argument('--limit', type=int, default=None, help='stop after this many games')
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    games = plies = errors = 0
+    start = time.perf_counter()
+    try:
+        for summary in replay_archive(
+            islice(read_games(args.path), args.limit), args.workers, args.chunksize
+        ):
+            output.write(json.dumps(summary) + '\n')
+            games += 1
+            plies += summary['plies']
+            errors += summary['error'] is not None
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+    rate = games / elapsed if elapsed else 0.0
+    print(
+        f'{games} games, {plies} plies, {errors} with errors in {elapsed:.3f}s '
+        f'({rate:,.1f} games/s)',
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,20 +1,184 @@
-import pygame
-from pieces import Queen, Rook, Pawn, King, Bishop, Knight
+from collections.abc import MutableMapping
+from pieces import Queen, Rook, Bishop, Knight
+from attack_tables import FULL
+from constants import PAWN, QUEEN
+from moves import PROMOTION, PROMOTION_PIECES, MoveBuffer
+
+
+class LegalMoves(MutableMapping):
+    """
+    Legal destinations of one player's pieces, keyed by piece.
+    A piece's destinations are only computed when they are first read, e.g. for the selected piece,
+    so finding out whether any move exists stops at the first piece that has one.
+    Valid until the board changes.
+    """
+
+    def __init__(self, player, moves=None, allowed=None):
+        """
+        :param player: Player whose move cache computes the pending pieces
+        :param moves: Destinations by piece, None for the pieces still pending
+        :param allowed: Allowed mask of each pending piece, see Restrictions.allowed
+        """
+        self.player = player
+        self.moves = {} if moves is None else moves
+        self.allowed = {} if allowed is None else allowed
+
+    def __getitem__(self, piece):
+        moves = self.moves[piece]
+        if moves is None:
+            moves = self.moves[piece] = self.player.compute_moves(piece, self.allowed.pop(piece))
+        return moves
+
+    def __setitem__(self, piece, moves):
+        self.moves[piece] = moves
+        self.allowed.pop(piece, None)
+
+    def __delitem__(self, piece):
+        del self.moves[piece]
+        self.allowed.pop(piece, None)
+
+    def __contains__(self, piece):
+        return piece in self.moves
+
+    def __iter__(self):
+        return iter(self.moves)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def items(self):
+        self.compute_all()
+        return self.moves.items()
+
+    def values(self):
+        self.compute_all()
+        return self.moves.values()
+
+    def compute_all(self):
+        """
+        Computes every pending piece, for callers that need all the moves
+        """
+        if self.allowed:
+            moves = self.moves
+            compute_moves = self.player.compute_moves
+            for piece, allowed in self.allowed.items():
+                moves[piece] = compute_moves(piece, allowed)
+            self.allowed = {}
+
+    def any_moves(self):
+        """
+        Whether any piece can move. Known destinations are looked at first,
+        then pending pieces are computed one at a time, the king last as it is the dearest
+        """
+        pending = []
+        for piece, moves in self.moves.items():
+            if moves is None:
+                pending.append(piece)
+            elif moves:
+                return True
+        king = self.player.king
+        pending.sort(key=lambda piece: piece is king)
+        for piece in pending:
+            if self[piece]:
+                return True
+        return False
+
+    def packed_moves(self):
+        """
+        :return: The packed moves these destinations were read from, None if there are none
+        """
+        return None
+
+
+class PackedLegalMoves(LegalMoves):
+    """
+    Legal moves generated as packed moves, e.g. by the bitboard backend.
+    They are sorted into destinations per piece only when a piece's moves are first read,
+    so the status check and generate_moves use the list as it was generated.
+    """
+
+    def __init__(self, player, packed):
+        """
+        :param player: Player the moves belong to
+        :param packed: Packed legal moves of the player, one per promotion piece
+        """
+        super().__init__(player)
+        self.packed = packed  # None once the destinations were changed
+        self.mapped = False
+
+    def map_moves(self):
+        """
+        Sorts the packed moves into destinations per piece; every piece of the player gets an entry
+        """
+        if self.mapped:
+            return
+        self.mapped = True
+        grid = self.player.board.grid
+        color = self.player.color
+        moves = self.moves
+        for square in grid:
+            if square.piece is not None and square.piece.color == color:
+                moves[square.piece] = []
+        for move in self.packed:
+            # One entry per destination; the promotion piece is picked later
+            if move >> 12 & PROMOTION and PROMOTION_PIECES[move >> 12 & 3] != QUEEN:
+                continue
+            moves[grid[move & 63].piece].append(grid[move >> 6 & 63])
+
+    def __getitem__(self, piece):
+        self.map_moves()
+        return self.moves[piece]
+
+    def __setitem__(self, piece, moves):
+        self.map_moves()
+        self.packed = None
+        self.moves[piece] = moves
+
+    def __delitem__(self, piece):
+        self.map_moves()
+        self.packed = None
+        del self.moves[piece]
+
+    def __contains__(self, piece):
+        self.map_moves()
+        return piece in self.moves
+
+    def __iter__(self):
+        self.map_moves()
+        return iter(self.moves)
 
-pygame.init()
+    def __len__(self):
+        self.map_moves()
+        return len(self.moves)
+
+    def compute_all(self):
+        self.map_moves()
+
+    def any_moves(self):
+        if self.packed is not None:
+            return bool(self.packed)
+        return any(self.moves.values())
+
+    def packed_moves(self):
+        return self.packed
 
 
 class Player:
+    is_engine = False
+
     def __init__(self, board, color):
         self.board = board
         self.color = color
         self.selected = None
         self.king = self.board.kings[self.color]
         self.opponent = None
-        self.legal_moves = {}
+        self.legal_moves = LegalMoves(self)  # replaced by get_legal_moves
         self.promoting_pawn = None
+        self.pieces = []  # this player's pieces when the moves were last listed
+        # piece -> (allowed mask, squares watched, destinations), see compute_moves
+        self.move_cache = {}
+        self.cache_version = -1  # Board.version when the cache was last refreshed
 
-        self.set_legal_moves()
         self.get_legal_moves(None)
 
     def set_opponent(self, other):
@@ -28,89 +192,118 @@ class Player:
         Determines whether the game should continue or end.
         Called ONLY from GameState.
         """
-        flag = True
-        insufficient = False
         self.get_legal_moves(check)
 
-        if len(self.legal_moves) == 1:
-            if len(self.opponent.legal_moves) == 1:
-                insufficient = True
-            elif len(self.opponent.legal_moves) == 2:
-                insufficient = True
-                for piece in self.opponent.legal_moves:
-                    if isinstance(piece, (Queen, Rook, Pawn)):
-                        insufficient = False
-
-        elif len(self.legal_moves) == 2:
-            insufficient = True
-            remaining = None
-            for piece in self.legal_moves:
-                if isinstance(piece, (Queen, Rook, Pawn)):
-                    insufficient = False
-                elif not isinstance(piece, King):
-                    remaining = piece
-
-            if insufficient:
-                if len(self.opponent.legal_moves) == 2:
-                    opponent_remaining = None
-                    for piece in self.opponent.legal_moves:
-                        if isinstance(piece, (Queen, Rook, Pawn)):
-                            insufficient = False
-                        elif not isinstance(piece, King):
-                            opponent_remaining = piece
-
-                    if isinstance(remaining, Bishop) and isinstance(opponent_remaining, Bishop):
-                        if remaining.square.color != opponent_remaining.square.color:
-                            insufficient = False
-                    else:
-                        insufficient = False
-                elif len(self.opponent.legal_moves) > 2:
-                    insufficient = False
-
-        for piece in self.legal_moves:
-            if len(self.legal_moves[piece]) != 0:
-                flag = False
-
-        if check is not None:
-            if flag:
-                return 'Checkmate'
-            elif insufficient:
-                return 'Draw by insufficient material'
-            else:
-                return 'Continue'
-        elif flag:
-            return 'Stalemate'
-        elif insufficient:
+        if not self.has_legal_move():
+            return 'Checkmate' if check is not None else 'Stalemate'
+        elif self.board.insufficient_material():
             return 'Draw by insufficient material'
+        elif self.board.is_fifty_move_draw():
+            return 'Draw by fifty-move rule'
+        elif self.board.is_threefold_repetition():
+            return 'Draw by threefold repetition'
         else:
             return 'Continue'
 
-    def set_legal_moves(self):
+    def get_legal_moves(self, check=None):
         """
-        Initializes pieces at object creation
+        Lists the pieces that may move and finds the checks and pins that restrict them.
+        Their destinations are computed lazily, see LegalMoves.
+        Checks and pins are found in one pass from the king, so `check` is only kept for callers.
         """
-        limit = (1, 3) if self.color == 'White' else (7, 9)
-        for i in range(limit[0], limit[1]):
-            for j in range(1, 9):
-                self.legal_moves[self.board.get_square(i, j).piece] = []
+        if self.board.move_generator is not None:
+            self.legal_moves = PackedLegalMoves(
+                self, self.board.move_generator.legal_moves(self.board, self.color))
+            return
+
+        # Only the destinations of pieces that moved, whose allowed mask changed with a check
+        # or pin, or that reach a changed square are computed again (see Movement.reach)
+        board = self.board
+        grid = board.grid
+        color = self.color
+        king = self.king
+        changed = board.changes_since(self.cache_version)
+        self.cache_version = board.version
+        restrictions = board.move_validator.restrictions(board, color)
+        evasions, pins = restrictions.evasions, restrictions.pins
+
+        # Captured and promoted pieces drop out, pieces put back by unmaking a move come in
+        pieces = [piece for piece in self.pieces if piece.square is not None]
+        known = set(pieces)
+        bits = changed
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            piece = grid[bit.bit_length() - 1].piece
+            if piece is not None and piece.color == color and piece not in known:
+                pieces.append(piece)
+        self.pieces = pieces
+
+        cache = self.move_cache
+        self.move_cache = move_cache = {}
+        moves = {}
+        pending = {}
+        for piece in pieces:
+            # In double check the evasion mask is empty, so only the king moves
+            allowed = FULL if piece is king else evasions & pins.get(piece, FULL)
+            entry = cache.get(piece)
+            if entry is None or entry[0] != allowed or changed & entry[1]:
+                moves[piece] = None
+                pending[piece] = allowed
+            else:
+                move_cache[piece] = entry
+                moves[piece] = entry[2]
+        self.legal_moves = LegalMoves(self, moves, pending)
 
-    def get_legal_moves(self, check):
+    def compute_moves(self, piece, allowed):
         """
-        Calculates legal moves for all pieces
+        Computes and caches the destinations of one piece
+        :param allowed: Bitmask of destinations left open by checks and pins
+        :return: a list of legal moves
         """
-        if check is not None and check.double_check():
-            self.legal_moves[self.king] = self.king.possible_moves(check)
-            return
+        moves = piece.possible_moves(allowed) if allowed else []
+        self.move_cache[piece] = (allowed, piece.square.bit | piece.movement.reach(piece), moves)
+        return moves
 
-        captured = []
-        for piece in self.legal_moves:
-            if piece.square is None:
-                captured.append(piece)
-                continue
-            self.legal_moves[piece] = piece.possible_moves(check)
+    def has_legal_move(self):
+        """
+        Whether the player can move at all, stopping at the first piece that can
+        """
+        return self.legal_moves.any_moves()
 
-        for piece in captured:
-            del self.legal_moves[piece]
+    def clear_move_cache(self):
+        """
+        Forgets every cached destination, so the next get_legal_moves computes them all
+        """
+        self.move_cache = {}
+        self.pieces = []
+        self.cache_version = -1
+
+    def generate_moves(self, buffer=None):
+        """
+        Writes the current legal moves into a move buffer as packed moves, one per promotion piece
+        :param buffer: MoveBuffer to reuse, allocated when omitted
+        :return: The filled buffer
+        """
+        if buffer is None:
+            buffer = MoveBuffer()
+        buffer.clear()
+        self.get_legal_moves()
+        packed = self.legal_moves.packed_moves()
+        if packed is not None:
+            buffer.extend(packed)
+            return buffer
+        last_row = 8 if self.color == 'White' else 1
+        encode = self.board.encode_move
+        for piece, squares in self.legal_moves.items():
+            frm = piece.square.index
+            for sq in squares:
+                if piece.kind == PAWN and sq.row == last_row:
+                    for promotion in PROMOTION_PIECES:
+                        buffer.append(encode(frm, sq.index, promotion))
+                else:
+                    buffer.append(encode(frm, sq.index))
+        return buffer
 
     def clear_legal_moves(self):
         """
@@ -118,39 +311,24 @@ class Player:
         """
         for piece in self.legal_moves:
             self.legal_moves[piece] = []
-            if isinstance(piece, Pawn):
-                piece.en_passant = 0
-
-    def highlight_legal_moves(self, piece):
-        """
-        Highlights legal moves for selected piece
-        """
-        for move in self.legal_moves[piece]:
-            move.highlighted = not move.highlighted
 
     def select(self, piece):
         """
-        Selects a piece
+        Selects a piece; the renderer's BoardView highlights it and its legal moves
         """
         self.selected = piece
         if self.selected is not None and self.selected.color != self.color:
             self.selected = None
 
-        if self.selected is not None:
-            self.highlight_legal_moves(self.selected)
-            piece.square.selected_highlighted = True
-
     def unselect(self):
         """
         Unselects current piece
         """
-        self.selected.square.selected_highlighted = False
-        self.highlight_legal_moves(self.selected)
         self.selected = None
 
     def end_turn(self):
         """
-        Clears selection and move highlights at end of turn.
+        Clears selection and legal moves at end of turn.
         """
         self.selected = None
         self.clear_legal_moves()
@@ -159,7 +337,8 @@ class Player:
         """
         Handles pawn promotion
         """
-        if sq.column != self.promoting_pawn.square.column:
+        target = self.board.promotion_square
+        if sq.column != target.column:
             return 'Continue'
 
         if self.color == 'White':
@@ -171,22 +350,19 @@ class Player:
         if piece_cls is None:
             return 'Continue'
 
-        promoted_piece = self.promoting_pawn.promote(piece_cls)
-        if promoted_piece is not None:
-            del self.legal_moves[self.promoting_pawn]
-            self.legal_moves[promoted_piece] = []
-            self.promoting_pawn = None
-            self.board.promoting_pawn = None
-            self.end_turn()
-            return 'Continue'
-
+        frm = self.promoting_pawn.square.index
+        self.board.make_move(self.board.encode_move(frm, target.index, piece_cls.kind))
+        self.promoting_pawn = None
+        self.board.promoting_pawn = None
+        self.board.promotion_square = None
+        self.end_turn()
         return 'Continue'
 
-    def play(self, x, y):
+    def play(self, sq):
         """
         Handles a player click
+        :param sq: The square clicked, see BoardView.square_at
         """
-        sq = self.board.get_clicked_square(x, y)
         if sq is None:
             return 'Continue'
 
@@ -195,18 +371,18 @@ class Player:
 
         if self.selected is not None:
             if sq in self.legal_moves[self.selected]:
-                if self.king.square.check_highlighted:
-                    self.king.square.check_highlighted = False
-
-                self.selected.square.selected_highlighted = False
-                self.promoting_pawn = self.selected.move(sq)
-
+                piece = self.selected
                 self.unselect()
                 self.clear_legal_moves()
 
-                if self.promoting_pawn is not None:
-                    self.board.promoting_pawn = self.promoting_pawn
+                if piece.kind == PAWN and sq.row in (1, 8):
+                    # The move is played once the promotion piece is picked
+                    self.promoting_pawn = piece
+                    self.board.promoting_pawn = piece
+                    self.board.promotion_square = sq
+                    return 'Continue'
 
+                self.board.make_move(self.board.encode_move(piece.square.index, sq.index))
                 return 'Continue'
 
             elif sq.piece is not None:
@@ -1,8 +1,11 @@
 import pygame
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 if TYPE_CHECKING:
     from board import Board
+    from game_state import GameState
 from constants import (
+    IMAGE_PATHS,
+    PIECE_NAMES,
     SCREEN_WIDTH,
     SCREEN_HEIGHT,
     TEXT_SIZE,
@@ -10,49 +13,161 @@ from constants import (
     END_SCREEN_WIDTH,
     END_SCREEN_HEIGHT
 )
+from assets import AssetManager
+from attack_tables import FULL
 from pieces import Piece
+from view import BoardView, Rect
+
 
 class ChessRenderer:
-    def __init__(self, screen: pygame.Surface) -> None:
+    def __init__(self, screen: pygame.Surface, asset_manager: Optional[AssetManager] = None,
+                 view: Optional[BoardView] = None) -> None:
+        """
+        :param screen: Surface to draw on
+        :param asset_manager: Piece images, loaded from IMAGE_PATHS when omitted
+        :param view: Geometry and highlight state of the board, see view.py
+        """
         self.screen: pygame.Surface = screen
+        self.asset_manager: AssetManager = asset_manager or AssetManager(IMAGE_PATHS)
+        self.view: BoardView = view or BoardView()
+        self.dirty: List[Rect] = []  # screen areas drawn since the last update
+        # Prebuilt surfaces keyed by what they show:
+        # the empty board, end screens and promotion dialogues
+        self.layers: Dict[tuple, pygame.Surface] = {}
+        self.font: Optional[pygame.font.Font] = None
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Makes the next draw_board repaint every square, e.g. after the window was uncovered
+        """
+        # What is on screen: the board and its version, the view's highlights,
+        # the squares under the promotion dialogue and the end screen's (result, turn)
+        self.board: Optional['Board'] = None
+        self.version: int = 0
+        self.selected: Optional[int] = None
+        self.highlighted: Set[int] = set()
+        self.check: Optional[int] = None
+        self.overlay: int = 0
+        self.end_screen: Optional[Tuple[str, int]] = None
 
     def draw_square(self, square) -> None:
         """
         Draw a single square with appropriate color and highlighting
         """
-        if square.highlighted:
-            if square.piece is not None:
-                pygame.draw.rect(self.screen, square.highlight, (square.x, square.y, square.length, square.length))
-            else:
-                pygame.draw.circle(self.screen, square.highlight, (square.x + square.length // 2, square.y + square.length // 2),
-                                   square.length // 6)
-        elif square.check_highlighted:
-            pygame.draw.rect(self.screen, square.check_highlight, (square.x, square.y, square.length, square.length))
-        elif square.selected_highlighted:
-            pygame.draw.rect(self.screen, square.highlight, (square.x, square.y, square.length, square.length))
+        view = self.view
+        x, y, length, _ = rect = view.square_rect(square)
+        if square.index in view.highlighted and square.piece is not None:
+            pygame.draw.rect(self.screen, view.highlight, rect)
+        elif square.index == view.check and square.index not in view.highlighted:
+            pygame.draw.rect(self.screen, view.check_highlight, rect)
+        elif square.index == view.selected and square.index not in view.highlighted:
+            pygame.draw.rect(self.screen, view.highlight, rect)
         else:
-            pygame.draw.rect(self.screen, square.color, (square.x, square.y, square.length, square.length))
+            self.screen.blit(self.board_layer(), (x, y), (x - view.x, y - view.y, length, length))
+            if square.index in view.highlighted:
+                pygame.draw.circle(self.screen, view.highlight, (x + length // 2, y + length // 2),
+                                   length // 6)
 
         if square.piece is not None:
-            self.draw_piece(square.piece, square.x, square.y)
+            self.draw_piece(square.piece, x, y)
+
+    @staticmethod
+    def new_layer(width: int, height: int) -> pygame.Surface:
+        """
+        Opaque surface in the display's pixel format, once a display mode is set
+        """
+        layer = pygame.Surface((width, height))
+        return layer.convert() if pygame.display.get_surface() is not None else layer
+
+    def board_layer(self) -> pygame.Surface:
+        """
+        The empty checkerboard, built once per square size and colours
+        """
+        view = self.view
+        key = ('board', view.square_length, view.white, view.black)
+        layer = self.layers.get(key)
+        if layer is None:
+            length = view.square_length
+            layer = self.layers[key] = self.new_layer(8 * length, 8 * length)
+            for row in range(8):
+                for column in range(8):
+                    # Rank 8 at the top, a light square in each player's right-hand corner
+                    color = view.white if (row + column) % 2 == 0 else view.black
+                    layer.fill(color, (column * length, row * length, length, length))
+        return layer
 
     def draw_piece(self, piece: Piece, x: int, y: int) -> None:
         """
         Draw a piece image at the given position
         """
-        if piece.img is not None:
-            self.screen.blit(piece.img, (x, y))
+        image = self.asset_manager.get_image(PIECE_NAMES[piece.kind], piece.color,
+                                             self.view.square_length)
+        self.screen.blit(image, (x, y))
 
-    def draw_board(self, board: 'Board') -> None:
+    def draw_board(self, game_state: 'GameState') -> int:
         """
-        Draw the entire board including all squares and pieces
+        Redraws the squares whose piece or highlight changed since the last call,
+        and the promotion dialogue when it appears or a square under it was redrawn
+        :return: Number of squares redrawn
         """
-        for row in board.squares:
-            for square in row:
-                self.draw_square(square)
+        self.view.update(game_state)
+        return self.draw_position(game_state.board)
+
+    def draw_position(self, board: 'Board') -> int:
+        """
+        Redraws the squares of a board changed since the last call, with the highlights the view
+        already holds; draws boards that have no GameState, e.g. for image export
+        :return: Number of squares redrawn
+        """
+        view = self.view
+        if board is not self.board:
+            # A new game: nothing of the last board's dialogue or end screen is on screen
+            self.board = board
+            self.overlay = 0
+            self.end_screen = None
+            changed = FULL
+        else:
+            changed = board.changes_since(self.version)
+            for index in (self.selected, self.check, view.selected, view.check):
+                if index is not None:
+                    changed |= 1 << index
+            for index in self.highlighted.symmetric_difference(view.highlighted):
+                changed |= 1 << index
+        self.version = board.version
+        self.selected, self.highlighted, self.check = view.selected, view.highlighted, view.check
 
-        if board.promoting_pawn is not None:
+        overlay = self.promotion_overlay(board)
+        if overlay != self.overlay:
+            # Squares the dialogue leaves are uncovered, squares it arrives on are drawn under it
+            changed |= overlay | self.overlay
+            self.overlay = overlay
+
+        grid = board.grid
+        count = 0
+        redrawn = changed
+        while changed:
+            index = (changed & -changed).bit_length() - 1
+            changed &= changed - 1
+            self.draw_square(grid[index])
+            self.dirty.append(view.square_rect(grid[index]))
+            count += 1
+
+        if redrawn & overlay:
             self.draw_promotion_dialogue(board)
+        return count
+
+    @staticmethod
+    def promotion_overlay(board: 'Board') -> int:
+        """
+        :return: Bitmask of the squares the promotion dialogue covers, 0 when there is none
+        """
+        if board.promoting_pawn is None:
+            return 0
+        index = board.promotion_square.index
+        # The dialogue runs four squares from the promotion square towards the board's middle
+        step = -8 if board.promoting_pawn.color == 'White' else 8
+        return sum(1 << (index + i * step) for i in range(4))
 
     def draw_promotion_dialogue(self, board: 'Board') -> None:
         """
@@ -60,60 +175,83 @@ class ChessRenderer:
         """
         if board.promoting_pawn is None:
             return
-        length: int = board.square_length
-        x: int = board.promoting_pawn.square.x
-        y: int = board.promoting_pawn.square.y
-        asset_manager = board.asset_manager
-        if board.promoting_pawn.color == 'White':
-            pygame.draw.rect(self.screen, (73, 81, 111), (x, y, length, 4 * length))
-            self.screen.blit(asset_manager.get_image('Queen', 'White'), (x, y))
-            self.screen.blit(asset_manager.get_image('Rook', 'White'), (x, y + length))
-            self.screen.blit(asset_manager.get_image('Bishop', 'White'), (x, y + 2 * length))
-            self.screen.blit(asset_manager.get_image('Knight', 'White'), (x, y + 3 * length))
+        x, y, length, _ = self.view.square_rect(board.promotion_square)
+        color = board.promoting_pawn.color
+        # White's dialogue runs down from the top rank, Black's up from the bottom one
+        self.screen.blit(self.promotion_layer(color, length),
+                         (x, y) if color == 'White' else (x, y - 3 * length))
 
-        else:
-            pygame.draw.rect(self.screen, (98, 121, 184), (x, y - 3 * length, length, 4 * length))
-            self.screen.blit(asset_manager.get_image('Queen', 'Black'), (x, y))
-            self.screen.blit(asset_manager.get_image('Rook', 'Black'), (x, y - length))
-            self.screen.blit(asset_manager.get_image('Bishop', 'Black'), (x, y - 2 * length))
-            self.screen.blit(asset_manager.get_image('Knight', 'Black'), (x, y - 3 * length))
+    def promotion_layer(self, color: str, length: int) -> pygame.Surface:
+        """
+        The promotion dialogue of a colour, queen nearest the promotion square
+        """
+        key = ('promotion', color, length)
+        layer = self.layers.get(key)
+        if layer is None:
+            layer = self.layers[key] = self.new_layer(length, 4 * length)
+            pieces = ['Queen', 'Rook', 'Bishop', 'Knight']
+            if color == 'White':
+                layer.fill((73, 81, 111))
+            else:
+                layer.fill((98, 121, 184))
+                pieces.reverse()
+            for i, piece in enumerate(pieces):
+                layer.blit(self.asset_manager.get_image(piece, color, length), (0, i * length))
+        return layer
 
     def draw_game_end(self, res: str, player_turn: int) -> None:
         """
-        Draw the game end screen
+        Draw the game end screen, unless it is already shown and nothing was drawn over it
+        """
+        end_screen_x: int = SCREEN_WIDTH // 2 - END_SCREEN_WIDTH // 2
+        end_screen_y: int = SCREEN_HEIGHT // 2 - END_SCREEN_HEIGHT // 2
+        panel = pygame.Rect(end_screen_x, end_screen_y, END_SCREEN_WIDTH, END_SCREEN_HEIGHT)
+        if self.end_screen == (res, player_turn) and panel.collidelist(self.dirty) == -1:
+            return
+        self.end_screen = (res, player_turn)
+        self.screen.blit(self.end_layer(res, player_turn), panel)
+        self.dirty.append(tuple(panel))
+
+    def end_layer(self, res: str, player_turn: int) -> pygame.Surface:
+        """
+        The end screen panel with its messages, built once per result and side to move
         """
-        text_size: int = TEXT_SIZE
-        font = pygame.font.SysFont('SansSerif', text_size)
         winner: Optional[str] = f"{'White' if player_turn == 1 else 'Black'} wins!!" if res == 'Checkmate' else None
+        key = ('end', res, winner)
+        layer = self.layers.get(key)
+        if layer is not None:
+            return layer
+        text_size: int = TEXT_SIZE
+        if self.font is None:
+            self.font = pygame.font.SysFont('SansSerif', text_size)
+        font = self.font
         restart: str = 'Press Space to restart'
 
-        end_screen_color = END_SCREEN_COLOR
-        end_screen_width = END_SCREEN_WIDTH
-        end_screen_height = END_SCREEN_HEIGHT
-        end_screen_x: int = SCREEN_WIDTH // 2 - end_screen_width // 2
-        end_screen_y: int = SCREEN_HEIGHT // 2 - end_screen_height // 2
-        pygame.draw.rect(self.screen, end_screen_color, (end_screen_x, end_screen_y, end_screen_width, end_screen_height))
-
-        pos = (end_screen_x + end_screen_width // 2, end_screen_y + end_screen_height // 2)
+        layer = self.layers[key] = self.new_layer(END_SCREEN_WIDTH, END_SCREEN_HEIGHT)
+        layer.fill(END_SCREEN_COLOR)
+        pos = (END_SCREEN_WIDTH // 2, END_SCREEN_HEIGHT // 2)
 
         message = font.render(res, True, (0, 0, 0))
         rect = message.get_rect()
         rect.center = (pos[0], pos[1] - text_size)
-        self.screen.blit(message, rect)
+        layer.blit(message, rect)
 
         if winner is not None:
             message = font.render(winner, True, (0, 0, 0))
             rect = message.get_rect()
             rect.center = pos
-            self.screen.blit(message, rect)
+            layer.blit(message, rect)
 
         message = font.render(restart, True, (0, 0, 0))
         rect = message.get_rect()
         rect.center = (pos[0], pos[1] + text_size)
-        self.screen.blit(message, rect)
+        layer.blit(message, rect)
+        return layer
 
     def update(self) -> None:
         """
-        Update the display
+        Pushes the areas drawn since the last update to the display
         """
-        pygame.display.update()
\ No newline at end of file
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
@@ -1,40 +1,186 @@
-from typing import Optional, TYPE_CHECKING
+from dataclasses import dataclass, field
+from typing import Dict, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
-    from board import Board
+    from board import Board, Square
     from pieces import Piece, King
 
-from pieces import Dummy, Knight, Bishop, Rook, Queen, Pawn
+from attack_tables import FULL, PAWN_SQUARES
+from constants import BISHOP, COLOR_NAMES, KING, KNIGHT, PAWN, QUEEN, ROOK
+from movement import BISHOP_MOVEMENT, KING_MOVEMENT, KNIGHT_MOVEMENT, ROOK_MOVEMENT
+
+
+@dataclass
+class Restrictions:
+    """
+    Destinations open to the side to move, as bitmasks indexed like Board.grid
+    """
+    checkers: int = 0
+    evasions: int = FULL  # squares that block or capture the checker; FULL when not in check
+    # pinned piece -> its ray up to and including the pinner
+    pins: Dict['Piece', int] = field(default_factory=dict)
+
+    def double_check(self) -> bool:
+        return bool(self.checkers & (self.checkers - 1))
+
+    def allowed(self, piece: 'Piece') -> int:
+        return self.evasions & self.pins.get(piece, FULL)
+
 
 class MoveValidator:
-    def is_in_check(self, board: 'Board', color: str) -> Optional['Check']:
+    """
+    Check and pin detection. Attacks are found by walking the jumps and rays of the movement
+    flyweights in movement.py outwards from the square, so no pieces are constructed.
+    """
+
+    def is_in_check(self, board: 'Board', color: str, square=None) -> Optional['Check']:
         """
-        Check if the king of the given color is in check.
+        Check if the king of the given color is in check, or would be on the given square.
         """
         king: 'King' = board.kings[color]
+        if square is None:
+            square = king.square
+        opponent = 'Black' if color == 'White' else 'White'
+        attackers = self.attackers_to(board, square, opponent, king)
+        if not attackers:
+            return None
+
         checking_pieces = []
-        for piece_class in [Knight, Bishop, Rook, Queen]:
-            checking_piece = self.is_attacked_by(board, king.square, piece_class, color)
-            if checking_piece is not None:
-                checking_pieces.append(checking_piece)
-
-        # Check for pawn attacks
-        row_inc = 1 if color == 'White' else -1
-        right = board.get_square(king.square.row + row_inc, king.square.column + 1)
-        left = board.get_square(king.square.row + row_inc, king.square.column - 1)
-        for sq in [right, left]:
-            if sq and isinstance(sq.piece, Pawn) and sq.piece.color != color:
-                checking_pieces.append(sq.piece)
+        while attackers:
+            bit = attackers & -attackers
+            attackers ^= bit
+            checking_pieces.append(board.grid[bit.bit_length() - 1].piece)
 
         from pieces import Check
-        return None if len(checking_pieces) == 0 else Check(king, checking_pieces)
+        return Check(king, checking_pieces)
+
+    def restrictions(self, board: 'Board', color: str) -> Restrictions:
+        """
+        Walks out from the king once to find every checker and pinned piece of the given color.
+        """
+        grid = board.grid
+        king: 'King' = board.kings[color]
+        sq = king.square.index
+        opponent = 'Black' if color == 'White' else 'White'
+        restrictions = Restrictions()
+        checkers = 0
+        evasions = FULL
+
+        for slider, rays in ((ROOK, ROOK_MOVEMENT.rays[sq]), (BISHOP, BISHOP_MOVEMENT.rays[sq])):
+            for ray in rays:
+                path = 0
+                shield = None
+                for index in ray:
+                    path |= 1 << index
+                    piece = grid[index].piece
+                    if piece is None:
+                        continue
+                    if piece.color == color:
+                        if shield is not None:
+                            break
+                        shield = piece
+                        continue
+                    if piece.kind == slider or piece.kind == QUEEN:
+                        if shield is None:
+                            checkers |= 1 << index
+                            evasions = path
+                        else:
+                            restrictions.pins[shield] = path
+                    break
+
+        leapers = 0
+        for index in KNIGHT_MOVEMENT.targets[sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == KNIGHT and piece.color == opponent:
+                leapers |= 1 << index
+        for index in PAWN_SQUARES[COLOR_NAMES.index(color)][sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == PAWN and piece.color == opponent:
+                leapers |= 1 << index
+        if leapers:
+            checkers |= leapers
+            evasions = leapers
+
+        restrictions.checkers = checkers
+        if checkers & (checkers - 1):
+            restrictions.evasions = 0
+        elif checkers:
+            restrictions.evasions = evasions
+        return restrictions
+
+    def attackers_to(self, board: 'Board', square: 'Square', color: str,
+                     ignored: Optional['Piece'] = None) -> int:
+        """
+        Finds every piece of the given color attacking a square using the precomputed attack tables.
+        :param ignored: Piece treated as absent, e.g. a king looking past itself along a ray
+        :return: Bitmask of the attacker squares, indexed like Board.grid
+        """
+        grid = board.grid
+        sq = square.index
+        attackers = 0
+        for index in KNIGHT_MOVEMENT.targets[sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == KNIGHT and piece.color == color:
+                attackers |= 1 << index
+        for index in KING_MOVEMENT.targets[sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == KING and piece.color == color:
+                attackers |= 1 << index
+        # A pawn attacks the square from where a pawn of the other color standing on it would attack
+        for index in PAWN_SQUARES[COLOR_NAMES.index(color) ^ 1][sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == PAWN and piece.color == color:
+                attackers |= 1 << index
+        for ray in ROOK_MOVEMENT.rays[sq]:
+            for index in ray:
+                piece = grid[index].piece
+                if piece is None or piece is ignored:
+                    continue
+                if piece.color == color and (piece.kind == ROOK or piece.kind == QUEEN):
+                    attackers |= 1 << index
+                break
+        for ray in BISHOP_MOVEMENT.rays[sq]:
+            for index in ray:
+                piece = grid[index].piece
+                if piece is None or piece is ignored:
+                    continue
+                if piece.color == color and (piece.kind == BISHOP or piece.kind == QUEEN):
+                    attackers |= 1 << index
+                break
+        return attackers
 
-    def is_attacked_by(self, board: 'Board', square, piece_class, color) -> Optional['Piece']:
+    def is_attacked(self, board: 'Board', square: 'Square', color: str,
+                    ignored: Optional['Piece'] = None) -> bool:
         """
-        Check if the square is attacked by the given piece type from the opponent.
+        Whether any piece of the given color attacks the square; stops at the first attacker found.
         """
-        dummy = Dummy(board, color, square, piece_class, board.kings[color], board.asset_manager)
-        moves = dummy.possible_moves(None)
-        for move in moves:
-            if isinstance(move.piece, piece_class) and move.piece.color != color:
-                return move.piece
-        return None
\ No newline at end of file
+        grid = board.grid
+        sq = square.index
+        for index in KNIGHT_MOVEMENT.targets[sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == KNIGHT and piece.color == color:
+                return True
+        for index in PAWN_SQUARES[COLOR_NAMES.index(color) ^ 1][sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == PAWN and piece.color == color:
+                return True
+        for index in KING_MOVEMENT.targets[sq]:
+            piece = grid[index].piece
+            if piece is not None and piece.kind == KING and piece.color == color:
+                return True
+        for ray in ROOK_MOVEMENT.rays[sq]:
+            for index in ray:
+                piece = grid[index].piece
+                if piece is None or piece is ignored:
+                    continue
+                if piece.color == color and (piece.kind == ROOK or piece.kind == QUEEN):
+                    return True
+                break
+        for ray in BISHOP_MOVEMENT.rays[sq]:
+            for index in ray:
+                piece = grid[index].piece
+                if piece is None or piece is ignored:
+                    continue
+                if piece.color == color and (piece.kind == BISHOP or piece.kind == QUEEN):
+                    return True
+                break
+        return False
@@ -0,0 +1,376 @@
+import argparse
+import time
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from bitboard import STARTING_FEN, BitboardPosition
+from constants import KING, PAWN
+from evaluation import PIECE_VALUES, evaluate
+from moves import CAPTURE, NULL_MOVE, PROMOTION, PROMOTION_PIECES, MoveBuffer, move_to_uci
+from transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    TranspositionTable,
+    entry_bound,
+    entry_depth,
+    entry_move,
+    entry_score,
+)
+
+MAX_PLY: int = 64
+INFINITE: int = 32000
+MATE: int = 30000
+# Scores beyond this are mates, counted in plies from the root
+MATE_BOUND: int = MATE - MAX_PLY
+# Checked against the clock once every this many nodes (a power of two minus one)
+TIME_CHECK_MASK: int = 1023
+
+# Move ordering tiers; history scores stay below KILLER_SCORE
+TT_MOVE_SCORE: int = 1 << 30
+CAPTURE_SCORE: int = 1 << 28
+KILLER_SCORE: int = 1 << 26
+HISTORY_LIMIT: int = KILLER_SCORE - 1
+
+
+class SearchInfo(NamedTuple):
+    depth: int
+    score: int  # centipawns from the side to move, or +-(MATE - plies) for a forced mate
+    nodes: int
+    time: float
+    pv: List[int]
+
+    @property
+    def best_move(self) -> int:
+        return self.pv[0] if self.pv else NULL_MOVE
+
+    def pv_uci(self) -> str:
+        return ' '.join(move_to_uci(move) for move in self.pv)
+
+    def __str__(self) -> str:
+        if abs(self.score) >= MATE_BOUND:
+            plies = MATE - abs(self.score)
+            score = f'mate {(plies + 1) // 2 if self.score > 0 else -((plies + 1) // 2)}'
+        else:
+            score = f'cp {self.score}'
+        nps = int(self.nodes / self.time) if self.time else 0
+        return (
+            f'depth {self.depth} score {score} nodes {self.nodes} nps {nps} '
+            f'time {int(self.time * 1000)} pv {self.pv_uci()}'
+        )
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """
+    Mate scores are stored relative to the position rather than to the root
+    """
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class Searcher:
+    """
+    Iterative-deepening negamax alpha-beta search over a BitboardPosition, with principal variation
+    search, quiescence, a transposition table, MVV-LVA capture ordering and killer/history
+    heuristics.
+    """
+
+    def __init__(self, tt: Optional[TranspositionTable] = None, hash_mb: float = 16) -> None:
+        self.tt: TranspositionTable = tt if tt is not None else TranspositionTable(hash_mb)
+        self.buffers: List[MoveBuffer] = [MoveBuffer() for _ in range(MAX_PLY + 1)]
+        self.killers: List[List[int]] = [[NULL_MOVE, NULL_MOVE] for _ in range(MAX_PLY + 1)]
+        self.history: List[int] = [0] * 4096  # indexed from * 64 + to
+        self.pv: List[List[int]] = [[] for _ in range(MAX_PLY + 1)]
+        self.nodes: int = 0
+        self.deadline: Optional[float] = None
+        self.node_limit: Optional[int] = None
+        self.stopped: bool = False
+        self.can_stop: bool = False
+
+    def search(
+        self,
+        position: BitboardPosition,
+        max_depth: int = MAX_PLY,
+        time_limit: Optional[float] = None,
+        node_limit: Optional[int] = None,
+        on_iteration: Optional[Callable[[SearchInfo], None]] = None,
+    ) -> SearchInfo:
+        """
+        Searches the position with iterative deepening until a limit is reached
+        :param position: Position to search, restored before returning
+        :param max_depth: Deepest iteration to run
+        :param time_limit: Seconds to search; the first iteration always completes
+        :param node_limit: Nodes to search; the first iteration always completes
+        :param on_iteration: Called with the result of every completed iteration
+        :return: Result of the last completed iteration
+        """
+        start = self.start_limits(time_limit, node_limit)
+        self.can_stop = False
+        self.tt.new_search()
+        for killers in self.killers:
+            killers[0] = killers[1] = NULL_MOVE
+        self.history = [value >> 1 for value in self.history]
+
+        result = SearchInfo(0, 0, 0, 0.0, [])
+        for depth in range(1, min(max_depth, MAX_PLY) + 1):
+            score = self.negamax(position, depth, -INFINITE, INFINITE, 0)
+            if self.stopped:
+                break
+            result = SearchInfo(
+                depth, score, self.nodes, time.perf_counter() - start, list(self.pv[0])
+            )
+            self.can_stop = True
+            if on_iteration is not None:
+                on_iteration(result)
+            if not result.pv or abs(score) >= MATE_BOUND:
+                break
+        return result._replace(nodes=self.nodes, time=time.perf_counter() - start)
+
+    def search_move(
+        self,
+        position: BitboardPosition,
+        move: int,
+        depth: int,
+        alpha: int,
+        beta: int,
+        deadline: Optional[float] = None,
+    ) -> Tuple[int, List[int]]:
+        """
+        Scores a single root move, used to split the root between processes (see parallel_search.py)
+        :param position: Root position, restored before returning
+        :param move: Legal root move to search
+        :param depth: Depth of the root iteration
+        :param alpha: Lower bound of the root window
+        :param beta: Upper bound of the root window
+        :param deadline: time.monotonic() value at which the search gives up;
+                         check `stopped` afterwards
+        :return: Score from the root's point of view and the principal variation starting
+                 with the move
+        """
+        self.start_limits(None, None)
+        self.deadline = deadline
+        self.can_stop = deadline is not None
+        undo = position.make_move(move)
+        score = -self.negamax(position, depth - 1, -beta, -alpha, 1)
+        position.unmake_move(undo)
+        return score, [move] + self.pv[1]
+
+    def start_limits(self, time_limit: Optional[float], node_limit: Optional[int]) -> float:
+        start = time.perf_counter()
+        # time.monotonic is shared by every process, so deadlines can be handed to pool workers
+        self.deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.stopped = False
+        return start
+
+    def out_of_time(self) -> bool:
+        if not self.can_stop:
+            return False
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            self.stopped = True
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.stopped = True
+        return self.stopped
+
+    def negamax(
+        self, position: BitboardPosition, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        """
+        Scores the position from the side to move's point of view within the (alpha, beta) window
+        """
+        self.pv[ply] = []
+        if ply and (position.halfmove_clock >= 100 or position.repetitions()):
+            return 0
+        in_check = position.in_check()
+        if in_check:
+            depth += 1
+        if depth <= 0:
+            return self.quiescence(position, alpha, beta, ply)
+        if ply >= MAX_PLY:
+            return evaluate(position)
+        self.nodes += 1
+        if not self.nodes & TIME_CHECK_MASK and self.out_of_time():
+            return 0
+
+        key = position.key
+        tt_move = NULL_MOVE
+        entry = self.tt.probe(key)
+        if entry:
+            tt_move = entry_move(entry)
+            if ply and entry_depth(entry) >= depth:
+                score = score_from_tt(entry_score(entry), ply)
+                bound = entry_bound(entry)
+                if (
+                    bound == EXACT
+                    or (bound == LOWER and score >= beta)
+                    or (bound == UPPER and score <= alpha)
+                ):
+                    return score
+
+        buffer = self.buffers[ply]
+        count = position.generate_moves(buffer)
+        if not count:
+            return -MATE + ply if in_check else 0
+
+        original_alpha = alpha
+        best_score = -INFINITE
+        best_move = NULL_MOVE
+        for index, move in enumerate(self.order_moves(position, buffer, count, tt_move, ply)):
+            undo = position.make_move(move)
+            if index == 0:
+                score = -self.negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                # Later moves only have to prove they are no better than the first one
+                score = -self.negamax(position, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta and not self.stopped:
+                    score = -self.negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.unmake_move(undo)
+            if self.stopped:
+                return 0
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv[ply] = [move] + self.pv[ply + 1]
+                    if alpha >= beta:
+                        if not move >> 12 & (CAPTURE | PROMOTION):
+                            self.remember_quiet(move, depth, ply)
+                        break
+
+        if best_score >= beta:
+            bound = LOWER
+        elif best_score > original_alpha:
+            bound = EXACT
+        else:
+            bound = UPPER
+        self.tt.store(key, depth, score_to_tt(best_score, ply), bound, best_move)
+        return best_score
+
+    def quiescence(self, position: BitboardPosition, alpha: int, beta: int, ply: int) -> int:
+        """
+        Resolves captures and promotions until the position is quiet enough to evaluate
+        """
+        self.pv[ply] = []
+        self.nodes += 1
+        if not self.nodes & TIME_CHECK_MASK and self.out_of_time():
+            return 0
+        stand_pat = evaluate(position)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        buffer = self.buffers[ply]
+        count = position.generate_moves(buffer)
+        mailbox = position.mailbox
+        scored = []
+        for move in buffer.moves[:count]:
+            if move >> 12 & (CAPTURE | PROMOTION):
+                scored.append((self.capture_score(mailbox, move), move))
+        scored.sort(reverse=True)
+
+        for _, move in scored:
+            undo = position.make_move(move)
+            score = -self.quiescence(position, -beta, -alpha, ply + 1)
+            position.unmake_move(undo)
+            if self.stopped:
+                return 0
+            if score > alpha:
+                if score >= beta:
+                    return score
+                alpha = score
+                self.pv[ply] = [move] + self.pv[ply + 1]
+        return alpha
+
+    @staticmethod
+    def capture_score(mailbox: List[int], move: int) -> int:
+        """
+        Most valuable victim first, then least valuable attacker (MVV-LVA);
+        promotions count the new piece
+        """
+        victim = mailbox[move >> 6 & 63]
+        flags = move >> 12
+        score = PIECE_VALUES[victim % 6 if victim >= 0 else PAWN] * 8 if flags & CAPTURE else 0
+        if flags & PROMOTION:
+            score += PIECE_VALUES[PROMOTION_PIECES[flags & 3]]
+        attacker = mailbox[move & 63] % 6
+        return score + KING - attacker
+
+    def order_moves(
+        self, position: BitboardPosition, buffer: MoveBuffer, count: int, tt_move: int, ply: int
+    ) -> List[int]:
+        mailbox = position.mailbox
+        killers = self.killers[ply]
+        history = self.history
+        capture_score = self.capture_score
+        scored = []
+        for move in buffer.moves[:count]:
+            if move == tt_move:
+                score = TT_MOVE_SCORE
+            elif move >> 12 & (CAPTURE | PROMOTION):
+                score = CAPTURE_SCORE + capture_score(mailbox, move)
+            elif move == killers[0]:
+                score = KILLER_SCORE + 1
+            elif move == killers[1]:
+                score = KILLER_SCORE
+            else:
+                score = history[move & 4095]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def remember_quiet(self, move: int, depth: int, ply: int) -> None:
+        """
+        Credits a quiet move that caused a beta cutoff (killer and history heuristics)
+        """
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        index = move & 4095
+        self.history[index] = min(self.history[index] + depth * depth, HISTORY_LIMIT)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Search a position and print each iteration.')
+    parser.add_argument('--fen', default=STARTING_FEN, help='position to search')
+    parser.add_argument('--time', type=float, default=5.0, help='seconds to search')
+    parser.add_argument('--depth', type=int, default=MAX_PLY, help='deepest iteration')
+    parser.add_argument('--hash', type=float, default=16, help='transposition table size in MB')
+    parser.add_argument(
+        '--workers', type=int, default=1, help='processes to split the root moves across'
+    )
+    args = parser.parse_args(argv)
+
+    position = BitboardPosition.from_fen(args.fen)
+    if args.workers > 1:
+        from parallel_search import ParallelSearcher
+
+        with ParallelSearcher(args.workers, args.hash) as parallel:
+            info = parallel.search(position, args.depth, args.time, on_iteration=print)
+            print(f'bestmove {move_to_uci(info.best_move) if info.pv else "(none)"}')
+            print(parallel.report)
+        return 0
+
+    searcher = Searcher(hash_mb=args.hash)
+    info = searcher.search(position, args.depth, args.time, on_iteration=print)
+    print(f'bestmove {move_to_uci(info.best_move) if info.pv else "(none)"}')
+    print(' '.join(f'{name} {value}' for name, value in searcher.tt.stats().items()))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
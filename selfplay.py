@@ -0,0 +1,196 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from bitboard import BitboardPosition
+from constants import COLOR_NAMES
+from game_state import GameState
+from search import Searcher
+
+# Where a self-play turn spends its time: listing the legal moves, picking one,
+# playing it on the board and GameState.end_turn deciding the status of the next player
+PHASES: Tuple[str, ...] = ('moves', 'choose', 'make', 'status')
+MOVE_LIMIT: str = 'Move limit'
+
+# Each worker process keeps one Searcher between games
+_searcher: Optional[Searcher] = None
+
+
+class GameRecord(NamedTuple):
+    seed: int
+    result: str  # GameState.result, or MOVE_LIMIT when the game was cut short
+    plies: int
+    phase_time: Tuple[float, ...]  # seconds, in PHASES order
+
+
+class SelfPlayReport(NamedTuple):
+    workers: int
+    games: int
+    plies: int
+    time: float
+    results: Dict[str, int]  # termination reason -> games
+    phase_time: Dict[str, float]  # seconds summed over every process
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.time if self.time else 0.0
+
+    @property
+    def plies_per_second(self) -> float:
+        return self.plies / self.time if self.time else 0.0
+
+    def __str__(self) -> str:
+        lines = [
+            f'workers {self.workers} games {self.games} plies {self.plies} time {self.time:.3f}s '
+            f'games/s {self.games_per_second:,.2f} plies/s {self.plies_per_second:,.0f}'
+        ]
+        for result, count in sorted(self.results.items(), key=lambda item: -item[1]):
+            lines.append(f'  {result:<30} {count:6} {count / self.games:6.1%}')
+        total = sum(self.phase_time.values())
+        for phase in PHASES:
+            seconds = self.phase_time[phase]
+            per_ply = seconds / self.plies * 1e6 if self.plies else 0.0
+            share = seconds / total if total else 0.0
+            lines.append(f'  {phase:<8} {seconds:8.3f}s {per_ply:8.1f} us/ply {share:6.1%}')
+        return '\n'.join(lines)
+
+
+def _boot(delay: float) -> int:
+    # Keeps each worker busy long enough for every other worker to take one too
+    time.sleep(delay)
+    return os.getpid()
+
+
+def play_game(task: Tuple[int, int, int, int]) -> GameRecord:
+    """
+    Plays one game against itself without a display
+    :param task: (seed, max_plies, engine_depth, random_plies); with engine_depth 0 every move
+                 is random, otherwise the first random_plies moves are random and the rest are
+                 chosen by a search to that depth
+    """
+    global _searcher
+    seed, max_plies, engine_depth, random_plies = task
+    rng = random.Random(seed)
+    game_state = GameState()
+    board = game_state.board
+    if engine_depth and _searcher is None:
+        _searcher = Searcher(hash_mb=4)
+    moves_time = choose_time = make_time = status_time = 0.0
+    plies = 0
+    clock = time.perf_counter
+    while game_state.result == 'Continue' and plies < max_plies:
+        start = clock()
+        moves = game_state.legal_moves()
+        listed = clock()
+        if engine_depth and plies >= random_plies:
+            position = BitboardPosition.from_board(board, COLOR_NAMES[game_state.current_turn])
+            move = _searcher.search(position, max_depth=engine_depth).best_move
+        else:
+            # Sorted so a seed plays the same game whatever order the moves are listed in
+            move = rng.choice(sorted(moves))
+        chosen = clock()
+        board.make_move(move)
+        made = clock()
+        game_state.end_turn()
+        ended = clock()
+        moves_time += listed - start
+        choose_time += chosen - listed
+        make_time += made - chosen
+        status_time += ended - made
+        plies += 1
+    result = game_state.result if game_state.result != 'Continue' else MOVE_LIMIT
+    return GameRecord(seed, result, plies, (moves_time, choose_time, make_time, status_time))
+
+
+def run_selfplay(
+    games: int,
+    workers: int = 1,
+    max_plies: int = 300,
+    engine_depth: int = 0,
+    random_plies: int = 8,
+    first_seed: int = 0,
+) -> SelfPlayReport:
+    """
+    Plays seeded games across a pool of worker processes and totals them
+    :param workers: Processes to play with; 1 plays in this process.
+                    The time reported starts once the processes are up
+    :param max_plies: Plies after which a game stops with MOVE_LIMIT
+    :param engine_depth: Search depth of engine moves, 0 to play random moves only
+    :param random_plies: Random opening plies of engine games, so seeds play different games
+    :param first_seed: Seed of the first game; game i uses first_seed + i
+    """
+    tasks = [
+        (seed, max_plies, engine_depth, random_plies)
+        for seed in range(first_seed, first_seed + games)
+    ]
+    if workers > 1:
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(workers) as pool:
+            # Timed from once every worker has started and imported the rules engine
+            pool.map(_boot, [0.05] * workers, 1)
+            start = time.perf_counter()
+            chunksize = max(1, games // (workers * 4))
+            records = list(pool.imap_unordered(play_game, tasks, chunksize))
+            elapsed = time.perf_counter() - start
+    else:
+        start = time.perf_counter()
+        records = [play_game(task) for task in tasks]
+        elapsed = time.perf_counter() - start
+    return summarise(records, workers, elapsed)
+
+
+def summarise(records: List[GameRecord], workers: int, elapsed: float) -> SelfPlayReport:
+    phase_time = [0.0] * len(PHASES)
+    for record in records:
+        for index, seconds in enumerate(record.phase_time):
+            phase_time[index] += seconds
+    return SelfPlayReport(
+        workers,
+        len(records),
+        sum(record.plies for record in records),
+        elapsed,
+        dict(Counter(record.result for record in records)),
+        dict(zip(PHASES, phase_time)),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Play games against itself and report the rate.')
+    parser.add_argument('games', type=int, nargs='?', default=100, help='games to play')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1, help='processes to play with'
+    )
+    parser.add_argument(
+        '--max-plies', type=int, default=300, help='stop a game after this many plies'
+    )
+    parser.add_argument(
+        '--engine-depth',
+        type=int,
+        default=0,
+        help='pick moves with a search to this depth instead of at random',
+    )
+    parser.add_argument(
+        '--random-plies', type=int, default=8, help='random opening plies of engine games'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    args = parser.parse_args(argv)
+
+    print(
+        run_selfplay(
+            args.games,
+            args.workers,
+            args.max_plies,
+            args.engine_depth,
+            args.random_plies,
+            args.seed,
+        )
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,42 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+from test_renderer import ROOT  # noqa: E402
+
+from assets import AssetManager  # noqa: E402
+from constants import IMAGE_PATHS, TILE_SIZE  # noqa: E402
+
+
+def make_manager(max_sizes: int = 2) -> AssetManager:
+    pygame.init()
+    pygame.display.set_mode((TILE_SIZE, TILE_SIZE))
+    paths = {piece: os.path.join(ROOT, path) for piece, path in IMAGE_PATHS.items()}
+    return AssetManager(paths, max_sizes)
+
+
+def test_pieces_are_converted_subsurfaces_of_one_atlas():
+    manager = make_manager()
+    queen = manager.get_image('Queen', 'Black')
+    assert queen.get_size() == (TILE_SIZE, TILE_SIZE)
+    assert queen.get_parent() is manager.get_image('Pawn', 'White').get_parent()
+    assert queen.get_parent() is manager.get_atlas(TILE_SIZE)
+    assert queen.get_bitsize() == pygame.display.get_surface().get_bitsize()
+
+    original = pygame.image.load(os.path.join(ROOT, 'chess_pieces/black_queen.png'))
+    for point in ((30, 30), (30, 10), (5, 5)):
+        assert queen.get_at(point) == original.get_at(point)
+
+
+def test_scaled_sizes_are_cached_and_least_recent_evicted():
+    manager = make_manager(max_sizes=2)
+    small = manager.get_image('King', 'White', 30)
+    assert small.get_size() == (30, 30)
+    assert manager.get_image('King', 'White', 30) is small
+    manager.get_image('King', 'White', TILE_SIZE)
+    manager.get_image('King', 'White', 30)
+    manager.get_image('King', 'White', 90)
+    assert list(manager.atlases) == [30, 90]
+    assert set(manager.tiles) == {30, 90}
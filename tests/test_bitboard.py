@@ -0,0 +1,138 @@
+import random
+
+from bitboard import BitboardMoveGenerator, BitboardPosition
+from game_state import GameState
+
+
+def click(game_state, square):
+    game_state.current_player().play(square)
+
+
+def move_names(legal_moves):
+    return {
+        (piece.square.get_name(), tuple(sorted(sq.get_name() for sq in moves)))
+        for piece, moves in legal_moves.items()
+        if moves
+    }
+
+
+def play_random_game(seed, plies, on_position):
+    game_state = GameState()
+    rng = random.Random(seed)
+    for _ in range(plies):
+        if game_state.result != 'Continue':
+            break
+        player = game_state.current_player()
+        on_position(game_state, player)
+        choices = [(piece, sq) for piece, moves in player.legal_moves.items() for sq in moves]
+        piece, target = rng.choice(choices)
+        click(game_state, piece.square)
+        click(game_state, target)
+        if game_state.board.promoting_pawn is not None:
+            click(game_state, game_state.board.promotion_square)
+        game_state.end_turn()
+
+
+def test_initial_position_has_twenty_moves():
+    game_state = GameState()
+    position = BitboardPosition.from_board(game_state.board, 'White')
+    assert len(position.legal_moves()) == 20
+    assert position.castling == 15
+    assert position.ep_square == -1
+
+
+def test_matches_object_model_legal_moves():
+    generator = BitboardMoveGenerator()
+
+    def compare(game_state, player):
+        packed = generator.legal_moves(game_state.board, player.color)
+        assert sorted(packed) == sorted(player.generate_moves())
+        assert len(packed) == len(set(packed))
+
+    for seed in range(4):
+        play_random_game(seed, 80, compare)
+
+
+def test_make_unmake_restores_position():
+    def round_trip(game_state, player):
+        position = BitboardPosition.from_board(game_state.board, player.color)
+        before = (
+            list(position.boards),
+            list(position.mailbox),
+            position.castling,
+            position.ep_square,
+        )
+        for move in position.legal_moves():
+            undo = position.make_move(move)
+            position.unmake_move(undo)
+            assert (
+                position.boards,
+                position.mailbox,
+                position.castling,
+                position.ep_square,
+            ) == before
+
+    play_random_game(7, 60, round_trip)
+
+
+def test_bitboard_backend_plays_through_game_state():
+    game_state = GameState(backend='bitboard')
+    player = game_state.current_player()
+    assert sum(len(moves) for moves in player.legal_moves.values()) == 20
+    assert len(player.legal_moves) == 16
+
+
+def test_bitboard_backend_matches_object_model_through_game_state():
+    objects = GameState()
+    bitboard = GameState(backend='bitboard')
+    # Black's moves are listed before White has moved, from the position the board keeps in step
+    assert move_names(bitboard.black_player.legal_moves) == move_names(
+        objects.black_player.legal_moves
+    )
+    rng = random.Random(11)
+    for _ in range(80):
+        if objects.result != 'Continue':
+            break
+        assert move_names(bitboard.current_player().legal_moves) == move_names(
+            objects.current_player().legal_moves
+        )
+        moves = objects.legal_moves()
+        assert sorted(bitboard.legal_moves()) == sorted(moves)
+        move = rng.choice(sorted(moves))
+        objects.push(move)
+        bitboard.push(move)
+        assert bitboard.result == objects.result
+
+
+def test_byte_snapshot_round_trip():
+    position = BitboardPosition.from_fen(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    for move in position.legal_moves()[:3]:
+        undo = position.make_move(move)
+        copy = BitboardPosition.from_bytes(position.to_bytes())
+        assert copy.fen() == position.fen()
+        assert copy.key == position.key and copy.repetitions() == position.repetitions()
+        position.unmake_move(undo)
+
+
+def test_bitboard_backend_keeps_position_in_step():
+    game_state = GameState(backend='bitboard')
+    board = game_state.board
+
+    def in_step():
+        rebuilt = BitboardPosition.from_board(board, 'White' if board.turn == 0 else 'Black')
+        return (
+            board.position.mailbox == rebuilt.mailbox
+            and board.position.key == rebuilt.key == board.key
+        )
+
+    rng = random.Random(5)
+    for _ in range(40):
+        if game_state.result != 'Continue':
+            break
+        game_state.push(rng.choice(game_state.legal_moves()))
+        assert in_step()
+    while game_state.move_stack:
+        game_state.pop()
+        assert in_step()
@@ -0,0 +1,121 @@
+import random
+
+from attack_tables import square_index
+from constants import QUEEN
+from game_state import GameState
+
+
+def index(name):
+    return square_index(int(name[1]), ord(name[0]) - ord('a') + 1)
+
+
+def move(board, uci, promotion=0):
+    return board.encode_move(index(uci[:2]), index(uci[2:4]), promotion)
+
+
+def snapshot(board):
+    return [square.piece for square in board.grid], board.castling, board.ep_square
+
+
+def play(board, moves):
+    records = []
+    for uci in moves:
+        records.append(board.make_move(move(board, uci)))
+    return records
+
+
+def unplay(board, records):
+    for record in reversed(records):
+        board.unmake_move(record)
+
+
+def test_en_passant_make_unmake():
+    board = GameState().board
+    before = snapshot(board)
+    records = play(board, ['e2e4', 'a7a6', 'e4e5', 'd7d5'])
+    assert board.ep_square is board.grid[index('d6')]
+    pawn = board.grid[index('d5')].piece
+
+    records.append(board.make_move(move(board, 'e5d6')))
+    assert board.grid[index('d5')].piece is None
+    assert pawn.square is None
+    assert records[-1].captured is pawn
+
+    unplay(board, records)
+    assert snapshot(board) == before
+    assert pawn.square is board.grid[index('d7')]
+
+
+def test_castling_make_unmake():
+    board = GameState().board
+    before = snapshot(board)
+    records = play(board, ['g1f3', 'g8f6', 'e2e3', 'e7e6', 'f1e2', 'f8e7', 'e1g1'])
+    assert board.grid[index('f1')].piece.kind == board.grid[index('h8')].piece.kind
+    assert board.grid[index('h1')].piece is None
+    assert records[-1].rook_hop == (index('h1'), index('f1'))
+    assert board.castling == 12
+
+    unplay(board, records)
+    assert snapshot(board) == before
+
+
+def test_promotion_make_unmake():
+    board = GameState().board
+    board.load_fen('rnbqkbnr/pppppppP/8/8/8/8/PPPPPPP1/RNBQKBNR w KQkq - 0 1')
+    pawn = board.grid[index('h7')].piece
+    knight = board.grid[index('g8')].piece
+    before = snapshot(board)
+
+    record = board.make_move(move(board, 'h7g8', QUEEN))
+    queen = board.grid[index('g8')].piece
+    assert queen.kind == QUEEN and queen.color == 'White'
+    assert record.captured is knight and record.pawn is pawn
+    assert board.castling == 15
+
+    board.unmake_move(record)
+    assert snapshot(board) == before
+    assert pawn.square is board.grid[index('h7')]
+    assert knight.square is board.grid[index('g8')]
+
+    # Playing the promotion again reuses the same queen
+    board.unmake_move(board.make_move(move(board, 'h7g8', QUEEN)))
+    board.make_move(move(board, 'h7g8', QUEEN))
+    assert board.grid[index('g8')].piece is queen
+    assert queen.square is board.grid[index('g8')]
+
+
+def test_material_counters_follow_captures_and_promotions():
+    rng = random.Random(9)
+    game_state = GameState()
+    board = game_state.board
+    for _ in range(300):
+        if game_state.result != 'Continue':
+            game_state.pop()
+        game_state.push(rng.choice(game_state.legal_moves()))
+        if rng.random() < 0.3:
+            game_state.pop()
+        counts, bishops = board.piece_counts, board.bishop_squares
+        board.count_material()
+        assert (counts, bishops) == (board.piece_counts, board.bishop_squares)
+
+    board.load_fen('4k3/P7/8/8/8/8/8/4K3 w - - 0 1')
+    assert board.material() == 100 and not board.insufficient_material()
+    record = board.make_move(move(board, 'a7a8', QUEEN))
+    assert board.material() == 900 and board.piece_counts[0][QUEEN] == 1
+    board.unmake_move(record)
+    assert board.material() == 100 and board.piece_counts[0][QUEEN] == 0
+
+
+def test_insufficient_material():
+    board = GameState().board
+    for fen, insufficient in (
+        ('4k3/8/8/8/8/8/8/4K3 w - - 0 1', True),
+        ('4k3/8/8/8/8/8/8/2B1K3 w - - 0 1', True),
+        ('4k3/8/8/4b3/8/8/8/2B1K3 w - - 0 1', True),
+        ('4k3/8/8/3b4/8/8/8/2B1K3 w - - 0 1', False),
+        ('4k3/8/8/3n4/8/8/8/2B1K3 w - - 0 1', False),
+        ('4k3/8/8/8/8/8/8/1NB1K3 w - - 0 1', False),
+        ('4k3/8/8/8/8/8/8/3RK3 w - - 0 1', False),
+    ):
+        board.load_fen(fen)
+        assert board.insufficient_material() == insufficient, fen
@@ -0,0 +1,42 @@
+import io
+
+import pytest
+
+from board import Board
+from epd import parse_operations, read_epd
+from perft import PERFT_SUITE
+
+SOURCE = '''# comment
+r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - bm Bb5; id "ruy; lopez";
+
+rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1
+8/8/8/8/8/8/8/8 w - - hmvc 7; fmvn 30;
+not a position
+'''
+
+
+def test_reads_epd_and_fen_lines():
+    records = list(read_epd(io.StringIO(SOURCE), skip_invalid=True))
+    assert [record.line for record in records] == [2, 4, 5]
+    assert records[0].operations == {'bm': 'Bb5', 'id': '"ruy; lopez"'}
+    assert records[0].position.fen().endswith(' w KQkq - 0 1')
+    assert records[1].operations == {} and records[1].position.fen().endswith(' b KQkq e3 0 1')
+    assert records[2].position.fen() == '8/8/8/8/8/8/8/8 w - - 7 30'
+
+
+def test_reports_the_invalid_line():
+    with pytest.raises(ValueError, match='line 6'):
+        list(read_epd(io.StringIO(SOURCE)))
+    with pytest.raises(ValueError):
+        parse_operations('bm e4; junk')
+
+
+def test_board_fen_round_trip():
+    for case in PERFT_SUITE:
+        board = Board.from_fen(case.fen)
+        assert board.to_fen() == case.fen
+    board = Board.from_fen(PERFT_SUITE[0].fen)
+    for record in read_epd(io.StringIO(SOURCE), skip_invalid=True):
+        if record.line < 5:
+            board.load_position(record.position)
+            assert board.to_fen() == record.position.fen()
@@ -0,0 +1,128 @@
+import io
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+
+from export import PALETTE, BoardImager, export_archive, lzw_encode  # noqa: E402
+from game_state import GameState  # noqa: E402
+from moves import move_to_uci  # noqa: E402
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+
+def lzw_decode(data: bytes, position: int) -> tuple:
+    """
+    Decodes GIF image data starting at its minimum code size byte
+    :return: The palette indices and the position after the data
+    """
+    min_size = data[position]
+    position += 1
+    packed = bytearray()
+    while data[position]:
+        packed += data[position + 1 : position + 1 + data[position]]
+        position += 1 + data[position]
+    clear, end = 1 << min_size, (1 << min_size) + 1
+    value = int.from_bytes(packed, 'little')
+    offset = 0
+    out = bytearray()
+    table = previous = size = code = None
+    while True:
+        if table is None or code == clear:
+            table = [bytes([i]) for i in range(clear)] + [b'', b'']
+            size, previous = min_size + 1, None
+        code = value >> offset & (1 << size) - 1
+        offset += size
+        if code == end:
+            return bytes(out), position + 1
+        if code == clear:
+            continue
+        if previous is None:
+            entry = table[code]
+        else:
+            entry = table[code] if code < len(table) else previous + previous[:1]
+            table.append(previous + entry[:1])
+        out += entry
+        previous = entry
+        if len(table) == 1 << size and size < 12:
+            size += 1
+
+
+def decode_gif(data: bytes) -> list:
+    """
+    :return: Every frame as a full image of palette indices
+    """
+    assert data[:6] == b'GIF89a'
+    width, height = int.from_bytes(data[6:8], 'little'), int.from_bytes(data[8:10], 'little')
+    canvas = bytearray(width * height)
+    frames = []
+    position = 13 + 3 * 256
+    while data[position] != ord(';'):
+        if data[position] == ord('!'):
+            position += 2
+            while data[position]:
+                position += 1 + data[position]
+            position += 1
+            continue
+        x, y, w, h = (
+            int.from_bytes(data[position + i : position + i + 2], 'little') for i in (1, 3, 5, 7)
+        )
+        indices, position = lzw_decode(data, position + 10)
+        for row in range(h):
+            start = (y + row) * width + x
+            canvas[start : start + w] = indices[row * w : (row + 1) * w]
+        frames.append(bytes(canvas))
+    return frames
+
+
+def test_lzw_round_trip_through_code_growth_and_resets():
+    data = bytes((i * 7 + i // 300) % 256 for i in range(20000)) + bytes(5000)
+    assert lzw_decode(lzw_encode(data), 0)[0] == data
+
+
+def test_png_shows_the_position():
+    imager = BoardImager(240)
+    image = pygame.image.load(io.BytesIO(imager.png(START)))
+    assert image.get_size() == (240, 240)
+    # h1 is light, g1 dark; the middle of the empty e4 square shows the board colour
+    assert image.get_at((15 * 8 + 2, 15 * 8 + 2))[:3] == imager.renderer.view.white
+
+
+def test_replay_frames_cover_only_changed_squares():
+    imager = BoardImager(240)
+    game_state = GameState()
+    moves = ['e2e4', 'e7e5', 'd1h5', 'b8c6', 'f1c4', 'g8f6', 'h5f7']
+
+    def play():
+        for uci in moves:
+            yield next(m for m in game_state.legal_moves() if move_to_uci(m) == uci)
+
+    frames = decode_gif(imager.replay(game_state, play(), 20))
+    assert len(frames) == len(moves) + 1 and game_state.result == 'Checkmate'
+    last = imager.indices((0, 0, 240, 240))
+    assert frames[-1] == last
+    # The corner of e8, beside the checkmated king
+    assert PALETTE[last[2 * 240 + 4 * 30 + 2]] == imager.renderer.view.check_highlight
+
+
+def test_archive_export_over_workers(tmp_path):
+    source = tmp_path / 'positions.fen'
+    source.write_text(f'{START}\nnot a position\n{START}\n')
+    results = list(export_archive(str(source), str(tmp_path / 'png'), 80, workers=2, chunksize=1))
+    assert [(number, error is None) for number, _, error in results] == [
+        (1, True),
+        (2, False),
+        (3, True),
+    ]
+    assert results[1][2] == 'Invalid EPD: not a position'
+    assert not os.path.exists(results[1][1])
+    assert all(os.path.getsize(path) > 0 for _, path, error in results if error is None)
+
+    games = tmp_path / 'games.pgn'
+    games.write_text('[Result "*"]\n\n1. e4 e5 2. Ke3 *\n')
+    [(number, path, error)] = export_archive(str(games), str(tmp_path / 'gif'), 80)
+    assert error == 'ply 3 (Ke3): Illegal move: Ke3'
+    with open(path, 'rb') as file:
+        assert len(decode_gif(file.read())) == 3
@@ -0,0 +1,35 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+from test_board import index  # noqa: E402
+from test_renderer import make_renderer  # noqa: E402
+
+from game import LoopStats, run  # noqa: E402
+from game_state import GameState  # noqa: E402
+from input_handler import InputHandler  # noqa: E402
+
+
+def click(renderer, name: str) -> None:
+    x, y, length, _ = renderer.view.square_rect(GameState().board.grid[index(name)])
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x + 1, y + 1), button=1))
+
+
+def test_loop_draws_only_after_input_and_sleeps_while_idle():
+    game_state = GameState()
+    renderer = make_renderer()
+    pygame.event.clear()
+    click(renderer, 'e2')
+    # Nothing arrives for a while, then the window is closed
+    pygame.time.set_timer(pygame.QUIT, 200, 1)
+    stats = LoopStats()
+    run(game_state, renderer, InputHandler(), stats=stats)
+
+    assert game_state.current_player().selected is not None
+    # The opening frame and one answering the click
+    assert stats.frames == 2 and len(stats.latencies) == 1
+    assert stats.wait_time >= 0.15
+    assert stats.idle_cpu < 0.5
+    assert 'idle CPU' in str(stats)
@@ -0,0 +1,104 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+from test_golden_master import get_board_ascii
+
+from game_state import GameState
+from moves import move_to_uci
+
+
+def test_push_uci_plays_scholars_mate():
+    game_state = GameState()
+    results = [
+        game_state.push_uci(uci) for uci in ('e2e4', 'e7e5', 'f1c4', 'b8c6', 'd1h5', 'g8f6', 'h5f7')
+    ]
+    assert results == ['Continue'] * 6 + ['Checkmate']
+    assert game_state.current_turn == 1
+    with pytest.raises(ValueError, match='Game is over'):
+        game_state.push_uci('e8f7')
+
+
+def test_pop_restores_position():
+    game_state = GameState()
+    start = get_board_ascii(game_state.board), game_state.board.key
+    for uci in ('e2e4', 'd7d5', 'e4d5', 'g8f6'):
+        game_state.push_uci(uci)
+    assert [move_to_uci(game_state.pop()) for _ in range(4)] == ['g8f6', 'e4d5', 'd7d5', 'e2e4']
+    assert (get_board_ascii(game_state.board), game_state.board.key) == start
+    assert game_state.current_turn == 0 and len(game_state.legal_moves()) == 20
+
+
+def test_rejects_illegal_and_malformed_moves():
+    game_state = GameState()
+    for uci in ('e2e5', 'e7e5', 'e2e4k', 'e2', 'e2e4qq'):
+        with pytest.raises(ValueError):
+            game_state.push_uci(uci)
+    with pytest.raises(ValueError, match='Illegal move'):
+        game_state.push(game_state.legal_moves()[0] ^ 0x7)
+    assert game_state.move_stack == []
+
+
+def test_random_games_without_display():
+    rng = random.Random(11)
+    for _ in range(3):
+        game_state = GameState()
+        while game_state.result == 'Continue' and len(game_state.move_stack) < 120:
+            game_state.push(rng.choice(game_state.legal_moves()))
+        assert game_state.current_turn == len(game_state.move_stack) % 2
+
+
+def test_starts_from_fen():
+    game_state = GameState(fen='r5k1/5ppp/8/8/8/8/5PPP/3R2K1 b - - 0 1')
+    assert game_state.current_turn == 1 and game_state.result == 'Continue'
+    game_state.push_uci('a8a1')
+    assert game_state.result == 'Continue'
+    game_state.push_uci('d1a1')
+    assert len(game_state.legal_moves()) == 8
+    assert GameState(fen='3R2k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1').result == 'Checkmate'
+
+
+def test_model_does_not_import_pygame():
+    code = (
+        'import sys, game_state; game_state.GameState().push_uci("e2e4"); '
+        "assert 'pygame' not in sys.modules"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', code], cwd=root, check=True)
+
+
+def test_bishops_of_one_colour_are_insufficient_material():
+    assert GameState(fen='4k3/8/8/4b3/8/8/8/2B1K3 w - - 0 1').result == (
+        'Draw by insufficient material'
+    )
+    assert GameState(fen='4k3/8/8/3b4/8/8/8/2B1K3 w - - 0 1').result == 'Continue'
+
+
+def test_move_cache_matches_full_recomputation():
+    rng = random.Random(17)
+    for _ in range(3):
+        game_state = GameState()
+        while game_state.result == 'Continue' and len(game_state.move_stack) < 150:
+            player = game_state.current_player()
+            player.get_legal_moves()
+            cached = {piece: list(moves) for piece, moves in player.legal_moves.items()}
+            player.clear_move_cache()
+            player.get_legal_moves()
+            assert cached == player.legal_moves
+            game_state.push(rng.choice(game_state.legal_moves()))
+            if game_state.move_stack and rng.random() < 0.2:
+                game_state.pop()
+
+
+def test_status_stops_at_first_legal_move():
+    game_state = GameState()
+    game_state.push_uci('e2e4')
+    player = game_state.current_player()
+    pending = [moves for moves in player.legal_moves.moves.values() if moves is None]
+    assert player.has_legal_move() and pending
+    assert len(player.legal_moves) == 16
+    assert player.legal_moves[game_state.board.grid[57].piece]  # b8 knight, computed on demand
+    assert sum(len(moves) for moves in player.legal_moves.values()) == 20
+    assert not GameState(fen='7k/5Q2/6K1/8/8/8/8/8 b - - 0 1').current_player().has_legal_move()
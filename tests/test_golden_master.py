@@ -1,9 +1,16 @@
 import pytest
 from game_state import GameState
+from view import BoardView
+
+view = BoardView()
 
 def get_click_coords(square):
     # Return the center coordinates of the square for clicking
-    return square.x + 30, square.y + 30
+    x, y, length, _ = view.square_rect(square)
+    return x + length // 2, y + length // 2
+
+def click(game_state, x, y):
+    return game_state.current_player().play(view.square_at(game_state.board, x, y))
 
 def get_piece_symbol(piece):
     if piece is None:
@@ -59,23 +66,16 @@ def simulate_scholars_mate():
 
         # First click: select piece
         x, y = get_click_coords(select_sq)
-        result = game_state.current_player().play(x, y)
+        result = click(game_state, x, y)
         assert result == 'Continue'
 
         # Second click: move to target
-        result = game_state.current_player().play(x, y)
+        result = click(game_state, x, y)
 
         # Simulate end turn
         player = game_state.current_player()
         if player.selected is None and game_state.board.promoting_pawn is None:
-            game_state.current_turn ^= 1
-            opponent = game_state.current_player()
-            check = opponent.king.in_check()
-            if check is not None:
-                opponent.king.square.check_highlighted = True
-            game_state.result = opponent.get_status(check, game_state.current_turn)
-            # Update legal moves for the new current player
-            game_state.current_player().get_legal_moves(None)
+            game_state.end_turn()
         else:
             game_state.result = 'Continue'
 
@@ -0,0 +1,45 @@
+import random
+
+from test_board import index
+
+from attack_tables import FULL
+from constants import BISHOP, QUEEN, ROOK
+from game_state import GameState
+from movement import MOVEMENTS
+from pieces import Piece
+
+
+def names(squares):
+    return sorted(square.get_name() for square in squares)
+
+
+def test_pieces_share_one_movement_per_type():
+    board = GameState().board
+    pieces = [square.piece for square in board.grid if square.piece is not None]
+    for piece in pieces:
+        assert piece.movement is MOVEMENTS[piece.kind]
+
+
+def test_queen_moves_like_bishop_and_rook():
+    game_state = GameState(fen='4k3/8/8/2p5/3Q4/8/5P2/4K3 w - - 0 1')
+    queen = game_state.board.grid[index('d4')].piece
+    diagonal = MOVEMENTS[BISHOP].destinations(queen, FULL)
+    straight = MOVEMENTS[ROOK].destinations(queen, FULL)
+    assert queen.kind == QUEEN
+    assert names(queen.possible_moves(FULL)) == names(diagonal + straight)
+    assert 'c5' in names(diagonal) and 'f2' not in names(diagonal)
+
+
+def test_move_generation_constructs_no_pieces():
+    rng = random.Random(5)
+    game_state = GameState()
+    for _ in range(80):
+        if game_state.result != 'Continue':
+            break
+        created = Piece.created
+        player = game_state.current_player()
+        player.get_legal_moves()
+        player.king.in_check()
+        moves = game_state.legal_moves()
+        assert Piece.created == created
+        game_state.push(rng.choice(moves))
@@ -0,0 +1,50 @@
+from bitboard import BitboardPosition
+from constants import KNIGHT, QUEEN
+from moves import (
+    CAPTURE,
+    EN_PASSANT,
+    PROMOTION_FLAGS,
+    MoveBuffer,
+    encode_move,
+    is_capture,
+    move_flags,
+    move_from,
+    move_to,
+    move_to_uci,
+    parse_square,
+    promotion_piece,
+)
+
+
+def test_encode_round_trip():
+    move = encode_move(parse_square('e5'), parse_square('d6'), EN_PASSANT)
+    assert move < 1 << 16
+    assert move_from(move) == parse_square('e5')
+    assert move_to(move) == parse_square('d6')
+    assert move_flags(move) == EN_PASSANT
+    assert is_capture(move) and not promotion_piece(move)
+    assert move_to_uci(move) == 'e5d6'
+
+
+def test_promotion_flags():
+    push = encode_move(parse_square('a7'), parse_square('a8'), PROMOTION_FLAGS[KNIGHT])
+    capture = encode_move(parse_square('a7'), parse_square('b8'), PROMOTION_FLAGS[QUEEN] | CAPTURE)
+    assert promotion_piece(push) == KNIGHT and not is_capture(push)
+    assert promotion_piece(capture) == QUEEN and is_capture(capture)
+    assert move_to_uci(capture) == 'a7b8q'
+
+
+def test_buffer_reuse_and_bytes():
+    position = BitboardPosition.from_fen(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    buffer = MoveBuffer()
+    assert position.generate_moves(buffer) == 48
+    assert sorted(buffer) == sorted(position.legal_moves())
+
+    copy = MoveBuffer.frombytes(buffer.tobytes())
+    assert len(buffer.tobytes()) == 96
+    assert copy.tolist() == buffer.tolist()
+
+    position.make_move(buffer[0])
+    assert position.generate_moves(buffer) == len(position.legal_moves())
@@ -0,0 +1,41 @@
+import time
+
+from bitboard import BitboardPosition
+from moves import move_to_uci
+from parallel_search import ParallelSearcher
+from search import MATE, Searcher
+
+
+def test_matches_serial_search():
+    with ParallelSearcher(2, hash_mb=1) as parallel:
+        position = BitboardPosition.from_fen('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1')
+        fen = position.fen()
+        info = parallel.search(position, max_depth=3)
+        serial = Searcher(hash_mb=1).search(position, max_depth=3)
+        assert info.best_move == serial.best_move and info.score == serial.score
+        assert position.fen() == fen
+
+        report = parallel.report
+        assert report.workers == 2 and report.nodes == info.nodes
+        assert sum(report.worker_nodes.values()) == report.nodes
+        assert 0 < report.utilisation <= 1
+
+        mate = parallel.search(
+            BitboardPosition.from_fen('r5k1/5ppp/8/8/8/3R4/5PPP/3R2K1 w - - 0 1'), max_depth=5
+        )
+        assert mate.score == MATE - 3 and move_to_uci(mate.best_move) == 'd3d8'
+
+
+def test_stops_at_time_limit():
+    position = BitboardPosition.from_fen(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    with ParallelSearcher(2, hash_mb=1) as parallel:
+        parallel.start()
+        start = time.perf_counter()
+        info = parallel.search(position, time_limit=0.5)
+        assert time.perf_counter() - start < 0.8
+        assert info.depth >= 1 and info.pv
+
+        # Nothing from the stopped iteration is left queued ahead of the next search
+        assert parallel.search(position, max_depth=2).depth == 2
@@ -0,0 +1,54 @@
+import pytest
+
+from bitboard import STARTING_FEN, BitboardPosition
+from game_state import GameState
+from perft import PERFT_SUITE, divide, main, perft, perft_board
+
+# Keep the regular test run fast; `python perft.py --suite 6` covers the deep counts
+SHALLOW_CASES = [
+    (case.name, case.fen, depth, nodes)
+    for case in PERFT_SUITE
+    for depth, nodes in case.nodes.items()
+    if nodes <= 100000
+]
+
+
+@pytest.mark.parametrize('name,fen,depth,nodes', SHALLOW_CASES)
+def test_perft_suite(name, fen, depth, nodes):
+    assert perft(BitboardPosition.from_fen(fen), depth) == nodes
+
+
+@pytest.mark.parametrize('name,fen,depth,nodes', SHALLOW_CASES)
+def test_object_model_perft_suite(name, fen, depth, nodes):
+    assert perft_board(GameState(fen=fen), depth) == nodes
+
+
+def test_perft_restores_position():
+    position = BitboardPosition.from_fen(PERFT_SUITE[1].fen)
+    perft(position, 3)
+    assert position.fen() == PERFT_SUITE[1].fen
+
+
+def test_divide_sums_to_perft():
+    counts = divide(BitboardPosition.from_fen(STARTING_FEN), 3)
+    assert len(counts) == 20
+    assert counts['e2e4'] == 600
+    assert sum(counts.values()) == 8902
+
+
+def test_cli_divide(capsys):
+    assert main(['2']) == 0
+    output = capsys.readouterr().out
+    assert 'g1f3: 20' in output
+    assert 'Nodes: 400' in output
+
+
+def test_object_model_perft_restores_board():
+    game_state = GameState()
+    assert perft_board(game_state, 3) == 8902
+    assert game_state.board.get_square(1, 5).piece is game_state.board.kings['White']
+
+
+def test_cli_objects_from_fen(capsys):
+    assert main(['1', '--objects', '--fen', '8/8/8/KPp4r/8/8/8/7k w - c6']) == 0
+    assert 'Nodes: 4' in capsys.readouterr().out
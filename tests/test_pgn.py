@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from game_state import GameState
+from moves import move_to_uci
+from pgn import read_games, replay_archive, replay_game, resolve_san
+
+ARCHIVE = '''[Event "Scholar's mate"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 {a comment
+[spanning lines]} Nc6 (2... Nf6 3. d3 (3. Nc3)) 3. Qh5 $1 Nf6?? 4. Qxf7# 1-0
+
+[Event "Illegal"]
+[Result "*"]
+
+1.e4 e5 2.Ke3 *
+
+[FEN "4k3/1P6/8/8/8/8/8/4K2R w K - 0 1"]
+[SetUp "1"]
+[Result "1/2-1/2"]
+
+1. b8=Q+ Kd7 2. O-O 1/2-1/2
+'''
+
+
+def test_reads_main_line_without_comments_or_variations():
+    games = list(read_games(io.StringIO(ARCHIVE)))
+    assert [game.number for game in games] == [1, 2, 3]
+    assert games[0].tags['Event'] == "Scholar's mate"
+    assert games[0].moves == ['e4', 'e5', 'Bc4', 'Nc6', 'Qh5', 'Nf6??', 'Qxf7#']
+    assert games[0].result == '1-0'
+    assert games[1].moves == ['e4', 'e5', 'Ke3']
+
+
+def test_resolves_disambiguation_en_passant_and_promotion():
+    game_state = GameState(fen='4k3/1P6/8/3pP3/8/8/8/R3K2R w KQ d6 0 1')
+    assert move_to_uci(resolve_san(game_state, 'exd6')) == 'e5d6'
+    assert move_to_uci(resolve_san(game_state, 'b8=N')) == 'b7b8n'
+    assert move_to_uci(resolve_san(game_state, 'O-O-O')) == 'e1c1'
+    with pytest.raises(ValueError, match='Illegal'):
+        resolve_san(game_state, 'b8')
+    with pytest.raises(ValueError, match='Invalid SAN'):
+        resolve_san(game_state, 'Zz9')
+
+    game_state = GameState(fen='k7/8/8/8/8/8/K7/R6R w - - 0 1')
+    assert move_to_uci(resolve_san(game_state, 'Rad1')) == 'a1d1'
+    with pytest.raises(ValueError, match='Ambiguous'):
+        resolve_san(game_state, 'Rd1')
+
+
+def test_replay_reports_result_fen_and_first_illegal_move():
+    mate, illegal, promotion = (replay_game(game) for game in read_games(io.StringIO(ARCHIVE)))
+    assert mate['plies'] == 7 and mate['status'] == 'Checkmate' and mate['error'] is None
+    assert mate['fen'] == 'r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4'
+    assert illegal['plies'] == 2 and illegal['error'] == 'ply 3 (Ke3): Illegal move: Ke3'
+    assert promotion['fen'] == '1Q6/3k4/8/8/8/8/8/5RK1 b - - 2 2'
+
+
+def test_worker_pool_keeps_archive_order():
+    games = list(read_games(io.StringIO(ARCHIVE * 3)))
+    expected = [replay_game(game) for game in games]
+    assert list(replay_archive(iter(games), workers=2, chunksize=2)) == expected
@@ -0,0 +1,98 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+from test_board import index  # noqa: E402
+
+from assets import AssetManager  # noqa: E402
+from constants import END_SCREEN_COLOR, IMAGE_PATHS, SCREEN_HEIGHT, SCREEN_WIDTH  # noqa: E402
+from game_state import GameState  # noqa: E402
+from renderer import ChessRenderer  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_renderer() -> ChessRenderer:
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    paths = {piece: os.path.join(ROOT, path) for piece, path in IMAGE_PATHS.items()}
+    return ChessRenderer(screen, AssetManager(paths))
+
+
+def test_redraws_only_changed_squares():
+    game_state = GameState()
+    renderer = make_renderer()
+    assert renderer.draw_board(game_state) == 64
+    renderer.update()
+    assert renderer.draw_board(game_state) == 0 and renderer.dirty == []
+
+    player = game_state.current_player()
+    player.play(game_state.board.grid[index('g1')])
+    # The knight's square and its two destinations
+    assert renderer.draw_board(game_state) == 3
+    renderer.update()
+    player.play(game_state.board.grid[index('f3')])
+    game_state.end_turn()
+    assert renderer.draw_board(game_state) == 3
+    renderer.update()
+
+    renderer.invalidate()
+    assert renderer.draw_board(game_state) == 64
+
+
+def test_promotion_dialogue_and_end_screen_are_drawn_once():
+    game_state = GameState(fen='7k/P7/8/8/8/8/8/K7 w - - 0 1')
+    renderer = make_renderer()
+    renderer.draw_board(game_state)
+    renderer.update()
+    player = game_state.current_player()
+    player.play(game_state.board.grid[index('a7')])
+    player.play(game_state.board.grid[index('a8')])
+    # The dialogue covers a8 down to a5
+    assert renderer.draw_board(game_state) == 4
+    assert renderer.draw_board(game_state) == 0
+
+    renderer.draw_game_end('Stalemate', 0)
+    assert len(renderer.dirty) == 5
+    renderer.update()
+    renderer.draw_game_end('Stalemate', 0)
+    assert renderer.dirty == []
+
+
+def test_background_and_overlays_are_built_once():
+    game_state = GameState(fen='7k/8/8/8/8/8/8/K7 w - - 0 1')
+    renderer = make_renderer()
+    player = game_state.current_player()
+    player.play(game_state.board.grid[index('a1')])
+    renderer.draw_board(game_state)
+    renderer.draw_game_end('Checkmate', 1)
+    layers = dict(renderer.layers)
+    assert sorted(key[0] for key in layers) == ['board', 'end']
+
+    renderer.invalidate()
+    renderer.draw_board(game_state)
+    renderer.draw_game_end('Checkmate', 1)
+    assert all(renderer.layers[key] is layer for key, layer in layers.items())
+    # A legal destination without a piece shows its square colour around the dot
+    x, y, _, _ = renderer.view.square_rect(game_state.board.grid[index('a2')])
+    assert renderer.screen.get_at((x + 1, y + 1))[:3] == renderer.view.white
+
+
+def test_end_screen_is_drawn_again_after_a_restart():
+    game_state = GameState()
+    renderer = make_renderer()
+    center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    for _ in range(2):
+        renderer.draw_board(game_state)
+        renderer.update()
+        for uci in ('e2e4', 'e7e5', 'f1c4', 'b8c6', 'd1h5', 'g8f6', 'h5f7'):
+            game_state.push_uci(uci)
+            renderer.draw_board(game_state)
+            renderer.update()
+        assert game_state.result == 'Checkmate'
+        renderer.draw_game_end(game_state.result, game_state.current_turn)
+        renderer.update()
+        assert renderer.screen.get_at(center)[:3] == END_SCREEN_COLOR
+        game_state.reset()
@@ -0,0 +1,70 @@
+from attack_tables import square_index
+from game_state import GameState
+
+
+def square(board, name):
+    return board.get_square(int(name[1]), ord(name[0]) - ord('a') + 1)
+
+
+def mask(*names):
+    return sum(1 << square_index(int(name[1]), ord(name[0]) - ord('a') + 1) for name in names)
+
+
+def test_attackers_to_initial_position():
+    board = GameState().board
+    validator = board.move_validator
+    assert validator.attackers_to(board, square(board, 'f3'), 'White') == mask('e2', 'g2', 'g1')
+    assert validator.attackers_to(board, square(board, 'd7'), 'Black') == mask(
+        'b8', 'c8', 'd8', 'e8'
+    )
+    assert validator.attackers_to(board, square(board, 'e4'), 'White') == 0
+    assert validator.is_in_check(board, 'White') is None
+
+
+def test_check_along_opened_diagonal():
+    board = GameState().board
+    validator = board.move_validator
+    board.load_fen('rnb1kbnr/pppppppp/8/8/7q/5P2/PPPPP1PP/RNBQKBNR w KQkq - 0 1')
+    check = validator.is_in_check(board, 'White')
+    assert check is not None
+    assert check.pieces == [square(board, 'h4').piece]
+    assert validator.is_attacked(board, square(board, 'g3'), 'Black')
+
+
+def test_king_does_not_shield_its_own_escape_square():
+    board = GameState().board
+    validator = board.move_validator
+    board.load_fen('1nbqkbnr/pppppppp/4r3/8/4P3/8/PPPPKPPP/RNBQ1BNR w k - 0 1')
+    assert not validator.is_attacked(board, square(board, 'e1'), 'Black')
+    board.load_fen('1nbqkbnr/pppppppp/4r3/3P4/8/8/PPPPKPPP/RNBQ1BNR w k - 0 1')
+    king = board.kings['White']
+    assert validator.is_attacked(board, square(board, 'e1'), 'Black', king)
+    assert not validator.is_attacked(board, square(board, 'e1'), 'Black')
+
+
+def test_restrictions_find_pins_and_evasions():
+    board = GameState().board
+    validator = board.move_validator
+    board.load_fen('rnb1kbnr/pppppppp/8/8/1q6/4P3/PPPP1PPP/RNBQKBNR w KQkq - 0 1')
+    pinned = square(board, 'd2').piece
+    restrictions = validator.restrictions(board, 'White')
+    assert restrictions.checkers == 0
+    assert restrictions.pins == {pinned: mask('d2', 'c3', 'b4')}
+    assert pinned.possible_moves(restrictions.allowed(pinned)) == []
+
+    board.load_fen('rnb1kb1r/pppppppp/8/8/1q6/4Pn2/PPPP1PPP/RNBQKBNR w KQkq - 0 1')
+    restrictions = validator.restrictions(board, 'White')
+    assert restrictions.checkers == mask('f3')
+    assert restrictions.evasions == mask('f3')
+    assert not restrictions.double_check()
+    capturer = square(board, 'g2').piece
+    assert capturer.possible_moves(restrictions.allowed(capturer)) == [square(board, 'f3')]
+
+
+def test_en_passant_cannot_expose_king_along_rank():
+    game_state = GameState()
+    for uci in 'e2e4 a7a5 e4e5 a8a6 e1e2 a6h6 e2d3 h6h5 d3c4 g8f6 c4b5 d7d5'.split():
+        game_state.push_uci(uci)
+    pawn = square(game_state.board, 'e5').piece
+    game_state.current_player().get_legal_moves()
+    assert square(game_state.board, 'd6') not in game_state.current_player().legal_moves[pawn]
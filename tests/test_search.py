@@ -0,0 +1,64 @@
+from test_board import index, move
+
+from bitboard import BitboardPosition
+from game_state import GameState
+from moves import move_to_uci
+from search import MATE, Searcher
+
+
+def test_finds_mate_in_one():
+    position = BitboardPosition.from_fen('6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1')
+    info = Searcher(hash_mb=1).search(position, max_depth=3)
+    assert move_to_uci(info.best_move) == 'd1d8'
+    assert info.score == MATE - 1
+    assert str(info).startswith('depth 1 score mate 1 ')
+
+
+def test_finds_mate_in_two():
+    position = BitboardPosition.from_fen('r5k1/5ppp/8/8/8/3R4/5PPP/3R2K1 w - - 0 1')
+    info = Searcher(hash_mb=1).search(position, max_depth=5)
+    assert info.score == MATE - 3
+    assert [move_to_uci(m) for m in info.pv] == ['d3d8', 'a8d8', 'd1d8']
+
+
+def test_wins_hanging_queen_and_restores_position():
+    position = BitboardPosition.from_fen('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1')
+    fen, key = position.fen(), position.key
+    reported = []
+    info = Searcher(hash_mb=1).search(position, max_depth=4, on_iteration=reported.append)
+    assert move_to_uci(info.best_move) == 'd2d5'
+    assert info.score > 400
+    assert [r.depth for r in reported] == [1, 2, 3, 4]
+    assert position.fen() == fen and position.key == key
+
+
+def test_node_limit_stops_search():
+    position = BitboardPosition.from_fen(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    info = Searcher(hash_mb=1).search(position, node_limit=5000)
+    assert info.depth >= 1 and info.pv
+    assert info.nodes < 5000 + 1024
+
+
+def test_engine_player_replies():
+    game_state = GameState(engine='Black', think_time=0.05)
+    board = game_state.board
+    board.make_move(move(board, 'e2e4'))
+    game_state.end_turn()
+
+    engine = game_state.current_player()
+    assert engine.is_engine
+    assert engine.make_engine_move()
+    game_state.end_turn()
+    assert game_state.result == 'Continue'
+    assert game_state.current_player() is game_state.white_player
+    assert board.turn == 0 and len(board.history) == 2
+    assert board.grid[index('e4')].piece is not None
+
+
+def test_engine_player_without_moves_does_not_move():
+    game_state = GameState(engine='Black', think_time=0.05, fen='7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')
+    assert game_state.result == 'Stalemate'
+    assert not game_state.current_player().make_engine_move()
+    assert len(game_state.board.history) == 0
@@ -0,0 +1,23 @@
+from selfplay import MOVE_LIMIT, PHASES, play_game, run_selfplay
+
+
+def test_seeded_games_repeat():
+    first = play_game((3, 400, 0, 0))
+    again = play_game((3, 400, 0, 0))
+    assert (first.result, first.plies) == (again.result, again.plies)
+    assert first.result != 'Continue' and len(first.phase_time) == len(PHASES)
+
+
+def test_report_totals_games_and_termination_reasons():
+    report = run_selfplay(6, max_plies=40)
+    assert report.games == 6 and sum(report.results.values()) == 6
+    assert report.results == {MOVE_LIMIT: 6} and report.plies == 240
+    assert set(report.phase_time) == set(PHASES)
+    assert report.games_per_second > 0 and 'plies/s' in str(report)
+
+
+def test_engine_games_and_workers_agree():
+    single = run_selfplay(2, max_plies=12, engine_depth=1, random_plies=4)
+    pooled = run_selfplay(2, workers=2, max_plies=12, engine_depth=1, random_plies=4)
+    assert pooled.workers == 2
+    assert (pooled.results, pooled.plies) == (single.results, single.plies)
@@ -0,0 +1,64 @@
+from moves import encode_move
+from transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    TranspositionTable,
+    entry_bound,
+    entry_depth,
+    entry_move,
+    entry_score,
+)
+
+KEY = 0xDEADBEEF12345678
+# Same bucket as KEY in any table smaller than 2**32 buckets, different check bits
+OTHER = KEY ^ 0xFFFF << 48
+
+
+def test_size_is_bounded():
+    table = TranspositionTable(1)
+    assert table.size_bytes == 1 << 20
+    assert len(TranspositionTable(1.5)) == len(table)
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    move = encode_move(12, 28)
+    assert table.probe(KEY) == 0
+    table.store(KEY, 5, -1234, LOWER, move)
+    entry = table.probe(KEY)
+    assert (entry_move(entry), entry_score(entry), entry_depth(entry), entry_bound(entry)) == (
+        move,
+        -1234,
+        5,
+        LOWER,
+    )
+    assert table.probe(OTHER) == 0
+    assert (table.hits, table.misses, table.collisions) == (1, 2, 1)
+
+
+def test_depth_preferred_replacement():
+    table = TranspositionTable(1)
+    table.store(KEY, 8, 10, EXACT, encode_move(1, 2))
+    table.store(OTHER, 3, 20, UPPER, encode_move(3, 4))
+    assert entry_depth(table.probe(KEY)) == 8
+    assert entry_depth(table.probe(OTHER)) == 3
+
+    # A deeper result takes the preferred slot and pushes the old entry into the always-replace slot
+    table.store(OTHER, 9, 30, EXACT, encode_move(3, 4))
+    assert entry_score(table.probe(OTHER)) == 30
+    assert entry_depth(table.probe(KEY)) == 8
+
+    # Entries from an earlier search can be replaced whatever their depth
+    table.new_search()
+    table.store(KEY, 1, 40, EXACT)
+    entry = table.probe(KEY)
+    assert entry_depth(entry) == 1 and entry_move(entry) == encode_move(1, 2)
+
+
+def test_clear():
+    table = TranspositionTable(1)
+    table.store(KEY, 4, 0, EXACT)
+    table.clear()
+    assert table.probe(KEY) == 0
+    assert table.stats()['stores'] == 0
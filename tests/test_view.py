@@ -0,0 +1,43 @@
+from test_board import index
+
+from game_state import GameState
+from view import BoardView
+
+
+def test_square_at_and_square_rect_agree():
+    game_state = GameState()
+    view = BoardView(x=10, y=20, square_length=50)
+    e2 = game_state.board.grid[index('e2')]
+    assert view.square_rect(e2) == (10 + 4 * 50, 20 + 6 * 50, 50, 50)
+    assert view.square_at(game_state.board, 10 + 4 * 50 + 25, 20 + 6 * 50 + 49) is e2
+    assert view.square_at(game_state.board, 10, 20) is game_state.board.grid[index('a8')]
+    assert view.square_at(game_state.board, 9, 20) is None
+    assert view.square_at(game_state.board, 10 + 400, 20) is None
+
+
+def test_square_colors():
+    board = GameState().board
+    view = BoardView()
+    assert view.square_color(board.grid[index('a1')]) == view.black
+    assert view.square_color(board.grid[index('h1')]) == view.white
+    assert view.square_color(board.grid[index('a8')]) == view.white
+
+
+def test_update_reads_selection_and_check():
+    game_state = GameState()
+    view = BoardView()
+    player = game_state.current_player()
+    player.play(game_state.board.grid[index('g1')])
+    view.update(game_state)
+    assert view.selected == index('g1')
+    assert view.highlighted == {index('f3'), index('h3')}
+    assert view.check is None
+
+    player.play(game_state.board.grid[index('g1')])
+    view.update(game_state)
+    assert view.selected is None and view.highlighted == set()
+
+    for uci in ('e2e4', 'f7f6', 'd1h5'):
+        game_state.push_uci(uci)
+    view.update(game_state)
+    assert view.check == index('e8')
@@ -0,0 +1,86 @@
+from test_bitboard import play_random_game
+from test_board import index, move
+
+from bitboard import STARTING_FEN, BitboardPosition
+from game_state import GameState
+from moves import MoveBuffer, move_to_uci
+
+
+def walk(position, depth, buffers):
+    assert position.key == position.compute_key()
+    if depth == 0:
+        return
+    buffer = buffers[depth - 1]
+    for packed in list(buffer.moves[: position.generate_moves(buffer)]):
+        key = position.key
+        undo = position.make_move(packed)
+        walk(position, depth - 1, buffers)
+        position.unmake_move(undo)
+        assert position.key == key, move_to_uci(packed)
+
+
+def test_incremental_key_matches_full_recompute():
+    for fen in (
+        STARTING_FEN,
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+        'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    ):
+        walk(BitboardPosition.from_fen(fen), 3, [MoveBuffer() for _ in range(3)])
+
+
+def test_board_key_matches_bitboard_key():
+    def compare(game_state, player):
+        board = game_state.board
+        assert board.key == board.compute_key()
+        assert board.key == BitboardPosition.from_board(board, player.color).key
+
+    for seed in range(3):
+        play_random_game(seed, 60, compare)
+
+
+def test_unusable_en_passant_square_is_not_hashed():
+    position = BitboardPosition.from_fen(STARTING_FEN)
+    moves = {move_to_uci(m): m for m in position.legal_moves()}
+    position.make_move(moves['e2e4'])
+    assert position.ep_square >= 0
+    assert (
+        position.key
+        == BitboardPosition.from_fen(
+            'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1'
+        ).key
+    )
+    assert (
+        position.key
+        != BitboardPosition.from_fen(
+            'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 1'
+        ).key
+    )
+
+
+def test_threefold_repetition_ends_game():
+    game_state = GameState()
+    board = game_state.board
+    start = board.key
+    shuffle = ['g1f3', 'g8f6', 'f3g1', 'f6g8']
+    for uci in shuffle * 2:
+        assert not board.is_threefold_repetition()
+        board.make_move(move(board, uci))
+    assert board.key == start
+    assert board.repetitions() == 2
+    assert game_state.white_player.get_status(None, 0) == 'Draw by threefold repetition'
+
+    # A pawn move resets the clock, so earlier positions no longer count
+    board.make_move(move(board, 'e2e4'))
+    assert board.halfmove_clock == 0 and board.repetitions() == 0
+
+
+def test_fifty_move_rule():
+    game_state = GameState()
+    board = game_state.board
+    board.halfmove_clock = 99
+    record = board.make_move(move(board, 'g1f3'))
+    assert board.is_fifty_move_draw()
+    assert game_state.black_player.get_status(None, 1) == 'Draw by fifty-move rule'
+    board.unmake_move(record)
+    assert board.halfmove_clock == 99 and not board.is_fifty_move_draw()
+    assert board.grid[index('g1')].piece is not None
@@ -0,0 +1,173 @@
+from array import array
+from typing import Dict
+
+from moves import NULL_MOVE
+
+# Bound types; an all-zero word is an empty slot
+BOUND_NONE: int = 0
+UPPER: int = 1  # search failed low, score is at most the stored value
+LOWER: int = 2  # search failed high, score is at least the stored value
+EXACT: int = 3
+
+# Every entry is one 64-bit word:
+#   bits  0-15  best move (see moves.py)
+#   bits 16-31  score + 32768
+#   bits 32-39  depth
+#   bits 40-41  bound
+#   bits 42-47  search generation
+#   bits 48-63  check bits, the top 16 bits of the Zobrist key
+# The low bits of the key pick the bucket,
+# so key bits used for the index and for the check do not overlap.
+ENTRY_BYTES: int = 8
+BUCKET_SIZE: int = 2  # slot 0 is depth-preferred, slot 1 is always replaced
+SCORE_OFFSET: int = 32768
+MAX_DEPTH: int = 255
+GENERATIONS: int = 64
+
+
+def entry_move(entry: int) -> int:
+    return entry & 0xFFFF
+
+
+def entry_score(entry: int) -> int:
+    return (entry >> 16 & 0xFFFF) - SCORE_OFFSET
+
+
+def entry_depth(entry: int) -> int:
+    return entry >> 32 & 0xFF
+
+
+def entry_bound(entry: int) -> int:
+    return entry >> 40 & 3
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash of search results kept in a preallocated array of packed 64-bit entries.
+    """
+
+    __slots__ = ('table', 'mask', 'generation', 'hits', 'misses', 'collisions', 'stores')
+
+    def __init__(self, size_mb: float = 16) -> None:
+        """
+        :param size_mb: Memory budget; the bucket count is rounded down to a power of two
+        """
+        buckets = max(int(size_mb * (1 << 20)) // (ENTRY_BYTES * BUCKET_SIZE), 1)
+        buckets = 1 << (buckets.bit_length() - 1)
+        self.table: array = array('Q', bytes(buckets * BUCKET_SIZE * ENTRY_BYTES))
+        self.mask: int = buckets - 1
+        self.generation: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.collisions: int = 0  # probes and stores that met a different position in the bucket
+        self.stores: int = 0
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.table) * ENTRY_BYTES
+
+    def clear(self) -> None:
+        self.table[:] = array('Q', bytes(len(self.table) * ENTRY_BYTES))
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def new_search(self) -> None:
+        """
+        Ages existing entries so that the depth-preferred slots can be reclaimed by the next search
+        """
+        self.generation = (self.generation + 1) % GENERATIONS
+
+    def probe(self, key: int) -> int:
+        """
+        Looks a position up
+        :param key: Zobrist key of the position
+        :return: The packed entry (decode with entry_move, entry_score, ...), or 0 on a miss
+        """
+        table = self.table
+        index = (key & self.mask) * BUCKET_SIZE
+        check = key >> 48
+        occupied = False
+        for slot in range(index, index + BUCKET_SIZE):
+            entry = table[slot]
+            if entry >> 48 == check and entry >> 40 & 3:
+                self.hits += 1
+                return entry
+            occupied = occupied or entry != 0
+        self.misses += 1
+        if occupied:
+            self.collisions += 1
+        return 0
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int = NULL_MOVE) -> None:
+        """
+        Saves a search result
+        :param key: Zobrist key of the position
+        :param depth: Remaining depth the score was searched to
+        :param score: Score from the point of view of the side to move, within +-32767
+        :param bound: EXACT, LOWER or UPPER
+        :param move: Best or refuting move, NULL_MOVE keeps the one already stored for this position
+        """
+        table = self.table
+        index = (key & self.mask) * BUCKET_SIZE
+        check = key >> 48
+        depth = min(depth, MAX_DEPTH)
+        preferred = table[index]
+        always = table[index + 1]
+        if preferred >> 48 == check and preferred >> 40 & 3:
+            slot, old = index, preferred
+        elif (
+            not preferred
+            or depth >= preferred >> 32 & 0xFF
+            or preferred >> 42 & (GENERATIONS - 1) != self.generation
+        ):
+            slot = index
+            old = always if always >> 48 == check and always >> 40 & 3 else 0
+            if preferred:
+                # The displaced entry still gets a chance in the always-replace slot
+                table[index + 1] = preferred
+                if not old:
+                    self.collisions += 1
+        else:
+            slot = index + 1
+            old = always if always >> 48 == check and always >> 40 & 3 else 0
+            if always and not old:
+                self.collisions += 1
+        if move == NULL_MOVE and old:
+            move = old & 0xFFFF
+        table[slot] = (
+            move
+            | (score + SCORE_OFFSET) << 16
+            | depth << 32
+            | bound << 40
+            | self.generation << 42
+            | check << 48
+        )
+        self.stores += 1
+
+    def hashfull(self) -> int:
+        """
+        Permille of the first thousand slots written during the current search (as UCI reports it)
+        """
+        sample = self.table[:1000]
+        used = sum(
+            1 for entry in sample if entry and entry >> 42 & (GENERATIONS - 1) == self.generation
+        )
+        return used * 1000 // len(sample)
+
+    def stats(self) -> Dict[str, int]:
+        probes = self.hits + self.misses
+        return {
+            'probes': probes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'hit_rate_permille': self.hits * 1000 // probes if probes else 0,
+            'hashfull': self.hashfull(),
+        }
@@ -0,0 +1,81 @@
+from typing import TYPE_CHECKING, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from board import Board, Square
+    from game_state import GameState
+
+from constants import (
+    COLOR_BOARD_DARK,
+    COLOR_BOARD_LIGHT,
+    COLOR_CHECK_HIGHLIGHT,
+    COLOR_HIGHLIGHT,
+    TILE_SIZE,
+)
+
+Color = Tuple[int, int, int]
+Rect = Tuple[int, int, int, int]
+
+
+class BoardView:
+    """
+    Screen geometry and highlight state of a board, owned by ChessRenderer.
+    The game model knows squares only by row and column; where and how they are drawn lives here.
+    """
+
+    white: Color = COLOR_BOARD_LIGHT
+    black: Color = COLOR_BOARD_DARK
+    highlight: Color = COLOR_HIGHLIGHT
+    check_highlight: Color = COLOR_CHECK_HIGHLIGHT
+
+    def __init__(self, x: int = 0, y: int = 0, square_length: int = TILE_SIZE) -> None:
+        self.x: int = x
+        self.y: int = y
+        self.square_length: int = square_length
+        self.length: int = 8 * square_length
+        self.highlighted: Set[int] = set()  # legal destinations of the selected piece
+        self.selected: Optional[int] = None  # square of the selected piece
+        self.check: Optional[int] = None  # square of the king in check
+
+    def square_rect(self, square: 'Square') -> Rect:
+        """
+        Screen rectangle of a square, rank 8 at the top
+        :return: (x, y, width, height)
+        """
+        length = self.square_length
+        return (
+            self.x + (square.column - 1) * length,
+            self.y + (8 - square.row) * length,
+            length,
+            length,
+        )
+
+    def square_color(self, square: 'Square') -> Color:
+        return self.white if (square.row + square.column) % 2 else self.black
+
+    def square_at(self, board: 'Board', x: int, y: int) -> Optional['Square']:
+        """
+        This method will take the coordinates and return what square the coordinate is on
+        :param board: Board to find the square on
+        :param x: x-coordinate
+        :param y: y-coordinate
+        :return: "Square" object, None outside the board
+        """
+        if x < self.x or y < self.y or x >= self.x + self.length or y >= self.y + self.length:
+            return None
+        i = (x - self.x) // self.square_length
+        j = (y - self.y) // self.square_length
+        return board.squares[j][i]
+
+    def update(self, game_state: 'GameState') -> None:
+        """
+        Reads the selected piece, its legal moves and any check from the game state
+        """
+        player = game_state.current_player()
+        selected = player.selected
+        if selected is None:
+            self.selected = None
+            self.highlighted = set()
+        else:
+            self.selected = selected.square.index
+            self.highlighted = {square.index for square in player.legal_moves.get(selected, ())}
+        self.check = player.king.square.index if game_state.in_check else None
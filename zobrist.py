@@ -0,0 +1,54 @@
+import random
+from array import array
+from typing import List
+
+# Keys are drawn from a fixed seed so that a position hashes the same in every process
+_random = random.Random(0x3A8F05C5)
+
+# Indexed [color * 6 + piece type][square]
+PIECE_KEYS: List[List[int]] = [[_random.getrandbits(64) for _ in range(64)] for _ in range(12)]
+# Present when Black is to move
+SIDE_KEY: int = _random.getrandbits(64)
+# Indexed by the full castling rights value
+CASTLING_KEYS: List[int] = [_random.getrandbits(64) for _ in range(16)]
+# Indexed by file; only hashed when a pawn of the side to move could actually capture en passant,
+# so positions that differ only by an unusable en passant square still repeat
+EP_KEYS: List[int] = [_random.getrandbits(64) for _ in range(8)]
+
+
+class KeyHistory:
+    """
+    Keys of the positions before the current one, oldest first, stored as unsigned 64-bit integers.
+    """
+
+    __slots__ = ('keys',)
+
+    def __init__(self) -> None:
+        self.keys: array = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def push(self, key: int) -> None:
+        self.keys.append(key)
+
+    def pop(self) -> int:
+        return self.keys.pop()
+
+    def clear(self) -> None:
+        del self.keys[:]
+
+    def repetitions(self, key: int, halfmove_clock: int) -> int:
+        """
+        Counts earlier occurrences of a position
+        :param key: Key of the current position
+        :param halfmove_clock: Plies since the last capture or pawn move;
+                               older positions cannot repeat
+        :return: Number of earlier positions with the same key and side to move
+        """
+        keys = self.keys
+        count = 0
+        for index in range(len(keys) - 2, max(len(keys) - halfmove_clock, 0) - 1, -2):
+            if keys[index] == key:
+                count += 1
+        return count